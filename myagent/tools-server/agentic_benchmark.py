@@ -0,0 +1,139 @@
+"""
+Benchmark the /salesforce/agentic planner modes against a running tools server.
+
+Each question is sent once per mode per run (modes alternate so org or model
+latency drift affects both equally), with the SOQL result cache disabled. The
+report compares end-to-end latency, LLM completions, tokens and token cost:
+
+    API_KEY=... SALESFORCE_USERNAME=... SALESFORCE_PASSWORD=... SALESFORCE_SECURITY_TOKEN=... \\
+        python agentic_benchmark.py --url http://127.0.0.1:8000 --runs 3 --questions questions.txt
+
+Questions are read one per line; a small default set is used without --questions.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import Any, Dict, List
+
+import aiohttp
+
+MODES = ("iterative", "one_shot")
+
+DEFAULT_QUESTIONS = [
+    "What is the total open pipeline for Acme?",
+    "Show the open opportunities and the contacts for Acme",
+    "Which opportunities closing this quarter are still in Prospecting?",
+    "Who are the top 5 reps by closed won amount this year?"
+]
+
+# gpt-4.1 list prices in USD per million tokens
+DEFAULT_PROMPT_PRICE = 2.00
+DEFAULT_COMPLETION_PRICE = 8.00
+
+
+async def run_question(session: aiohttp.ClientSession, url: str, credentials: Dict[str, Any], question: str, mode: str) -> Dict[str, Any]:
+    started = time.perf_counter()
+    async with session.post(
+        f"{url.rstrip('/')}/salesforce/agentic",
+        json={"credentials": credentials, "user_query": question, "planner_mode": mode, "use_cache": False},
+        headers={"x-api-key": os.getenv("API_KEY", "")}
+    ) as response:
+        body = await response.json()
+    latency = time.perf_counter() - started
+    if response.status != 200:
+        raise RuntimeError(f"{mode} request failed with {response.status}: {body}")
+    usage = body.get("llm_usage") or {}
+    return {
+        "latency": latency,
+        "success": body.get("success", False),
+        "completions": usage.get("completions", 0),
+        "prompt_tokens": usage.get("prompt_tokens", 0),
+        "completion_tokens": usage.get("completion_tokens", 0),
+        "api_calls": (body.get("salesforce_usage") or {}).get("api_calls", 0)
+    }
+
+
+def summarize(samples: List[Dict[str, Any]], prompt_price: float, completion_price: float) -> Dict[str, Any]:
+    cost = [
+        (sample["prompt_tokens"] * prompt_price + sample["completion_tokens"] * completion_price) / 1_000_000
+        for sample in samples
+    ]
+    return {
+        "runs": len(samples),
+        "success_rate": sum(sample["success"] for sample in samples) / len(samples),
+        "latency_median": statistics.median(sample["latency"] for sample in samples),
+        "latency_max": max(sample["latency"] for sample in samples),
+        "completions": statistics.mean(sample["completions"] for sample in samples),
+        "prompt_tokens": statistics.mean(sample["prompt_tokens"] for sample in samples),
+        "completion_tokens": statistics.mean(sample["completion_tokens"] for sample in samples),
+        "cost_usd": statistics.mean(cost),
+        "api_calls": statistics.mean(sample["api_calls"] for sample in samples)
+    }
+
+
+def print_report(report: Dict[str, Dict[str, Dict[str, Any]]]):
+    header = f"{'mode':<10} {'ok':>5} {'p50 s':>7} {'max s':>7} {'LLM':>5} {'in tok':>8} {'out tok':>8} {'cost $':>8} {'SF calls':>8}"
+    for question, modes in report.items():
+        print(f"\n{question}")
+        print(header)
+        for mode, stats in modes.items():
+            print(
+                f"{mode:<10} {stats['success_rate']:>5.0%} {stats['latency_median']:>7.2f} {stats['latency_max']:>7.2f} "
+                f"{stats['completions']:>5.1f} {stats['prompt_tokens']:>8.0f} {stats['completion_tokens']:>8.0f} "
+                f"{stats['cost_usd']:>8.4f} {stats['api_calls']:>8.1f}"
+            )
+        baseline, candidate = modes.get("iterative"), modes.get("one_shot")
+        if baseline and candidate and baseline["cost_usd"]:
+            print(
+                f"one_shot vs iterative: latency x{candidate['latency_median'] / baseline['latency_median']:.2f}, "
+                f"cost x{candidate['cost_usd'] / baseline['cost_usd']:.2f}"
+            )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--questions", help="File with one question per line")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--prompt-price", type=float, default=DEFAULT_PROMPT_PRICE, help="USD per million prompt tokens")
+    parser.add_argument("--completion-price", type=float, default=DEFAULT_COMPLETION_PRICE, help="USD per million completion tokens")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    questions = DEFAULT_QUESTIONS
+    if args.questions:
+        with open(args.questions) as f:
+            questions = [line.strip() for line in f if line.strip()]
+    credentials = {
+        "username": os.environ["SALESFORCE_USERNAME"],
+        "password": os.environ["SALESFORCE_PASSWORD"],
+        "security_token": os.environ["SALESFORCE_SECURITY_TOKEN"],
+        "is_sandbox": os.getenv("SALESFORCE_IS_SANDBOX", "false").lower() == "true"
+    }
+
+    report: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    timeout = aiohttp.ClientTimeout(total=600)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        for question in questions:
+            samples: Dict[str, List[Dict[str, Any]]] = {mode: [] for mode in args.modes}
+            for run in range(args.runs):
+                # Alternate which mode goes first so neither always runs against a warmer org
+                for mode in (args.modes if run % 2 == 0 else list(reversed(args.modes))):
+                    samples[mode].append(await run_question(session, args.url, credentials, question, mode))
+            report[question] = {
+                mode: summarize(mode_samples, args.prompt_price, args.completion_price)
+                for mode, mode_samples in samples.items()
+            }
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,153 @@
+"""
+Local stand-in for the Salesforce Bulk API 2.0 query endpoints.
+
+Serves synthetic records for whatever fields a query selects, so the
+/salesforce/bulk-extract path can be exercised without a real org:
+
+    STANDIN_ROWS=250000 uvicorn bulk_api_standin:app --port 8099
+    SALESFORCE_BULK_INSTANCE_URL=http://127.0.0.1:8099 python main.py
+
+Jobs report InProgress for STANDIN_POLLS_UNTIL_COMPLETE status checks before
+completing, and results are paged with Sforce-Locator like the real API.
+"""
+import csv
+import io
+import os
+import re
+import uuid
+from datetime import date, timedelta
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI, HTTPException, Header, Request
+from fastapi.responses import Response
+
+STANDIN_ROWS = int(os.getenv("STANDIN_ROWS", "10000"))
+STANDIN_POLLS_UNTIL_COMPLETE = int(os.getenv("STANDIN_POLLS_UNTIL_COMPLETE", "2"))
+STANDIN_DEFAULT_PAGE_SIZE = int(os.getenv("STANDIN_DEFAULT_PAGE_SIZE", "50000"))
+
+STAGES = ["Prospecting", "Qualification", "Needs Analysis", "Proposal/Price Quote", "Negotiation/Review", "Closed Won", "Closed Lost"]
+
+app = FastAPI(title="Salesforce Bulk API 2.0 stand-in", version="1.0.0")
+
+jobs: Dict[str, Dict[str, Any]] = {}
+
+
+def parse_query(soql: str):
+    match = re.match(r"\s*SELECT\s+(.+?)\s+FROM\s+(\w+)(?:\s+LIMIT\s+(\d+))?", soql, re.IGNORECASE | re.DOTALL)
+    if not match:
+        raise HTTPException(status_code=400, detail=[{"errorCode": "MALFORMED_QUERY", "message": "Could not parse query"}])
+    fields = [field.strip() for field in match.group(1).split(",")]
+    limit = int(match.group(3)) if match.group(3) else None
+    return fields, match.group(2), limit
+
+
+def synthetic_value(object_name: str, field: str, index: int) -> str:
+    name = field.split(".")[-1].lower()
+    if name == "id":
+        prefix = {"Account": "001", "Contact": "003", "Opportunity": "006", "Task": "00T"}.get(object_name, "a00")
+        return f"{prefix}{index:015d}"
+    if name.endswith("id"):
+        return f"001{index % 500:015d}"
+    if name == "amount" or name == "annualrevenue":
+        return str((index * 7919) % 500000 + 1000)
+    if name == "stagename":
+        return STAGES[index % len(STAGES)]
+    if name == "isclosed":
+        return "true" if STAGES[index % len(STAGES)].startswith("Closed") else "false"
+    if name == "probability":
+        return str((index * 10) % 100)
+    if "date" in name:
+        return (date(2024, 1, 1) + timedelta(days=index % 730)).isoformat()
+    if name == "subject":
+        return f"Follow up \"call\" #{index}"
+    if name == "description":
+        return f"Line one for {index}\nline two, with comma"
+    return f"{object_name} {field} {index}"
+
+
+def render_rows(job: Dict[str, Any], offset: int, count: int) -> str:
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(job["fields"])
+    for index in range(offset, offset + count):
+        writer.writerow([synthetic_value(job["object"], field, index) for field in job["fields"]])
+    return output.getvalue()
+
+
+def require_auth(authorization: Optional[str]):
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail=[{"errorCode": "INVALID_SESSION_ID", "message": "Session expired or invalid"}])
+
+
+@app.post("/services/data/v{version}/jobs/query")
+async def create_query_job(version: str, request: Request, authorization: Optional[str] = Header(None)):
+    require_auth(authorization)
+    body = await request.json()
+    fields, object_name, limit = parse_query(body["query"])
+    job_id = "750" + uuid.uuid4().hex[:15]
+    jobs[job_id] = {
+        "id": job_id,
+        "operation": body.get("operation", "query"),
+        "object": object_name,
+        "fields": fields,
+        "rows": min(limit, STANDIN_ROWS) if limit is not None else STANDIN_ROWS,
+        "polls": 0,
+        "state": "UploadComplete"
+    }
+    return {"id": job_id, "operation": jobs[job_id]["operation"], "object": object_name, "state": "UploadComplete", "apiVersion": version}
+
+
+@app.get("/services/data/v{version}/jobs/query/{job_id}")
+async def get_query_job(version: str, job_id: str, authorization: Optional[str] = Header(None)):
+    require_auth(authorization)
+    job = jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=[{"errorCode": "NOT_FOUND", "message": "Job not found"}])
+    if job["state"] != "Aborted":
+        job["polls"] += 1
+        job["state"] = "JobComplete" if job["polls"] > STANDIN_POLLS_UNTIL_COMPLETE else "InProgress"
+    return {
+        "id": job_id,
+        "operation": job["operation"],
+        "object": job["object"],
+        "state": job["state"],
+        "numberRecordsProcessed": job["rows"] if job["state"] == "JobComplete" else 0
+    }
+
+
+@app.patch("/services/data/v{version}/jobs/query/{job_id}")
+async def abort_query_job(version: str, job_id: str, request: Request, authorization: Optional[str] = Header(None)):
+    require_auth(authorization)
+    job = jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=[{"errorCode": "NOT_FOUND", "message": "Job not found"}])
+    body = await request.json()
+    job["state"] = body.get("state", job["state"])
+    return {"id": job_id, "state": job["state"]}
+
+
+@app.get("/services/data/v{version}/jobs/query/{job_id}/results")
+async def get_query_results(
+    version: str,
+    job_id: str,
+    locator: Optional[str] = None,
+    maxRecords: Optional[int] = None,
+    authorization: Optional[str] = Header(None)
+):
+    require_auth(authorization)
+    job = jobs.get(job_id)
+    if not job or job["state"] != "JobComplete":
+        raise HTTPException(status_code=400, detail=[{"errorCode": "INVALIDJOBSTATE", "message": "Job is not complete"}])
+
+    offset = int(locator) if locator else 0
+    page_size = maxRecords or STANDIN_DEFAULT_PAGE_SIZE
+    count = max(0, min(page_size, job["rows"] - offset))
+    next_offset = offset + count
+    return Response(
+        content=render_rows(job, offset, count),
+        media_type="text/csv",
+        headers={
+            "Sforce-Locator": str(next_offset) if next_offset < job["rows"] else "null",
+            "Sforce-NumberOfRecords": str(count)
+        }
+    )
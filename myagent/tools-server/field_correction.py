@@ -0,0 +1,175 @@
+import json
+import os
+import re
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# A candidate must be within this fraction of the name length (at least 1 edit) to be accepted
+MAX_EDIT_RATIO = 0.25
+
+DescribeLoader = Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+
+
+def normalize_name(name: str) -> str:
+    """Compare names without case, underscores, spaces or the custom field suffix"""
+    name = re.sub(r"__(c|r)$", "", name, flags=re.IGNORECASE)
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance with adjacent transpositions counted as one edit"""
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, char_b in enumerate(b, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            )
+            if previous_previous and i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+def match_field(describe: Dict[str, Any], name: str) -> Optional[str]:
+    """Best matching field on one object: normalized name, then label, then a unique closest edit distance"""
+    target = normalize_name(name)
+    if not target:
+        return None
+    fields = describe["fields"]
+    for field in fields:
+        if normalize_name(field["name"]) == target:
+            return field["name"]
+    for field in fields:
+        if field.get("label") and normalize_name(field["label"]) == target:
+            return field["name"]
+
+    max_distance = max(1, int(len(target) * MAX_EDIT_RATIO))
+    scored = []
+    for field in fields:
+        candidates = [normalize_name(field["name"])]
+        if field.get("label"):
+            candidates.append(normalize_name(field["label"]))
+        distance = min(edit_distance(target, candidate) for candidate in candidates)
+        if distance <= max_distance:
+            scored.append((distance, field["name"]))
+    scored.sort()
+    # Ambiguous matches (two fields equally close) are not corrected
+    if scored and (len(scored) == 1 or scored[0][0] < scored[1][0]):
+        return scored[0][1]
+    return None
+
+
+def match_relationship(describe: Dict[str, Any], name: str) -> Optional[Dict[str, Any]]:
+    target = normalize_name(name)
+    relationships = [field for field in describe["fields"] if field.get("relationshipName")]
+    for field in relationships:
+        if normalize_name(field["relationshipName"]) == target:
+            return field
+    matches = [
+        field for field in relationships
+        if edit_distance(target, normalize_name(field["relationshipName"])) <= max(1, int(len(target) * MAX_EDIT_RATIO))
+    ]
+    return matches[0] if len(matches) == 1 else None
+
+
+async def suggest_field(load: DescribeLoader, object_name: str, path: str) -> Optional[str]:
+    """
+    Suggest a valid field path for an invalid one, without calling an LLM.
+
+    Handles misspellings and labels ("Stage" -> StageName), custom field suffixes
+    ("Region" -> Region__c), misspelled relationships ("Acount.Name") and flattened
+    relationship paths ("AccountName" -> Account.Name).
+    """
+    describe = await load(object_name)
+    if not describe:
+        return None
+    parts = path.split(".")
+
+    if len(parts) == 1:
+        field = match_field(describe, parts[0])
+        if field:
+            return field
+        # Flattened relationship path: <relationship><field> or <relationship>_<field>
+        target = normalize_name(parts[0])
+        for relationship in describe["fields"]:
+            name = relationship.get("relationshipName")
+            targets = relationship.get("referenceTo") or []
+            if not name or len(targets) != 1 or not target.startswith(normalize_name(name)):
+                continue
+            remainder = target[len(normalize_name(name)):]
+            related = await load(targets[0])
+            if remainder and related:
+                field = match_field(related, remainder)
+                if field:
+                    return f"{name}.{field}"
+        return None
+
+    relationship = match_relationship(describe, parts[0])
+    if relationship is None:
+        return None
+    targets = relationship.get("referenceTo") or []
+    if len(targets) != 1:
+        return None
+    rest = await suggest_field(load, targets[0], ".".join(parts[1:]))
+    return f"{relationship['relationshipName']}.{rest}" if rest else None
+
+
+class FieldCorrector:
+    """Learns field corrections that Salesforce accepted, so they are applied before the next attempt.
+
+    Corrections are kept per org and object and persisted as a single JSON file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._learned: Dict[str, Dict[str, Dict[str, str]]] = {}
+        self.stats_counters = {"learned_applied": 0, "suggested": 0, "unresolved": 0, "recorded": 0}
+        try:
+            with open(path) as f:
+                self._learned = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def learned(self, org_id: str, object_name: str, path: str) -> Optional[str]:
+        return self._learned.get(org_id, {}).get(object_name.lower(), {}).get(path.lower())
+
+    async def correct(self, org_id: str, load: DescribeLoader, object_name: str, path: str) -> Optional[str]:
+        """Return a replacement for an invalid field path, preferring corrections that worked before"""
+        replacement = self.learned(org_id, object_name, path)
+        if replacement:
+            self.stats_counters["learned_applied"] += 1
+            return replacement
+        replacement = await suggest_field(load, object_name, path)
+        self.stats_counters["suggested" if replacement else "unresolved"] += 1
+        return replacement
+
+    def record_success(self, org_id: str, corrections: List[Dict[str, str]]):
+        """Remember corrections whose rewritten query executed successfully"""
+        if not corrections:
+            return
+        with self._lock:
+            org = self._learned.setdefault(org_id, {})
+            for correction in corrections:
+                org.setdefault(correction["object"].lower(), {})[correction["field"].lower()] = correction["replacement"]
+                self.stats_counters["recorded"] += 1
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(self._learned, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Failed to persist field corrections: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "learned": sum(len(fields) for org in self._learned.values() for fields in org.values()),
+            **self.stats_counters
+        }
@@ -0,0 +1,188 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Dict, Any
+
+try:
+    from cryptography.fernet import Fernet
+except ImportError:  # Token encryption is optional
+    Fernet = None
+
+# Job states
+JOB_PENDING = "pending"
+JOB_NOTIFYING = "notifying"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+TERMINAL_JOB_STATES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+# Prefix of tokens stored encrypted with the server-side key
+ENCRYPTED_TOKEN_PREFIX = "fernet:"
+
+
+class ResearchJobStore:
+    """SQLite-backed store for research monitoring jobs.
+
+    Every research request that is waiting for completion (and a bot
+    notification) is recorded here, so pending jobs survive a restart.
+    The caller's token is needed for status checks until then: the database
+    file is only readable by the server user, the token is encrypted when a
+    `token_key` (Fernet key) is configured, and it is cleared once the job
+    reaches a terminal state.
+    """
+
+    def __init__(self, db_path: str, token_key: Optional[str] = None):
+        self.db_path = db_path
+        if token_key and Fernet is None:
+            raise RuntimeError("Encrypting research job tokens requires the cryptography package")
+        self._fernet = Fernet(token_key.encode()) if token_key else None
+        self._lock = threading.Lock()
+        # Create the file owner-only before SQLite opens it; the WAL and shared-memory files inherit its mode
+        os.close(os.open(db_path, os.O_RDWR | os.O_CREAT, 0o600))
+        os.chmod(db_path, 0o600)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS research_jobs (
+                request_id TEXT PRIMARY KEY,
+                user_email TEXT NOT NULL,
+                token TEXT NOT NULL,
+                agent_meeting_id INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_run_at REAL NOT NULL,
+                download_link TEXT,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_research_jobs_due ON research_jobs (status, next_run_at)"
+        )
+        # Terminal jobs never need their token again; clear any left by older versions
+        self._conn.execute(
+            f"UPDATE research_jobs SET token = '' WHERE token != '' AND status IN ({', '.join('?' * len(TERMINAL_JOB_STATES))})",
+            TERMINAL_JOB_STATES
+        )
+        self._conn.commit()
+
+    def _encrypt_token(self, token: str) -> str:
+        if not self._fernet:
+            return token
+        return ENCRYPTED_TOKEN_PREFIX + self._fernet.encrypt(token.encode()).decode()
+
+    def _job(self, row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        if job["token"].startswith(ENCRYPTED_TOKEN_PREFIX):
+            if not self._fernet:
+                raise RuntimeError("Research job tokens are encrypted but no token key is configured")
+            job["token"] = self._fernet.decrypt(job["token"][len(ENCRYPTED_TOKEN_PREFIX):].encode()).decode()
+        return job
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def add_job(self, request_id: str, user_email: str, token: str, agent_meeting_id: int, next_run_at: float) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("""
+                INSERT OR REPLACE INTO research_jobs
+                    (request_id, user_email, token, agent_meeting_id, status, attempts,
+                     next_run_at, download_link, last_error, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, 0, ?, NULL, NULL, ?, ?)
+            """, (request_id, user_email, self._encrypt_token(token), agent_meeting_id, JOB_PENDING, next_run_at, now, now))
+            self._conn.commit()
+        return self.get_job(request_id)
+
+    def get_job(self, request_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM research_jobs WHERE request_id = ?", (request_id,)
+            ).fetchone()
+        return self._job(row) if row else None
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            if status:
+                rows = self._conn.execute(
+                    "SELECT * FROM research_jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?",
+                    (status, limit)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT * FROM research_jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+                ).fetchall()
+        return [self._job(row) for row in rows]
+
+    def due_jobs(self, now: float, limit: int) -> List[Dict[str, Any]]:
+        """Return pending jobs whose next run time has passed, oldest first"""
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT * FROM research_jobs
+                WHERE status = ? AND next_run_at <= ?
+                ORDER BY next_run_at ASC
+                LIMIT ?
+            """, (JOB_PENDING, now, limit)).fetchall()
+        return [self._job(row) for row in rows]
+
+    def record_attempt(self, request_id: str, next_run_at: float, error: Optional[str] = None):
+        with self._lock:
+            self._conn.execute("""
+                UPDATE research_jobs
+                SET attempts = attempts + 1, next_run_at = ?, last_error = ?, updated_at = ?
+                WHERE request_id = ? AND status = ?
+            """, (next_run_at, error, time.time(), request_id, JOB_PENDING))
+            self._conn.commit()
+
+    def set_status(self, request_id: str, status: str, download_link: Optional[str] = None,
+                   error: Optional[str] = None, expected_status: str = JOB_PENDING) -> bool:
+        """
+        Move a job out of `expected_status`. Returns False if the job was in another state.
+        The token is dropped when the new state is terminal.
+        """
+        with self._lock:
+            cursor = self._conn.execute("""
+                UPDATE research_jobs
+                SET status = ?, download_link = COALESCE(?, download_link),
+                    last_error = COALESCE(?, last_error), updated_at = ?,
+                    token = CASE WHEN ? THEN '' ELSE token END
+                WHERE request_id = ? AND status = ?
+            """, (status, download_link, error, time.time(), status in TERMINAL_JOB_STATES, request_id, expected_status))
+            self._conn.commit()
+            return cursor.rowcount > 0
+
+    def claim_for_notification(self, request_id: str, download_link: str) -> bool:
+        """Atomically move a pending job to `notifying` so only one caller sends the bot message"""
+        return self.set_status(request_id, JOB_NOTIFYING, download_link=download_link)
+
+    def requeue_interrupted(self, next_run_at: float) -> int:
+        """Return jobs left in `notifying` by a crash or deploy to the pending queue"""
+        with self._lock:
+            cursor = self._conn.execute("""
+                UPDATE research_jobs
+                SET status = ?, next_run_at = ?, updated_at = ?
+                WHERE status = ?
+            """, (JOB_PENDING, next_run_at, time.time(), JOB_NOTIFYING))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def queue_depth(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM research_jobs GROUP BY status"
+            ).fetchall()
+        depth = {JOB_PENDING: 0, JOB_NOTIFYING: 0, JOB_COMPLETED: 0, JOB_FAILED: 0, JOB_CANCELLED: 0}
+        for status, count in rows:
+            depth[status] = count
+        return depth
+
+    def pending_count(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM research_jobs WHERE status = ?", (JOB_PENDING,)
+            ).fetchone()
+        return row[0]
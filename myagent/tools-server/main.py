@@ -1,7 +1,8 @@
-from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi import FastAPI, HTTPException, Depends, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, Set
 import os
 from datetime import datetime, timedelta
 import psycopg2
@@ -14,7 +15,26 @@ from functools import partial
 import json
 import aiohttp
 import time
-from simple_salesforce import Salesforce
+import hmac
+import re
+from simple_salesforce.exceptions import SalesforceError
+from salesforce_pool import SalesforceSessionPool
+from salesforce_client import AsyncSalesforce, SalesforceExecutor
+from salesforce_schema import SalesforceSchemaCache, format_object_fields
+from soql_parser import validate_soql, parse_soql, tokenize, apply_edits, escape_soql_string, escape_sosl_term
+from field_correction import FieldCorrector
+from soql_semantic_cache import SemanticSOQLCache
+from soql_result_cache import SOQLResultCache, DEFAULT_OBJECT_TTLS
+from plan_executor import normalize_plan, critical_path_length, run_plan
+from request_deadline import RequestDeadline, DeadlineExceeded
+from soql_templates import match_pipeline_template, evaluate_pipeline_template, date_literal_range
+from salesforce_mirror import SalesforceMirror
+from salesforce_activities import fetch_recent_activities
+from pipeline_analytics import OpportunitySnapshot, SNAPSHOT_FIELDS
+from salesforce_bulk import BulkQueryClient, iter_csv_bytes, iter_ndjson, iter_parquet, pa
+from recall_dispatcher import RecallNotificationDispatcher
+from ttl_cache import TTLCache
+from job_store import ResearchJobStore, JOB_PENDING, JOB_NOTIFYING, JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED
 
 # Load environment variables
 load_dotenv()
@@ -36,6 +56,126 @@ X_API_KEY = os.getenv("REST_API_KEY", "your-x-api-key-here")
 RECALL_API_KEY = os.getenv("RECALL_API_KEY", "your-recall-api-key-here")
 API_BASE_URL = os.getenv("API_BASE_URL", "https://app.getherd.ai/api")
 
+# Outbound HTTP client configuration (shared aiohttp session)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "20"))
+HTTP_DNS_CACHE_TTL_SECONDS = int(os.getenv("HTTP_DNS_CACHE_TTL_SECONDS", "300"))
+HTTP_KEEPALIVE_TIMEOUT_SECONDS = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT_SECONDS", "30"))
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "10"))
+HTTP_TOTAL_TIMEOUT_SECONDS = float(os.getenv("HTTP_TOTAL_TIMEOUT_SECONDS", "30"))
+
+# Recall.ai bot notification dispatcher configuration
+RECALL_GLOBAL_RATE_PER_SECOND = float(os.getenv("RECALL_GLOBAL_RATE_PER_SECOND", "5"))
+RECALL_GLOBAL_BURST = int(os.getenv("RECALL_GLOBAL_BURST", "10"))
+RECALL_PER_BOT_RATE_PER_SECOND = float(os.getenv("RECALL_PER_BOT_RATE_PER_SECOND", "0.5"))
+RECALL_PER_BOT_BURST = int(os.getenv("RECALL_PER_BOT_BURST", "2"))
+RECALL_MAX_SEND_ATTEMPTS = int(os.getenv("RECALL_MAX_SEND_ATTEMPTS", "5"))
+RECALL_COALESCE_WINDOW_SECONDS = float(os.getenv("RECALL_COALESCE_WINDOW_SECONDS", "1"))
+
+# Agent meeting metadata cache (agent_meeting_id -> bot_id etc.)
+AGENT_MEETING_CACHE_TTL_SECONDS = float(os.getenv("AGENT_MEETING_CACHE_TTL_SECONDS", "1800"))
+AGENT_MEETING_CACHE_SIZE = int(os.getenv("AGENT_MEETING_CACHE_SIZE", "1000"))
+# Account name -> Id index used by the account overview
+ACCOUNT_NAME_INDEX_TTL_SECONDS = float(os.getenv("ACCOUNT_NAME_INDEX_TTL_SECONDS", "3600"))
+ACCOUNT_NAME_INDEX_SIZE = int(os.getenv("ACCOUNT_NAME_INDEX_SIZE", "5000"))
+
+# Salesforce session pool configuration
+SALESFORCE_SESSION_IDLE_TTL_SECONDS = float(os.getenv("SALESFORCE_SESSION_IDLE_TTL_SECONDS", "3600"))
+SALESFORCE_MAX_SESSIONS = int(os.getenv("SALESFORCE_MAX_SESSIONS", "200"))
+SALESFORCE_MAX_WORKERS = int(os.getenv("SALESFORCE_MAX_WORKERS", "32"))
+SALESFORCE_PER_ORG_CONCURRENCY = int(os.getenv("SALESFORCE_PER_ORG_CONCURRENCY", "8"))
+# Salesforce Bulk API 2.0 extraction configuration
+SALESFORCE_BULK_INSTANCE_URL = os.getenv("SALESFORCE_BULK_INSTANCE_URL", "")  # Override, e.g. the local stand-in
+SALESFORCE_BULK_POLL_INTERVAL_SECONDS = float(os.getenv("SALESFORCE_BULK_POLL_INTERVAL_SECONDS", "1"))
+SALESFORCE_BULK_TIMEOUT_SECONDS = float(os.getenv("SALESFORCE_BULK_TIMEOUT_SECONDS", "1800"))
+# Salesforce describe/schema cache configuration
+SALESFORCE_SCHEMA_CACHE_DIR = os.getenv("SALESFORCE_SCHEMA_CACHE_DIR", "schema_cache")
+SALESFORCE_SCHEMA_CACHE_TTL_SECONDS = float(os.getenv("SALESFORCE_SCHEMA_CACHE_TTL_SECONDS", "86400"))
+SALESFORCE_FIELD_CORRECTIONS_PATH = os.getenv(
+    "SALESFORCE_FIELD_CORRECTIONS_PATH", os.path.join(SALESFORCE_SCHEMA_CACHE_DIR, "field_corrections.json")
+)
+SALESFORCE_SCHEMA_WARM_OBJECTS = [
+    name.strip() for name in os.getenv(
+        "SALESFORCE_SCHEMA_WARM_OBJECTS", "Account,Contact,Opportunity,Lead,Case,Task,Event"
+    ).split(",") if name.strip()
+]
+# Semantic natural-language -> SOQL cache (embedding similarity, per org)
+SOQL_SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SOQL_SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SOQL_SEMANTIC_CACHE_MAX_ENTRIES_PER_ORG = int(os.getenv("SOQL_SEMANTIC_CACHE_MAX_ENTRIES_PER_ORG", "500"))
+SOQL_SEMANTIC_CACHE_TTL_SECONDS = float(os.getenv("SOQL_SEMANTIC_CACHE_TTL_SECONDS", "604800"))  # 7 days
+# SOQL result cache (org + user + normalized query -> records) with per-object TTLs (opt-in)
+SOQL_RESULT_CACHE_ENABLED = os.getenv("SOQL_RESULT_CACHE_ENABLED", "false").lower() == "true"
+SOQL_RESULT_CACHE_SIZE = int(os.getenv("SOQL_RESULT_CACHE_SIZE", "2000"))
+SOQL_RESULT_CACHE_TTL_SECONDS = float(os.getenv("SOQL_RESULT_CACHE_TTL_SECONDS", "120"))
+SOQL_RESULT_CACHE_OBJECT_TTLS = {
+    **DEFAULT_OBJECT_TTLS,
+    **{
+        name.strip(): float(ttl) for name, ttl in (
+            item.split("=", 1) for item in os.getenv("SOQL_RESULT_CACHE_OBJECT_TTLS", "").split(",") if "=" in item
+        )
+    }
+}  # Overrides as "Opportunity=60,User=7200"
+SOQL_RESULT_CACHE_MAX_RECORDS = int(os.getenv("SOQL_RESULT_CACHE_MAX_RECORDS", "2000"))
+# Revalidate entries older than this with a SystemModstamp probe (one API call per object); off when unset
+SOQL_RESULT_CACHE_REVALIDATE_AFTER_SECONDS = (
+    float(os.environ["SOQL_RESULT_CACHE_REVALIDATE_AFTER_SECONDS"])
+    if os.getenv("SOQL_RESULT_CACHE_REVALIDATE_AFTER_SECONDS") else None
+)
+# Local mirror of Account/Opportunity/Contact/Task for read-only endpoints (opt-in per org)
+SALESFORCE_MIRROR_ENABLED = os.getenv("SALESFORCE_MIRROR_ENABLED", "false").lower() == "true"
+SALESFORCE_MIRROR_DIR = os.getenv("SALESFORCE_MIRROR_DIR", "salesforce_mirror")
+SALESFORCE_MIRROR_SYNC_INTERVAL_SECONDS = float(os.getenv("SALESFORCE_MIRROR_SYNC_INTERVAL_SECONDS", "300"))
+# A mirror is read only by the user it syncs as, plus these usernames (users allowed org-wide visibility)
+SALESFORCE_MIRROR_ORG_WIDE_USERS = {
+    name.strip().lower() for name in os.getenv("SALESFORCE_MIRROR_ORG_WIDE_USERS", "").split(",") if name.strip()
+}
+# Agentic plan steps whose dependencies are done run concurrently, at most this many at a time
+AGENTIC_MAX_PARALLEL_STEPS = int(os.getenv("AGENTIC_MAX_PARALLEL_STEPS", "4"))
+# "iterative": one LLM call per step attempt; "one_shot": the plan carries each step's SOQL and the
+# LLM is only asked again when a step fails (compare them with agentic_benchmark.py before switching)
+AGENTIC_PLANNER_MODE = os.getenv("AGENTIC_PLANNER_MODE", "iterative")
+AGENTIC_PLANNER_MODES = ("one_shot", "iterative")
+if AGENTIC_PLANNER_MODE not in AGENTIC_PLANNER_MODES:
+    raise ValueError(f"AGENTIC_PLANNER_MODE must be one of: {', '.join(AGENTIC_PLANNER_MODES)} (got {AGENTIC_PLANNER_MODE!r})")
+# Idle agentic event streams check for a disconnected client (and send SSE keepalives) this often
+AGENTIC_STREAM_KEEPALIVE_SECONDS = float(os.getenv("AGENTIC_STREAM_KEEPALIVE_SECONDS", "10"))
+# Time budget of an agentic request, split across its phases. Requests have no deadline unless the caller passes
+# deadline_seconds (capped at the maximum) or AGENTIC_DEADLINE_SECONDS is set
+AGENTIC_DEADLINE_SECONDS = float(os.environ["AGENTIC_DEADLINE_SECONDS"]) if os.getenv("AGENTIC_DEADLINE_SECONDS") else None
+AGENTIC_MAX_DEADLINE_SECONDS = float(os.getenv("AGENTIC_MAX_DEADLINE_SECONDS", "300"))
+# Phase shares per planner mode: a one-shot plan writes every step's SOQL (up to 2000 tokens), so planning
+# gets the largest share and execution, which only calls the LLM for failing steps, a smaller one
+AGENTIC_PHASE_BUDGETS = {
+    mode: {
+        **defaults,
+        **{
+            name.strip(): float(share) for name, share in (
+                item.split("=", 1) for item in os.getenv(env_name, "").split(",") if "=" in item
+            )
+        }
+    }
+    for mode, env_name, defaults in (
+        ("iterative", "AGENTIC_PHASE_BUDGETS", {"plan": 0.2, "execute": 0.55, "analysis": 0.25}),
+        ("one_shot", "AGENTIC_ONE_SHOT_PHASE_BUDGETS", {"plan": 0.45, "execute": 0.35, "analysis": 0.2})
+    )
+}  # Overrides as "plan=0.2,execute=0.6,analysis=0.2"
+# Non-streaming agentic requests check for a disconnected client this often
+AGENTIC_DISCONNECT_POLL_SECONDS = float(os.getenv("AGENTIC_DISCONNECT_POLL_SECONDS", "1"))
+
+# Research job monitoring configuration
+RESEARCH_JOB_DB_PATH = os.getenv("RESEARCH_JOB_DB_PATH", "research_jobs.db")
+RESEARCH_WEBHOOK_SECRET = os.getenv("RESEARCH_WEBHOOK_SECRET", "")
+# Fernet key (cryptography package) for the user tokens stored with pending research jobs; stored unencrypted when unset
+RESEARCH_JOB_TOKEN_KEY = os.getenv("RESEARCH_JOB_TOKEN_KEY", "")
+# With the completion webhook configured, polling is only a slow fallback sweep
+RESEARCH_POLL_INTERVAL_SECONDS = float(os.getenv(
+    "RESEARCH_POLL_INTERVAL_SECONDS",
+    "60" if RESEARCH_WEBHOOK_SECRET else "5"
+))
+RESEARCH_JOB_TIMEOUT_SECONDS = float(os.getenv("RESEARCH_JOB_TIMEOUT_SECONDS", "900"))  # 15 minutes
+RESEARCH_SWEEP_BATCH_SIZE = int(os.getenv("RESEARCH_SWEEP_BATCH_SIZE", "20"))
+MAX_PENDING_RESEARCH_JOBS = int(os.getenv("MAX_PENDING_RESEARCH_JOBS", "500"))
+
 # Database configuration from environment variables
 DB_CONFIG = {
     'host': os.getenv('DB_HOST', 'localhost'),
@@ -128,6 +268,46 @@ class ResearchResponse(BaseModel):
     message: str
     research_id: Optional[str] = None
 
+class ResearchCompleteWebhookRequest(BaseModel):
+    request_id: str
+    status: str = "COMPLETED"
+    download_link: Optional[str] = None
+
+class ResearchCompleteWebhookResponse(BaseModel):
+    success: bool
+    message: str
+    notification_queued: bool = False
+
+class ResearchJobInfo(BaseModel):
+    request_id: str
+    user_email: str
+    agent_meeting_id: int
+    status: str
+    attempts: int
+    next_run_at: str
+    download_link: Optional[str] = None
+    last_error: Optional[str] = None
+    created_at: str
+    updated_at: str
+
+class ResearchJobQueueResponse(BaseModel):
+    success: bool
+    queue_depth: Dict[str, int]
+    max_pending_jobs: int
+    timestamp: str
+
+class ResearchJobListResponse(BaseModel):
+    success: bool
+    jobs: List[ResearchJobInfo]
+    total_found: int
+    queue_depth: Dict[str, int]
+    timestamp: str
+
+class ResearchJobCancelResponse(BaseModel):
+    success: bool
+    message: str
+    job: Optional[ResearchJobInfo] = None
+
 # Salesforce-related models
 class SalesforceCredentials(BaseModel):
     username: str
@@ -138,17 +318,35 @@ class SalesforceCredentials(BaseModel):
 class SalesforceQueryRequest(BaseModel):
     credentials: SalesforceCredentials
     soql_query: str
+    fetch_all: bool = True  # Follow nextRecordsUrl past the first batch
+    max_records: Optional[int] = None
+    include_deleted: bool = False  # queryAll: include deleted and archived records
+    stream: bool = False  # Stream records as NDJSON instead of one JSON response
+    use_cache: bool = True  # Serve repeated queries from the SOQL result cache
 
 class SalesforceQueryResponse(BaseModel):
     success: bool
     data: List[Dict[str, Any]]
     total_size: int
+    done: bool = True
+    from_cache: bool = False  # Every query result came from the SOQL result cache
+    cache_age_seconds: Optional[float] = None  # Age of the oldest cached result used
+    salesforce_usage: Optional[Dict[str, Any]] = None  # API calls made for this request
     message: Optional[str] = None
 
+class SalesforceBulkExtractRequest(BaseModel):
+    credentials: SalesforceCredentials
+    soql_query: str
+    output_format: str = "csv"  # csv, ndjson or parquet
+    include_deleted: bool = False
+    max_records_per_page: Optional[int] = None
+
 class SalesforceAccountOverviewRequest(BaseModel):
     credentials: SalesforceCredentials
     account_name: Optional[str] = None
     account_id: Optional[str] = None
+    max_staleness_seconds: Optional[float] = None  # Answer from the local mirror if it is at most this old
+    use_cache: bool = True  # Serve repeated queries from the SOQL result cache
 
 class SalesforceAccountOverviewResponse(BaseModel):
     success: bool
@@ -156,17 +354,46 @@ class SalesforceAccountOverviewResponse(BaseModel):
     open_opportunities: List[Dict[str, Any]]
     total_pipeline_value: float
     longest_open_opportunity: Dict[str, Any]
+    pipeline_metrics: Optional[Dict[str, Any]] = None  # Weighted pipeline, stage breakdown and aging of the open opportunities
+    from_mirror: bool = False
+    mirror_age_seconds: Optional[float] = None
+    from_cache: bool = False  # Every query result came from the SOQL result cache
+    cache_age_seconds: Optional[float] = None  # Age of the oldest cached result used
+    salesforce_usage: Optional[Dict[str, Any]] = None  # API calls made for this request
     message: Optional[str] = None
 
 class SalesforceGenerateSOQLRequest(BaseModel):
     credentials: SalesforceCredentials
     user_query: str
+    include_explanation: bool = True  # Explain the generated SOQL (runs alongside query execution)
+    max_staleness_seconds: Optional[float] = None  # pipeline-analysis: answer from the local mirror if it is at most this old
+    use_cache: bool = True  # Serve repeated queries from the SOQL result cache
+
+class SalesforcePipelineMetricsRequest(BaseModel):
+    credentials: SalesforceCredentials
+    period: Optional[str] = None  # CloseDate literal such as THIS_QUARTER or LAST_N_DAYS:90; all opportunities when omitted
+    max_staleness_seconds: Optional[float] = None  # Answer from the local mirror if it is at most this old
+    use_cache: bool = True  # Serve repeated queries from the SOQL result cache
+
+class SalesforceMirrorSyncRequest(BaseModel):
+    credentials: SalesforceCredentials
+    full: bool = False  # Reload every object instead of a SystemModstamp delta sync
+    wait: bool = False  # Wait for the sync to finish before responding
+
+class SalesforceResultCacheInvalidateRequest(BaseModel):
+    org_id: str
+    objects: Optional[List[str]] = None  # Objects whose cached results are dropped; the whole org when omitted
+    change_events: Optional[List[Dict[str, Any]]] = None  # Change Data Capture payloads; ChangeEventHeader.entityName is used
 
 class SalesforceGenerateSOQLResponse(BaseModel):
     success: bool
     generated_soql: str
-    explanation: str
+    explanation: Optional[str] = None
+    soql_cache_hit: bool = False  # SOQL reused from a similar earlier request instead of the LLM
     data: Optional[List[Dict[str, Any]]] = None
+    from_cache: bool = False  # Every query result came from the SOQL result cache
+    cache_age_seconds: Optional[float] = None  # Age of the oldest cached result used
+    salesforce_usage: Optional[Dict[str, Any]] = None  # API calls made for this request
     message: Optional[str] = None
 
 # Authentication dependency
@@ -178,10 +405,73 @@ async def verify_api_key(x_api_key: str = Header(...)):
         )
     return x_api_key
 
+async def verify_webhook_secret(x_webhook_secret: str = Header(...)):
+    if not RESEARCH_WEBHOOK_SECRET or not hmac.compare_digest(x_webhook_secret, RESEARCH_WEBHOOK_SECRET):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid webhook secret"
+        )
+    return x_webhook_secret
+
 # Global variables for services
 pinecone_client = None
 pinecone_index = None
 openai_client = None
+async_openai_client = None
+research_job_store = None
+research_sweeper_task = None
+salesforce_mirror_task = None
+http_session = None
+recall_dispatcher = None
+agent_meeting_cache = TTLCache(max_size=AGENT_MEETING_CACHE_SIZE, ttl=AGENT_MEETING_CACHE_TTL_SECONDS)
+agent_meeting_fetches: Dict[int, asyncio.Future] = {}
+# The event loop only holds weak references to tasks, so background prefetches are kept here until they finish
+agent_meeting_prefetches: Set[asyncio.Task] = set()
+account_name_index = TTLCache(max_size=ACCOUNT_NAME_INDEX_SIZE, ttl=ACCOUNT_NAME_INDEX_TTL_SECONDS)
+salesforce_pool = SalesforceSessionPool(
+    idle_ttl=SALESFORCE_SESSION_IDLE_TTL_SECONDS,
+    max_sessions=SALESFORCE_MAX_SESSIONS
+)
+salesforce_executor = SalesforceExecutor(
+    max_workers=SALESFORCE_MAX_WORKERS,
+    per_org_concurrency=SALESFORCE_PER_ORG_CONCURRENCY
+)
+salesforce_schema_cache = SalesforceSchemaCache(
+    cache_dir=SALESFORCE_SCHEMA_CACHE_DIR,
+    ttl=SALESFORCE_SCHEMA_CACHE_TTL_SECONDS
+)
+field_corrector = FieldCorrector(SALESFORCE_FIELD_CORRECTIONS_PATH)
+soql_semantic_cache = SemanticSOQLCache(
+    lambda text: get_embedding_async(text),
+    threshold=SOQL_SEMANTIC_CACHE_THRESHOLD,
+    max_entries_per_org=SOQL_SEMANTIC_CACHE_MAX_ENTRIES_PER_ORG,
+    ttl=SOQL_SEMANTIC_CACHE_TTL_SECONDS
+)
+soql_result_cache = SOQLResultCache(
+    max_entries=SOQL_RESULT_CACHE_SIZE,
+    default_ttl=SOQL_RESULT_CACHE_TTL_SECONDS,
+    object_ttls=SOQL_RESULT_CACHE_OBJECT_TTLS,
+    max_records_per_entry=SOQL_RESULT_CACHE_MAX_RECORDS,
+    revalidate_after=SOQL_RESULT_CACHE_REVALIDATE_AFTER_SECONDS
+) if SOQL_RESULT_CACHE_ENABLED else None
+salesforce_mirror = SalesforceMirror(
+    SALESFORCE_MIRROR_DIR,
+    salesforce_schema_cache,
+    sync_interval=SALESFORCE_MIRROR_SYNC_INTERVAL_SECONDS,
+    # Records a sync picked up make cached query results over the object stale
+    on_change=(lambda org_id, object_name: soql_result_cache.invalidate(org_id, [object_name])) if soql_result_cache else None
+) if SALESFORCE_MIRROR_ENABLED else None
+mirror_snapshot_cache = TTLCache(max_size=100, ttl=SALESFORCE_MIRROR_SYNC_INTERVAL_SECONDS * 2)
+
+# Counters for the shared HTTP client, exposed on /admin/metrics
+http_client_stats = {
+    "requests": 0,
+    "request_errors": 0,
+    "connections_created": 0,
+    "connections_reused": 0,
+    "dns_cache_hits": 0,
+    "dns_cache_misses": 0
+}
 
 def initialize_services():
     """Initialize Pinecone and OpenAI clients"""
@@ -202,6 +492,76 @@ def initialize_services():
         print(f"Error initializing services: {e}")
         raise
 
+def create_http_session() -> aiohttp.ClientSession:
+    """Create the application-wide aiohttp session with connection pooling and a DNS cache"""
+    
+    def count(stat):
+        async def handler(session, trace_config_ctx, params):
+            http_client_stats[stat] += 1
+        return handler
+    
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(count("requests"))
+    trace_config.on_request_exception.append(count("request_errors"))
+    trace_config.on_connection_create_end.append(count("connections_created"))
+    trace_config.on_connection_reuseconn.append(count("connections_reused"))
+    trace_config.on_dns_cache_hit.append(count("dns_cache_hits"))
+    trace_config.on_dns_cache_miss.append(count("dns_cache_misses"))
+    
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_MAX_CONNECTIONS,
+        limit_per_host=HTTP_MAX_CONNECTIONS_PER_HOST,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL_SECONDS,
+        use_dns_cache=True,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT_SECONDS
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=HTTP_TOTAL_TIMEOUT_SECONDS,
+        connect=HTTP_CONNECT_TIMEOUT_SECONDS
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=[trace_config])
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Return the shared aiohttp session (created on startup)"""
+    global http_session
+    if http_session is None or http_session.closed:
+        http_session = create_http_session()
+    return http_session
+
+def get_async_openai_client() -> openai.AsyncOpenAI:
+    """Return the shared async OpenAI client used by the Salesforce tools"""
+    global async_openai_client
+    if async_openai_client is None:
+        async_openai_client = openai.AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    return async_openai_client
+
+def get_http_pool_metrics() -> Dict[str, Any]:
+    """Connection pool utilization of the shared HTTP client"""
+    metrics = {
+        "max_connections": HTTP_MAX_CONNECTIONS,
+        "max_connections_per_host": HTTP_MAX_CONNECTIONS_PER_HOST,
+        "active_connections": 0,
+        "idle_connections": 0,
+        "active_connections_per_host": {},
+        "utilization": 0.0,
+        **http_client_stats
+    }
+    if http_session is None or http_session.closed:
+        return metrics
+    
+    connector = http_session.connector
+    # aiohttp does not expose pool usage publicly, read it from the connector internals
+    acquired = getattr(connector, "_acquired", set())
+    idle = getattr(connector, "_conns", {})
+    acquired_per_host = getattr(connector, "_acquired_per_host", {})
+    metrics["active_connections"] = len(acquired)
+    metrics["idle_connections"] = sum(len(conns) for conns in idle.values())
+    metrics["active_connections_per_host"] = {
+        f"{key.host}:{key.port}": len(conns) for key, conns in acquired_per_host.items() if conns
+    }
+    metrics["utilization"] = round(len(acquired) / HTTP_MAX_CONNECTIONS, 3) if HTTP_MAX_CONNECTIONS else 0.0
+    return metrics
+
 def get_embedding(text: str) -> List[float]:
     """Get embedding vector for text using OpenAI"""
     try:
@@ -214,6 +574,14 @@ def get_embedding(text: str) -> List[float]:
         print(f"Error getting embedding: {e}")
         raise
 
+async def get_embedding_async(text: str) -> List[float]:
+    """Get embedding vector for text using the async OpenAI client"""
+    response = await get_async_openai_client().embeddings.create(
+        model="text-embedding-3-small",
+        input=text
+    )
+    return response.data[0].embedding
+
 def generate_summary_with_gpt(meeting_id: int, title: str, transcription_link: str) -> Dict[str, Any]:
     """Generate summary using GPT-4o-mini when summary is missing"""
     try:
@@ -391,7 +759,52 @@ def safe_str(val):
 # Initialize services on startup
 @app.on_event("startup")
 async def startup_event():
+    global research_job_store, research_sweeper_task, http_session, recall_dispatcher, salesforce_mirror_task
     initialize_services()
+    http_session = create_http_session()
+    
+    recall_dispatcher = RecallNotificationDispatcher(
+        send_recall_chat_message,
+        format_research_bot_message,
+        global_rate=RECALL_GLOBAL_RATE_PER_SECOND,
+        global_burst=RECALL_GLOBAL_BURST,
+        per_bot_rate=RECALL_PER_BOT_RATE_PER_SECOND,
+        per_bot_burst=RECALL_PER_BOT_BURST,
+        max_attempts=RECALL_MAX_SEND_ATTEMPTS,
+        coalesce_window=RECALL_COALESCE_WINDOW_SECONDS
+    )
+    recall_dispatcher.start()
+    
+    # Resume pending research monitoring jobs from the local job store
+    research_job_store = ResearchJobStore(RESEARCH_JOB_DB_PATH, token_key=RESEARCH_JOB_TOKEN_KEY or None)
+    if not RESEARCH_JOB_TOKEN_KEY:
+        print("⚠️ RESEARCH_JOB_TOKEN_KEY is not set: pending research job tokens are stored unencrypted")
+    research_job_store.requeue_interrupted(time.time())
+    pending = research_job_store.pending_count()
+    if pending:
+        print(f"Resuming {pending} pending research monitoring jobs")
+    research_sweeper_task = asyncio.create_task(research_job_sweeper())
+    
+    if salesforce_mirror:
+        salesforce_mirror_task = asyncio.create_task(salesforce_mirror.run())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if recall_dispatcher:
+        await recall_dispatcher.stop()
+    for task in (research_sweeper_task, salesforce_mirror_task):
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    await salesforce_schema_cache.flush()
+    if research_job_store:
+        research_job_store.close()
+    if http_session and not http_session.closed:
+        await http_session.close()
+    salesforce_executor.shutdown()
 
 # Root endpoint
 @app.get("/")
@@ -403,6 +816,26 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "meetings-search-tool-server"}
 
+@app.get("/admin/metrics")
+async def service_metrics(api_key: str = Depends(verify_api_key)):
+    """Runtime metrics for background jobs and outbound HTTP connections"""
+    return {
+        "status": "success",
+        "http_pool": get_http_pool_metrics(),
+        "research_jobs": research_job_store.queue_depth(),
+        "recall_notifications": recall_dispatcher.metrics(),
+        "agent_meeting_cache": agent_meeting_cache.stats(),
+        "account_name_index": account_name_index.stats(),
+        "salesforce_sessions": salesforce_pool.stats(),
+        "salesforce_executor": salesforce_executor.stats(),
+        "salesforce_schema_cache": salesforce_schema_cache.stats(),
+        "soql_field_corrections": field_corrector.stats(),
+        "soql_semantic_cache": soql_semantic_cache.stats(),
+        "soql_result_cache": soql_result_cache.stats() if soql_result_cache else None,
+        "salesforce_mirror": salesforce_mirror.stats() if salesforce_mirror else None,
+        "timestamp": datetime.utcnow().isoformat() + "Z"
+    }
+
 @app.post("/search-meetings", response_model=MeetingSearchResponse)
 async def search_meetings(
     request: MeetingSearchRequest,
@@ -788,121 +1221,232 @@ async def get_company_users(
             detail=f"Error fetching company users: {str(e)}"
         )
 
-async def handle_research_completion_and_bot_notification(
-    request_id: str,
-    user_email: str,
-    token: str,
-    agent_meeting_id: int
-):
+def research_job_to_info(job: Dict[str, Any]) -> ResearchJobInfo:
+    """Convert a job store row to its API representation (the user token is never exposed)"""
+    return ResearchJobInfo(
+        request_id=job['request_id'],
+        user_email=job['user_email'],
+        agent_meeting_id=job['agent_meeting_id'],
+        status=job['status'],
+        attempts=job['attempts'],
+        next_run_at=datetime.utcfromtimestamp(job['next_run_at']).isoformat() + "Z",
+        download_link=job['download_link'],
+        last_error=job['last_error'],
+        created_at=datetime.utcfromtimestamp(job['created_at']).isoformat() + "Z",
+        updated_at=datetime.utcfromtimestamp(job['updated_at']).isoformat() + "Z"
+    )
+
+async def fetch_agent_meeting(agent_meeting_id: int) -> Optional[Dict[str, Any]]:
     """
-    Background task to monitor research completion and notify the bot.
+    Fetch agent meeting metadata from the Herd API.
     """
+    session = get_http_session()
+    get_meeting_url = f"{API_BASE_URL}/agent/meetings/{agent_meeting_id}"
+    get_meeting_headers = {
+        "x-api-key": X_API_KEY
+    }
+    
     try:
-        async with aiohttp.ClientSession() as session:
-            # Step 1: Poll for research completion
-            status_url = f"{API_BASE_URL}/tasks/get-research-status"
-            status_payload = {
-                "requestId": request_id,
-                "email": user_email
-            }
-            status_headers = {
-                "Authorization": token,
-                "Content-Type": "application/json"
-            }
+        async with session.get(
+            get_meeting_url,
+            headers=get_meeting_headers
+        ) as response:
+            if response.status != 200:
+                print(f"Failed to get agent meeting: {await response.text()}")
+                return None
             
-            max_attempts = 180  # 15 minutes max (5 second intervals)
-            attempt = 0
-            download_link = None
-            
-            print(f"Starting background monitoring for research request: {request_id}")
+            meeting_result = await response.json()
+            if not meeting_result.get("success"):
+                print("Failed to get agent meeting data")
+                return None
             
-            while attempt < max_attempts:
-                await asyncio.sleep(5)  # Wait 5 seconds between checks
-                attempt += 1
-                
-                try:
-                    async with session.post(
-                        status_url,
-                        json=status_payload,
-                        headers=status_headers
-                    ) as response:
-                        if response.status != 200:
-                            continue  # Keep trying
-                        
-                        status_result = await response.json()
-                        if not status_result.get("success"):
-                            continue  # Keep trying
-                        
-                        status_list = status_result["data"]["status"]
-                        if "COMPLETED" in status_list:
-                            download_link = status_result["data"]["downloadlink"]
-                            print(f"Research completed for request: {request_id}")
-                            break
-                except Exception as e:
-                    print(f"Error checking research status: {e}")
-                    continue  # Keep trying
-            
-            if not download_link:
+            return meeting_result["data"]
+    except Exception as e:
+        print(f"Error getting agent meeting data: {e}")
+        return None
+
+async def get_agent_meeting(agent_meeting_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Return agent meeting metadata from the TTL cache, fetching it on a miss.
+    Concurrent lookups for the same meeting share a single Herd API request.
+    """
+    meeting = agent_meeting_cache.get(agent_meeting_id)
+    if meeting is not None:
+        return meeting
+    
+    in_flight = agent_meeting_fetches.get(agent_meeting_id)
+    if in_flight is None:
+        in_flight = asyncio.ensure_future(fetch_agent_meeting(agent_meeting_id))
+        agent_meeting_fetches[agent_meeting_id] = in_flight
+        in_flight.add_done_callback(lambda _: agent_meeting_fetches.pop(agent_meeting_id, None))
+    meeting = await asyncio.shield(in_flight)
+    
+    # Only cache meetings that already have a bot, the bot may join after the research starts
+    if meeting and meeting.get("bot_id"):
+        agent_meeting_cache.set(agent_meeting_id, meeting)
+    return meeting
+
+def finish_agent_meeting_prefetch(task: asyncio.Task):
+    """Drop a finished prefetch task, logging its failure (the completion path fetches again)"""
+    agent_meeting_prefetches.discard(task)
+    if not task.cancelled() and task.exception():
+        print(f"Agent meeting prefetch failed: {task.exception()}")
+
+async def get_agent_meeting_bot_id(agent_meeting_id: int) -> Optional[str]:
+    """
+    Look up the Recall.ai bot attached to an agent meeting.
+    """
+    meeting = await get_agent_meeting(agent_meeting_id)
+    if not meeting:
+        return None
+    
+    bot_id = meeting.get("bot_id")
+    if not bot_id:
+        print("No bot_id found in agent meeting data")
+        return None
+    return bot_id
+
+async def send_recall_chat_message(bot_id: str, message: str) -> bool:
+    """
+    Send a chat message through a recall.ai bot. Used by the notification dispatcher.
+    """
+    session = get_http_session()
+    recall_url = f"https://us-west-2.recall.ai/api/v1/bot/{bot_id}/send_chat_message/"
+    recall_payload = {
+        "message": message
+    }
+    recall_headers = {
+        "Authorization": RECALL_API_KEY,
+        "accept": "application/json",
+        "content-type": "application/json"
+    }
+    
+    async with session.post(
+        recall_url,
+        json=recall_payload,
+        headers=recall_headers
+    ) as response:
+        if response.status in [200, 201]:
+            print(f"Successfully sent message to bot {bot_id}")
+            return True
+        print(f"Failed to send message to bot: {await response.text()}")
+        return False
+
+def format_research_bot_message(download_links: List[str]) -> str:
+    """Build one bot chat message for one or more completed research requests"""
+    if len(download_links) == 1:
+        return f"Research is complete. You can download the result here: {download_links[0]}"
+    links = "\n".join(f"- {link}" for link in download_links)
+    return f"{len(download_links)} research requests are complete. You can download the results here:\n{links}"
+
+async def complete_research_job(job: Dict[str, Any], download_link: str) -> Optional[bool]:
+    """
+    Claim a completed research job and queue the bot notification. Returns None if another
+    caller (webhook or fallback sweep) already claimed the job, False if no bot was found.
+    The job is marked completed or failed once the dispatcher delivers or drops the message.
+    """
+    request_id = job['request_id']
+    if not research_job_store.claim_for_notification(request_id, download_link):
+        return None
+    
+    bot_id = await get_agent_meeting_bot_id(job['agent_meeting_id'])
+    if not bot_id:
+        research_job_store.set_status(
+            request_id,
+            JOB_FAILED,
+            error="No bot found for agent meeting",
+            expected_status=JOB_NOTIFYING
+        )
+        return False
+    
+    def on_delivered(success: bool):
+        research_job_store.set_status(
+            request_id,
+            JOB_COMPLETED if success else JOB_FAILED,
+            error=None if success else "Bot notification failed",
+            expected_status=JOB_NOTIFYING
+        )
+    
+    recall_dispatcher.enqueue(bot_id, f"{API_BASE_URL}{download_link}", on_done=on_delivered)
+    return True
+
+async def handle_research_completion_and_bot_notification(job: Dict[str, Any]):
+    """
+    Fallback sweep for a pending research job: check its status once and notify the bot
+    when the research is complete. Jobs that are not complete yet are rescheduled.
+    """
+    request_id = job['request_id']
+    try:
+        session = get_http_session()
+        # Step 1: Check research completion
+        status_url = f"{API_BASE_URL}/tasks/get-research-status"
+        status_payload = {
+            "requestId": request_id,
+            "email": job['user_email']
+        }
+        status_headers = {
+            "Authorization": job['token'],
+            "Content-Type": "application/json"
+        }
+        
+        download_link = None
+        error = None
+        try:
+            async with session.post(
+                status_url,
+                json=status_payload,
+                headers=status_headers
+            ) as response:
+                if response.status != 200:
+                    error = f"Status check returned HTTP {response.status}"
+                else:
+                    status_result = await response.json()
+                    if not status_result.get("success"):
+                        error = "Status check was not successful"
+                    elif "COMPLETED" in status_result["data"]["status"]:
+                        download_link = status_result["data"]["downloadlink"]
+                        print(f"Research completed for request: {request_id}")
+        except Exception as e:
+            print(f"Error checking research status: {e}")
+            error = str(e)
+        
+        if not download_link:
+            if time.time() - job['created_at'] >= RESEARCH_JOB_TIMEOUT_SECONDS:
                 print(f"Research completion timeout for request: {request_id}")
-                return
-            
-            # Step 2: Get bot_id from agent_meetings table
-            get_meeting_url = f"{API_BASE_URL}/agent/meetings/{agent_meeting_id}"
-            get_meeting_headers = {
-                "x-api-key": X_API_KEY
-            }
-            
-            try:
-                async with session.get(
-                    get_meeting_url,
-                    headers=get_meeting_headers
-                ) as response:
-                    if response.status != 200:
-                        print(f"Failed to get agent meeting: {await response.text()}")
-                        return
-                    
-                    meeting_result = await response.json()
-                    if not meeting_result.get("success"):
-                        print("Failed to get agent meeting data")
-                        return
-                    
-                    bot_id = meeting_result["data"]["bot_id"]
-                    if not bot_id:
-                        print("No bot_id found in agent meeting data")
-                        return
-            except Exception as e:
-                print(f"Error getting agent meeting data: {e}")
-                return
-            
-            # Step 3: Send message to recall.ai bot
-            full_download_link = f"{API_BASE_URL}{download_link}"
-            bot_message = f"Research is complete. You can download the result here: {full_download_link}"
-            
-            recall_url = f"https://us-west-2.recall.ai/api/v1/bot/{bot_id}/send_chat_message/"
-            recall_payload = {
-                "message": bot_message
-            }
-            recall_headers = {
-                "Authorization": RECALL_API_KEY,
-                "accept": "application/json",
-                "content-type": "application/json"
-            }
+                research_job_store.set_status(request_id, JOB_FAILED, error="Research completion timeout")
+            else:
+                research_job_store.record_attempt(
+                    request_id,
+                    time.time() + RESEARCH_POLL_INTERVAL_SECONDS,
+                    error
+                )
+            return
+        
+        # Step 2: Notify the meeting bot
+        await complete_research_job(job, download_link)
             
-            try:
-                async with session.post(
-                    recall_url,
-                    json=recall_payload,
-                    headers=recall_headers
-                ) as response:
-                    if response.status in [200, 201]:
-                        print(f"Successfully notified bot {bot_id} about completed research")
-                    else:
-                        print(f"Failed to send message to bot: {await response.text()}")
-            except Exception as e:
-                print(f"Error sending message to recall.ai bot: {e}")
-                
     except Exception as e:
         print(f"Error in background research completion handler: {e}")
+        research_job_store.record_attempt(request_id, time.time() + RESEARCH_POLL_INTERVAL_SECONDS, str(e))
+
+async def research_job_sweeper():
+    """
+    Background loop that picks up due research jobs from the job store and checks them.
+    """
+    print("Research job sweeper started")
+    while True:
+        try:
+            due_jobs = research_job_store.due_jobs(time.time(), RESEARCH_SWEEP_BATCH_SIZE)
+            if due_jobs:
+                await asyncio.gather(
+                    *(handle_research_completion_and_bot_notification(job) for job in due_jobs),
+                    return_exceptions=True
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error in research job sweeper: {e}")
+        await asyncio.sleep(1)
 
 @app.post("/start-research-with-bot-notification", response_model=ResearchResponse)
 async def start_research_with_bot_notification(
@@ -913,52 +1457,65 @@ async def start_research_with_bot_notification(
     Start research and return immediately. Handle completion monitoring and bot notification in background.
     """
     try:
-        async with aiohttp.ClientSession() as session:
-            # Step 1: Start research
-            start_research_url = f"{API_BASE_URL}/tasks/start-research"
-            start_research_payload = {
-                "topic": request.topic,
-                "email": request.user_email
-            }
-            start_research_headers = {
-                "x-api-key": X_API_KEY,
-                "Content-Type": "application/json"
-            }
-            
-            async with session.post(
-                start_research_url,
-                json=start_research_payload,
-                headers=start_research_headers
-            ) as response:
-                if response.status != 200:
-                    raise HTTPException(
-                        status_code=500,
-                        detail=f"Failed to start research: {await response.text()}"
-                    )
-                
-                start_research_result = await response.json()
-                if not start_research_result.get("success"):
-                    raise HTTPException(
-                        status_code=500,
-                        detail="Research start failed"
-                    )
-                
-                request_id = start_research_result["data"]["requestId"]
+        if research_job_store.pending_count() >= MAX_PENDING_RESEARCH_JOBS:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many pending research jobs, please try again later"
+            )
+        
+        session = get_http_session()
+        # Step 1: Start research
+        start_research_url = f"{API_BASE_URL}/tasks/start-research"
+        start_research_payload = {
+            "topic": request.topic,
+            "email": request.user_email
+        }
+        start_research_headers = {
+            "x-api-key": X_API_KEY,
+            "Content-Type": "application/json"
+        }
+        
+        async with session.post(
+            start_research_url,
+            json=start_research_payload,
+            headers=start_research_headers
+        ) as response:
+            if response.status != 200:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Failed to start research: {await response.text()}"
+                )
             
-            # Step 2: Start background task for completion monitoring and bot notification
-            asyncio.create_task(handle_research_completion_and_bot_notification(
-                request_id,
-                request.user_email,
-                request.token,
-                request.agent_meeting_id
-            ))
+            start_research_result = await response.json()
+            if not start_research_result.get("success"):
+                raise HTTPException(
+                    status_code=500,
+                    detail="Research start failed"
+                )
             
-            # Step 3: Return immediately
-            return ResearchResponse(
-                success=True,
-                message="Research started successfully.",
-                research_id=request_id
-            )
+            request_id = start_research_result["data"]["requestId"]
+        
+        # Step 2: Record a durable job for completion monitoring and bot notification
+        research_job_store.add_job(
+            request_id,
+            request.user_email,
+            request.token,
+            request.agent_meeting_id,
+            time.time() + RESEARCH_POLL_INTERVAL_SECONDS
+        )
+        print(f"Starting background monitoring for research request: {request_id}")
+        
+        # Prefetch the meeting's bot so the completion path does not wait on the Herd API
+        prefetch = asyncio.create_task(get_agent_meeting(request.agent_meeting_id))
+        agent_meeting_prefetches.add(prefetch)
+        prefetch.add_done_callback(finish_agent_meeting_prefetch)
+        
+        # Step 3: Return immediately
+        return ResearchResponse(
+            success=True,
+            message="Research started successfully.",
+            research_id=request_id
+        )
     
     except HTTPException:
         # Re-raise HTTP exceptions
@@ -970,9 +1527,96 @@ async def start_research_with_bot_notification(
             detail=f"Failed to start research: {str(e)}"
         )
 
+@app.post("/webhooks/research-complete", response_model=ResearchCompleteWebhookResponse)
+async def research_complete_webhook(
+    request: ResearchCompleteWebhookRequest,
+    secret: str = Depends(verify_webhook_secret)
+):
+    """
+    Called by the research backend when a research request finishes.
+    Notifies the meeting bot immediately instead of waiting for the next status poll.
+    """
+    job = research_job_store.get_job(request.request_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Research job not found")
+    
+    if job['status'] != JOB_PENDING:
+        return ResearchCompleteWebhookResponse(
+            success=True,
+            message=f"Research job is already {job['status']}."
+        )
+    
+    if request.status.upper() != "COMPLETED":
+        research_job_store.set_status(request.request_id, JOB_FAILED, error=f"Research finished with status {request.status}")
+        return ResearchCompleteWebhookResponse(
+            success=True,
+            message=f"Research job marked as failed ({request.status})."
+        )
+    
+    if not request.download_link:
+        raise HTTPException(status_code=400, detail="download_link is required for completed research")
+    
+    print(f"Research completed for request (webhook): {request.request_id}")
+    queued = await complete_research_job(job, request.download_link)
+    
+    if queued is None:
+        return ResearchCompleteWebhookResponse(
+            success=True,
+            message="Research job is already being processed."
+        )
+    
+    return ResearchCompleteWebhookResponse(
+        success=True,
+        message="Bot notification queued for completed research." if queued else "Research job completed but no bot was found to notify.",
+        notification_queued=queued
+    )
+
+# Research job admin endpoints
+@app.get("/admin/research-jobs", response_model=ResearchJobListResponse)
+async def list_research_jobs(
+    status: Optional[str] = None,
+    limit: int = 100,
+    api_key: str = Depends(verify_api_key)
+):
+    """List research monitoring jobs, optionally filtered by status"""
+    jobs = research_job_store.list_jobs(status=status, limit=limit)
+    return ResearchJobListResponse(
+        success=True,
+        jobs=[research_job_to_info(job) for job in jobs],
+        total_found=len(jobs),
+        queue_depth=research_job_store.queue_depth(),
+        timestamp=datetime.utcnow().isoformat() + "Z"
+    )
+
+@app.get("/admin/research-jobs/queue", response_model=ResearchJobQueueResponse)
+async def research_job_queue(api_key: str = Depends(verify_api_key)):
+    """Show research job queue depth by status"""
+    return ResearchJobQueueResponse(
+        success=True,
+        queue_depth=research_job_store.queue_depth(),
+        max_pending_jobs=MAX_PENDING_RESEARCH_JOBS,
+        timestamp=datetime.utcnow().isoformat() + "Z"
+    )
+
+@app.delete("/admin/research-jobs/{request_id}", response_model=ResearchJobCancelResponse)
+async def cancel_research_job(request_id: str, api_key: str = Depends(verify_api_key)):
+    """Cancel a pending research monitoring job"""
+    job = research_job_store.get_job(request_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Research job not found")
+    
+    if not research_job_store.set_status(request_id, JOB_CANCELLED):
+        raise HTTPException(status_code=409, detail=f"Research job is already {job['status']}")
+    
+    return ResearchJobCancelResponse(
+        success=True,
+        message="Research job cancelled.",
+        job=research_job_to_info(research_job_store.get_job(request_id))
+    )
+
 # Salesforce utility functions
-def create_salesforce_connection(credentials: SalesforceCredentials):
-    """Create and authenticate Salesforce connection"""
+async def create_salesforce_connection(credentials: SalesforceCredentials, use_result_cache: bool = False):
+    """Get an authenticated Salesforce connection from the session pool, optionally reading through the SOQL result cache"""
     try:
         # Determine login URL based on environment
         if credentials.is_sandbox:
@@ -980,14 +1624,31 @@ def create_salesforce_connection(credentials: SalesforceCredentials):
         else:
             domain = 'login'
         
-        # Create connection
-        sf = Salesforce(
-            username=credentials.username,
-            password=credentials.password,
-            security_token=credentials.security_token,
-            domain=domain
+        # Reuse a pooled session for these credentials, logging in only when needed.
+        # The login is blocking, so it runs on the Salesforce thread pool.
+        sf = await salesforce_executor.run_unbounded(
+            salesforce_pool.get_session,
+            credentials.username,
+            credentials.password,
+            credentials.security_token,
+            domain
         )
         
+        # Cached results are scoped to the user, since sharing rules and FLS decide what a query returns
+        sf = AsyncSalesforce(
+            sf,
+            salesforce_executor,
+            result_cache=soql_result_cache if use_result_cache else None,
+            username=credentials.username
+        )
+        # Load the org's describe metadata for the common objects ahead of prompt building
+        salesforce_schema_cache.warm_in_background(sf, SALESFORCE_SCHEMA_WARM_OBJECTS)
+        # Resume scheduled syncs for orgs mirrored before a restart (or whose sync session expired),
+        # only when the user who enrolled the org connects
+        if salesforce_mirror and salesforce_mirror.is_enrolled(sf.org_id) \
+                and salesforce_mirror.sync_user(sf.org_id) == sf.username:
+            salesforce_mirror.enroll(sf.org_id, sf.username, salesforce_connector(sf))
+        
         return sf, None
         
     except Exception as e:
@@ -1003,21 +1664,59 @@ def create_salesforce_connection(credentials: SalesforceCredentials):
         
         return None, error_message
 
-def generate_soql_with_llm(user_query: str) -> tuple[str, str]:
-    """Generate SOQL query using OpenAI based on user request"""
+def salesforce_connector(sf: AsyncSalesforce):
+    """
+    Connection factory for background work (mirror syncs) that outlives the request. It keeps the
+    user's session, not their password; once the session expires, background work waits for the
+    user's next request to enroll a fresh one.
+    """
+    background = sf.session_only()
+    async def connect() -> AsyncSalesforce:
+        return background
+    return connect
+
+# Default object fields listed in the LLM prompts. The org's describe metadata replaces
+# these when available, dropping fields that do not exist and adding custom fields.
+SOQL_PROMPT_OBJECT_FIELDS = {
+    "Account": ["Id", "Name", "Type", "Industry", "AnnualRevenue", "NumberOfEmployees", "BillingAddress", "Phone", "Website"],
+    "Contact": ["Id", "Name", "FirstName", "LastName", "Email", "Phone", "AccountId", "Title", "Department"],
+    "Opportunity": ["Id", "Name", "Amount", "StageName", "CloseDate", "Probability", "AccountId", "OwnerId", "Type", "ForecastCategoryName"],
+    "Lead": ["Id", "Name", "FirstName", "LastName", "Email", "Phone", "Company", "Status", "LeadSource"],
+    "Case": ["Id", "CaseNumber", "Subject", "Status", "Priority", "AccountId", "ContactId", "OwnerId"],
+    "Task": ["Id", "Subject", "Status", "Priority", "ActivityDate", "WhoId", "WhatId", "OwnerId"],
+    "Event": ["Id", "Subject", "StartDateTime", "EndDateTime", "WhoId", "WhatId", "OwnerId"]
+}
+AGENTIC_PROMPT_OBJECT_FIELDS = {
+    "Account": ["Id", "Name", "Type", "Industry", "AnnualRevenue", "NumberOfEmployees", "Phone", "Website"],
+    "Contact": ["Id", "Name", "FirstName", "LastName", "Email", "Phone", "AccountId", "Title"],
+    "Opportunity": ["Id", "Name", "Amount", "StageName", "CloseDate", "Probability", "AccountId", "OwnerId", "Type", "CreatedDate"],
+    "Lead": ["Id", "Name", "FirstName", "LastName", "Email", "Phone", "Company", "Status"],
+    "Task": ["Id", "Subject", "Status", "Priority", "ActivityDate", "WhoId", "WhatId"],
+    "Event": ["Id", "Subject", "StartDateTime", "EndDateTime", "WhoId", "WhatId"]
+}
+
+async def get_prompt_object_fields(sf: Optional[AsyncSalesforce], default_fields: Dict[str, List[str]]) -> str:
+    """Object/field lines for an LLM prompt, taken from the org's cached schema when possible"""
+    if sf is None:
+        return format_object_fields(default_fields)
     try:
-        client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        return await salesforce_schema_cache.describe_for_prompt(sf, default_fields)
+    except Exception as e:
+        print(f"Falling back to default prompt fields: {e}")
+        return format_object_fields(default_fields)
+
+async def generate_soql_with_llm(user_query: str, object_fields: Optional[str] = None) -> tuple[str, Optional[str]]:
+    """
+    Generate SOQL query using OpenAI based on user request.
+    Returns the query and, if generation failed, an error note to use as its explanation.
+    """
+    try:
+        client = get_async_openai_client()
         
-        system_prompt = """You are a Salesforce SOQL query generator. Generate accurate SOQL queries based on user requests.
+        system_prompt = f"""You are a Salesforce SOQL query generator. Generate accurate SOQL queries based on user requests.
 
 Common Salesforce objects and fields:
-- Account: Id, Name, Type, Industry, AnnualRevenue, NumberOfEmployees, BillingAddress, Phone, Website
-- Contact: Id, Name, FirstName, LastName, Email, Phone, AccountId, Title, Department
-- Opportunity: Id, Name, Amount, StageName, CloseDate, Probability, AccountId, OwnerId, Type, ForecastCategoryName
-- Lead: Id, Name, FirstName, LastName, Email, Phone, Company, Status, LeadSource
-- Case: Id, CaseNumber, Subject, Status, Priority, AccountId, ContactId, OwnerId
-- Task: Id, Subject, Status, Priority, ActivityDate, WhoId, WhatId, OwnerId
-- Event: Id, Subject, StartDateTime, EndDateTime, WhoId, WhatId, OwnerId
+{object_fields or format_object_fields(SOQL_PROMPT_OBJECT_FIELDS)}
 
 Guidelines:
 1. Always include Id field in SELECT
@@ -1030,7 +1729,7 @@ Generate only the SOQL query, no explanations in the query itself."""
 
         user_prompt = f"Generate a SOQL query for: {user_query}"
         
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model="gpt-4.1",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -1040,80 +1739,227 @@ Generate only the SOQL query, no explanations in the query itself."""
             temperature=0.1
         )
         
-        generated_query = response.choices[0].message.content.strip()
+        return response.choices[0].message.content.strip(), None
         
-        # Generate explanation
-        explanation_prompt = f"Explain what this SOQL query does in business terms: {generated_query}"
-        explanation_response = client.chat.completions.create(
+    except Exception as e:
+        return f"SELECT Id FROM Account LIMIT 1", f"Error generating query: {str(e)}"
+
+async def explain_soql_with_llm(soql_query: str) -> str:
+    """Explain a SOQL query in business terms"""
+    try:
+        response = await get_async_openai_client().chat.completions.create(
             model="gpt-4.1",
             messages=[
                 {"role": "system", "content": "Explain SOQL queries in simple business terms."},
-                {"role": "user", "content": explanation_prompt}
+                {"role": "user", "content": f"Explain what this SOQL query does in business terms: {soql_query}"}
             ],
             max_tokens=200,
             temperature=0.3
         )
-        
-        explanation = explanation_response.choices[0].message.content.strip()
-        
-        return generated_query, explanation
-        
+        return response.choices[0].message.content.strip()
     except Exception as e:
-        return f"SELECT Id FROM Account LIMIT 1", f"Error generating query: {str(e)}"
+        return f"Error generating explanation: {str(e)}"
+
+async def generate_soql_for_request(sf: Optional[AsyncSalesforce], user_query: str) -> tuple[str, Optional[str], bool]:
+    """
+    SOQL for a natural-language request: a similar earlier request from the semantic cache
+    (re-validated against the schema), otherwise the LLM.
+    Returns the query, a note used instead of an LLM explanation (cache hits and generation
+    errors) and whether it came from the cache.
+    """
+    if sf is not None:
+        hit = await soql_semantic_cache.lookup(sf.org_id, user_query)
+        if hit:
+            validation = await validate_soql_query(sf, hit["soql"])
+            if validation["valid"]:
+                print(f"♻️ SOQL cache hit ({hit['similarity']}): '{user_query}' ~ '{hit['matched_request']}'")
+                return validation["query"], f"Reused the query generated for a similar request: \"{hit['matched_request']}\"", True
+    
+    object_fields = await get_prompt_object_fields(sf, SOQL_PROMPT_OBJECT_FIELDS)
+    generated_query, explanation_note = await generate_soql_with_llm(user_query, object_fields)
+    return generated_query, explanation_note, False
+
+async def remember_generated_soql(sf: AsyncSalesforce, user_query: str, soql_query: str, explanation_note: Optional[str], from_cache: bool):
+    """Store an LLM-generated query in the semantic cache once it has executed successfully"""
+    if explanation_note or from_cache:
+        return
+    await soql_semantic_cache.store(sf.org_id, user_query, soql_query)
+
+def start_soql_explanation(soql_query: str, note: Optional[str], include_explanation: bool) -> Optional[asyncio.Task]:
+    """Start explaining the query in the background so it runs concurrently with query execution"""
+    if note or not include_explanation:
+        return None
+    return asyncio.create_task(explain_soql_with_llm(soql_query))
+
+async def finish_soql_explanation(task: Optional[asyncio.Task], note: Optional[str]) -> Optional[str]:
+    if task is None:
+        return note
+    return await task
 
 # Salesforce endpoints
 @app.post("/salesforce/query", response_model=SalesforceQueryResponse)
 async def salesforce_query(request: SalesforceQueryRequest, api_key: str = Depends(verify_api_key)):
-    """Execute a SOQL query against Salesforce"""
+    """Execute a SOQL query against Salesforce, following queryMore batches and optionally streaming NDJSON"""
     try:
         # Create Salesforce connection
-        sf, error = create_salesforce_connection(request.credentials)
+        sf, error = await create_salesforce_connection(request.credentials, use_result_cache=request.use_cache)
         if error:
             print(f"❌ Salesforce connection failed: {error}")
             raise HTTPException(status_code=400, detail=error)
         
-        # Execute query
-        result = sf.query(request.soql_query)
+        # Execute query; the first batch is fetched before responding so errors still map to HTTP errors
+        batches = sf.iter_query_batches(
+            request.soql_query,
+            include_deleted=request.include_deleted,
+            follow=request.fetch_all
+        )
+        first_batch = await batches.__anext__()
+        total_size = first_batch['totalSize']
+        
+        async def iter_records():
+            returned = 0
+            batch = first_batch
+            try:
+                while True:
+                    for record in batch['records']:
+                        if request.max_records is not None and returned >= request.max_records:
+                            return
+                        returned += 1
+                        yield record
+                    batch = await batches.__anext__()
+            except StopAsyncIteration:
+                return
+            finally:
+                await batches.aclose()
+        
+        if request.stream:
+            async def ndjson_lines():
+                try:
+                    async for record in iter_records():
+                        yield json.dumps(record, default=str) + "\n"
+                except Exception as e:
+                    yield json.dumps({"error": f"Failed to execute Salesforce query: {str(e)}"}) + "\n"
+            
+            return StreamingResponse(
+                ndjson_lines(),
+                media_type="application/x-ndjson",
+                headers={
+                    "X-Total-Size": str(total_size),
+                    "X-From-Cache": "true" if sf.cache_report()["from_cache"] else "false"
+                }
+            )
+        
+        records = [record async for record in iter_records()]
+        done = len(records) >= total_size
         
         return SalesforceQueryResponse(
             success=True,
-            data=result['records'],
-            total_size=result['totalSize'],
-            message=f"Query executed successfully. Found {result['totalSize']} records."
+            data=records,
+            total_size=total_size,
+            done=done,
+            **sf.cache_report(),
+            salesforce_usage=sf.usage_report(),
+            message=f"Query executed successfully. Found {total_size} records, returned {len(records)}."
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to execute Salesforce query: {str(e)}"
         )
 
+BULK_OUTPUT_FORMATS = {
+    "csv": ("text/csv", iter_csv_bytes),
+    "ndjson": ("application/x-ndjson", iter_ndjson),
+    "parquet": ("application/vnd.apache.parquet", iter_parquet)
+}
+
+@app.post("/salesforce/bulk-extract")
+async def salesforce_bulk_extract(request: SalesforceBulkExtractRequest, api_key: str = Depends(verify_api_key)):
+    """Export a large query with Bulk API 2.0, streaming the result as CSV, NDJSON or Parquet"""
+    try:
+        if request.output_format not in BULK_OUTPUT_FORMATS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported output_format '{request.output_format}', use one of: {', '.join(BULK_OUTPUT_FORMATS)}"
+            )
+        if request.output_format == "parquet" and pa is None:
+            raise HTTPException(status_code=400, detail="Parquet output requires the pyarrow package")
+        
+        # Create Salesforce connection
+        sf, error = await create_salesforce_connection(request.credentials)
+        if error:
+            raise HTTPException(status_code=400, detail=error)
+        
+        client = BulkQueryClient(
+            get_http_session(),
+            SALESFORCE_BULK_INSTANCE_URL or f"https://{sf.sf_instance}",
+            sf.session_id,
+            sf.sf_version,
+            poll_interval=SALESFORCE_BULK_POLL_INTERVAL_SECONDS,
+            timeout=SALESFORCE_BULK_TIMEOUT_SECONDS
+        )
+        
+        # Run the job to completion before responding so job failures map to HTTP errors
+        job_id = await client.create_job(request.soql_query, include_deleted=request.include_deleted)
+        print(f"📦 Bulk query job {job_id} created")
+        job = await client.wait_for_job(job_id)
+        print(f"✅ Bulk query job {job_id} complete: {job.get('numberRecordsProcessed')} records")
+        
+        media_type, convert = BULK_OUTPUT_FORMATS[request.output_format]
+        return StreamingResponse(
+            convert(client.iter_result_pages(job_id, request.max_records_per_page)),
+            media_type=media_type,
+            headers={
+                "Content-Disposition": f'attachment; filename="{job_id}.{request.output_format}"',
+                "X-Bulk-Job-Id": job_id,
+                "X-Total-Size": str(job.get("numberRecordsProcessed", ""))
+            }
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to run bulk extract: {str(e)}"
+        )
+
 @app.post("/salesforce/generate-soql", response_model=SalesforceGenerateSOQLResponse)
 async def salesforce_generate_soql(request: SalesforceGenerateSOQLRequest, api_key: str = Depends(verify_api_key)):
     """Generate SOQL query using LLM and optionally execute it"""
     try:
-        # Generate SOQL query
-        generated_query, explanation = generate_soql_with_llm(request.user_query)
-        
         # Create Salesforce connection
-        sf, error = create_salesforce_connection(request.credentials)
+        sf, error = await create_salesforce_connection(request.credentials, use_result_cache=request.use_cache)
+        
+        # Generate SOQL query against the org's schema (default fields if the connection failed)
+        generated_query, explanation_note, soql_cache_hit = await generate_soql_for_request(sf, request.user_query)
+        # The explanation is only needed for the response, so it is generated while the query runs
+        explanation_task = start_soql_explanation(generated_query, explanation_note, request.include_explanation)
+        
         if error:
             return SalesforceGenerateSOQLResponse(
                 success=False,
                 generated_soql=generated_query,
-                explanation=explanation,
+                explanation=await finish_soql_explanation(explanation_task, explanation_note),
                 message=f"Query generated but connection failed: {error}"
             )
         
         try:
             # Execute the generated query
-            result = sf.query(generated_query)
+            result = await sf.query(generated_query)
+            await remember_generated_soql(sf, request.user_query, generated_query, explanation_note, soql_cache_hit)
             
             return SalesforceGenerateSOQLResponse(
                 success=True,
                 generated_soql=generated_query,
-                explanation=explanation,
+                explanation=await finish_soql_explanation(explanation_task, explanation_note),
+                soql_cache_hit=soql_cache_hit,
                 data=result['records'],
+                **sf.cache_report(),
+                salesforce_usage=sf.usage_report(),
                 message=f"Query generated and executed successfully. Found {result['totalSize']} records."
             )
             
@@ -1121,7 +1967,10 @@ async def salesforce_generate_soql(request: SalesforceGenerateSOQLRequest, api_k
             return SalesforceGenerateSOQLResponse(
                 success=False,
                 generated_soql=generated_query,
-                explanation=explanation,
+                explanation=await finish_soql_explanation(explanation_task, explanation_note),
+                soql_cache_hit=soql_cache_hit,
+                **sf.cache_report(),
+                salesforce_usage=sf.usage_report(),
                 message=f"Query generated but execution failed: {str(query_error)}"
             )
         
@@ -1131,50 +1980,258 @@ async def salesforce_generate_soql(request: SalesforceGenerateSOQLRequest, api_k
             detail=f"Failed to generate SOQL query: {str(e)}"
         )
 
-@app.post("/salesforce/account-overview", response_model=SalesforceAccountOverviewResponse)
-async def salesforce_account_overview(request: SalesforceAccountOverviewRequest, api_key: str = Depends(verify_api_key)):
-    """Get comprehensive account overview including opportunities and pipeline"""
+@app.post("/salesforce/mirror/sync")
+async def salesforce_mirror_sync(request: SalesforceMirrorSyncRequest, api_key: str = Depends(verify_api_key)):
+    """Enroll an org in the local mirror and sync it (a full load the first time, SystemModstamp deltas after)"""
     try:
+        if salesforce_mirror is None:
+            raise HTTPException(status_code=400, detail="The Salesforce mirror is disabled (set SALESFORCE_MIRROR_ENABLED=true)")
+        
         # Create Salesforce connection
-        sf, error = create_salesforce_connection(request.credentials)
+        sf, error = await create_salesforce_connection(request.credentials)
         if error:
             raise HTTPException(status_code=400, detail=error)
         
-        # Find account
-        account_query = ""
-        if request.account_id:
-            account_query = f"SELECT Id, Name, Type, Industry, AnnualRevenue, NumberOfEmployees, Phone, Website, BillingAddress FROM Account WHERE Id = '{request.account_id}'"
-        elif request.account_name:
-            account_query = f"SELECT Id, Name, Type, Industry, AnnualRevenue, NumberOfEmployees, Phone, Website, BillingAddress FROM Account WHERE Name LIKE '%{request.account_name}%' LIMIT 1"
+        # Scheduled syncs run as this user from now on; a mirror synced as someone else is reloaded in full
+        salesforce_mirror.enroll(sf.org_id, sf.username, salesforce_connector(sf))
+        if request.wait:
+            await salesforce_mirror.sync(sf, full=request.full)
         else:
-            raise HTTPException(status_code=400, detail="Either account_id or account_name must be provided")
+            salesforce_mirror.sync_in_background(sf, full=request.full)
         
-        account_result = sf.query(account_query)
-        if not account_result['records']:
-            raise HTTPException(status_code=404, detail="Account not found")
+        return {
+            "success": True,
+            "mirror": salesforce_mirror.status(sf.org_id),
+            "message": "Mirror synced." if request.wait else "Mirror sync started."
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to sync Salesforce mirror: {str(e)}"
+        )
+
+@app.post("/salesforce/result-cache/invalidate")
+async def salesforce_result_cache_invalidate(request: SalesforceResultCacheInvalidateRequest, api_key: str = Depends(verify_api_key)):
+    """Drop cached SOQL results for an org, e.g. when a Change Data Capture subscriber sees changes"""
+    try:
+        if soql_result_cache is None:
+            raise HTTPException(status_code=400, detail="The SOQL result cache is disabled (set SOQL_RESULT_CACHE_ENABLED=true)")
+        
+        objects = None
+        if request.objects is not None or request.change_events is not None:
+            objects = list(request.objects or [])
+            objects += [
+                event["ChangeEventHeader"]["entityName"]
+                for event in request.change_events or []
+                if event.get("ChangeEventHeader", {}).get("entityName")
+            ]
+        # Cache keys use the 15 character org id
+        invalidated = soql_result_cache.invalidate(request.org_id[:15], objects)
+        
+        return {
+            "success": True,
+            "invalidated": invalidated,
+            "message": f"Invalidated {invalidated} cached query results."
+        }
         
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to invalidate SOQL result cache: {str(e)}"
+        )
+
+ACCOUNT_OVERVIEW_ACCOUNT_FIELDS = ["Id", "Name", "Type", "Industry", "AnnualRevenue", "NumberOfEmployees", "Phone", "Website", "BillingAddress"]
+ACCOUNT_OVERVIEW_OPPORTUNITY_FIELDS = ["Id", "Name", "Amount", "StageName", "CloseDate", "Probability", "Owner.Name", "Type", "ForecastCategoryName", "CreatedDate"]
+
+def mirror_age_within(sf: AsyncSalesforce, object_names: List[str], max_staleness_seconds: Optional[float]) -> Optional[float]:
+    """Age of the org's mirror of these objects if the caller accepts it and may read it, otherwise None (query live)"""
+    if salesforce_mirror is None or max_staleness_seconds is None:
+        return None
+    # The mirror holds what its sync user can see, so other users only read it with org-wide visibility
+    if sf.username not in SALESFORCE_MIRROR_ORG_WIDE_USERS and salesforce_mirror.synced_as(sf.org_id, object_names) != sf.username:
+        return None
+    age = salesforce_mirror.age(sf.org_id, object_names)
+    if age is None or age > max_staleness_seconds:
+        return None
+    return age
+
+def get_mirror_opportunity_snapshot(org_id: str) -> OpportunitySnapshot:
+    """Opportunity snapshot of the org mirror, rebuilt only after the mirror has synced"""
+    key = (org_id, salesforce_mirror.synced_at(org_id, "Opportunity"))
+    snapshot = mirror_snapshot_cache.get(key)
+    if snapshot is None:
+        snapshot = OpportunitySnapshot.from_columns(salesforce_mirror.table(org_id, "Opportunity").columns)
+        mirror_snapshot_cache.set(key, snapshot)
+    return snapshot
+
+def account_overview_from_mirror(org_id: str, account_id: Optional[str], account_name: Optional[str]) -> tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Find the account and its open opportunities (oldest first) in the local mirror"""
+    accounts = salesforce_mirror.table(org_id, "Account")
+    opportunities = salesforce_mirror.table(org_id, "Opportunity")
+    ids = accounts.columns["Id"]
+    if account_id:
+        # 15 character ids match the first 15 characters of the 18 character form
+        rows = [row for row, record_id in enumerate(ids) if record_id[:15] == account_id[:15]]
+    else:
+        names = [(name or "").lower() for name in accounts.columns["Name"]]
+        target = account_name.lower()
+        rows = [row for row, name in enumerate(names) if name == target] or [row for row, name in enumerate(names) if target in name]
+    if not rows:
+        return None, []
+    account = accounts.records(ACCOUNT_OVERVIEW_ACCOUNT_FIELDS, rows[:1])[0]
+    
+    opp_rows = [
+        row for row, (opp_account_id, is_closed) in enumerate(zip(opportunities.columns["AccountId"], opportunities.columns["IsClosed"]))
+        if opp_account_id == account["Id"] and not is_closed
+    ]
+    opp_rows.sort(key=lambda row: opportunities.columns["CreatedDate"][row] or "")
+    return account, opportunities.records(ACCOUNT_OVERVIEW_OPPORTUNITY_FIELDS, opp_rows)
+
+def is_opportunities_subquery_error(error: SalesforceError) -> bool:
+    """Whether Salesforce rejected the Opportunities child relationship itself, rather than the session, limits or filter"""
+    for item in error.content if isinstance(error.content, list) else []:
+        code, message = item.get('errorCode'), item.get('message') or ''
+        if code == 'INVALID_TYPE' or (code == 'MALFORMED_QUERY' and 'Opportunities' in message):
+            return True
+    return False
+
+async def fetch_account_with_open_opportunities(sf: AsyncSalesforce, account_filter: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetch an account and its open opportunities (oldest first) in one parent-child query.
+    The opportunities are returned in the record's "Opportunities" list.
+    """
+    query = f"""
+        SELECT {', '.join(ACCOUNT_OVERVIEW_ACCOUNT_FIELDS)},
+            (SELECT {', '.join(ACCOUNT_OVERVIEW_OPPORTUNITY_FIELDS)}
+             FROM Opportunities
+             WHERE IsClosed = false
+             ORDER BY CreatedDate ASC)
+        FROM Account
+        WHERE {account_filter}
+        LIMIT 1
+    """
+    try:
+        result = await sf.query(query)
+    except SalesforceError as e:
+        # Some orgs reject the child subquery (e.g. restricted Opportunity access through the
+        # relationship); fall back to the two independent queries in one Composite Batch call.
+        # Any other failure would fail the fallback the same way, so it is raised as is.
+        if not is_opportunities_subquery_error(e):
+            raise
+        print(f"Parent-child account query failed, querying account and opportunities separately: {e}")
+        account_result, opportunities_result = await sf.query_many([
+            f"SELECT {', '.join(ACCOUNT_OVERVIEW_ACCOUNT_FIELDS)} FROM Account WHERE {account_filter} LIMIT 1",
+            f"""
+                SELECT AccountId, {', '.join(ACCOUNT_OVERVIEW_OPPORTUNITY_FIELDS)}
+                FROM Opportunity
+                WHERE AccountId IN (SELECT Id FROM Account WHERE {account_filter}) AND IsClosed = false
+                ORDER BY CreatedDate ASC
+            """
+        ], fetch_all=True)
+        for result in (account_result, opportunities_result):
+            if isinstance(result, Exception):
+                raise result
+        if not account_result['records']:
+            return None
         account = account_result['records'][0]
-        account_id = account['Id']
-        
-        # Get open opportunities for this account
-        opp_query = f"""
-            SELECT Id, Name, Amount, StageName, CloseDate, Probability, Owner.Name, Type, ForecastCategoryName, CreatedDate
-            FROM Opportunity 
-            WHERE AccountId = '{account_id}' 
-            AND IsClosed = false 
-            ORDER BY CreatedDate ASC
-        """
+        account['Opportunities'] = [
+            {name: value for name, value in opp.items() if name != 'AccountId'}
+            for opp in opportunities_result['records'] if opp['AccountId'] == account['Id']
+        ]
+        return account
+    if not result['records']:
+        return None
+    
+    account = result['records'][0]
+    children = account.get('Opportunities') or {'records': [], 'done': True}
+    opportunities = list(children['records'])
+    # Large child result sets are paged like top-level queries
+    while not children.get('done', True) and children.get('nextRecordsUrl'):
+        children = await sf.query_more(children['nextRecordsUrl'])
+        opportunities.extend(children['records'])
+    account['Opportunities'] = opportunities
+    return account
+
+# SOSL hits considered when resolving a partial account name
+ACCOUNT_NAME_SEARCH_HITS = 5
+
+def best_account_match(search_records: List[Dict[str, Any]], account_name: str) -> Dict[str, Any]:
+    """The hit whose name equals the searched name (ignoring case and spacing), else SOSL's most relevant hit"""
+    target = " ".join(account_name.lower().split())
+    for record in search_records:
+        if " ".join((record.get('Name') or '').lower().split()) == target:
+            return record
+    return search_records[0]
+
+async def find_account_by_name(sf: AsyncSalesforce, account_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Resolve an account by name with its open opportunities. Names seen before are
+    looked up by Id from the name index (one API call); new names try an exact (indexed)
+    Name match, which is also one call, and then a SOSL search, replacing the unindexable
+    LIKE '%name%'. A partial name is three calls (exact match, search, fetch by Id) the
+    first time and one call once it is in the index.
+    """
+    key = (sf.org_id, account_name.strip().lower())
+    account_id = account_name_index.get(key)
+    if account_id:
+        account = await fetch_account_with_open_opportunities(sf, f"Id = '{escape_soql_string(account_id)}'")
+        if account:
+            return account
+    
+    account = await fetch_account_with_open_opportunities(sf, f"Name = '{escape_soql_string(account_name.strip())}'")
+    if account is None:
+        found = await sf.search(
+            # No ORDER BY: hits stay in SOSL relevance order, so "Acme" beats "Acme Analytics"
+            f"FIND {{{escape_sosl_term(account_name.strip())}}} IN NAME FIELDS "
+            f"RETURNING Account(Id, Name LIMIT {ACCOUNT_NAME_SEARCH_HITS})"
+        )
+        search_records = found.get('searchRecords') or [] if isinstance(found, dict) else []
+        if not search_records:
+            return None
+        match = best_account_match(search_records, account_name)
+        account = await fetch_account_with_open_opportunities(sf, f"Id = '{escape_soql_string(match['Id'])}'")
+    if account:
+        account_name_index.set(key, account['Id'])
+    return account
+
+@app.post("/salesforce/account-overview", response_model=SalesforceAccountOverviewResponse)
+async def salesforce_account_overview(request: SalesforceAccountOverviewRequest, api_key: str = Depends(verify_api_key)):
+    """Get comprehensive account overview including opportunities and pipeline"""
+    try:
+        if not request.account_id and not request.account_name:
+            raise HTTPException(status_code=400, detail="Either account_id or account_name must be provided")
         
-        opportunities_result = sf.query(opp_query)
-        opportunities = opportunities_result['records']
+        # Create Salesforce connection
+        sf, error = await create_salesforce_connection(request.credentials, use_result_cache=request.use_cache)
+        if error:
+            raise HTTPException(status_code=400, detail=error)
         
-        # Calculate total pipeline value
-        total_pipeline = sum(float(opp.get('Amount', 0) or 0) for opp in opportunities)
+        mirror_age = mirror_age_within(sf, ["Account", "Opportunity"], request.max_staleness_seconds)
+        if mirror_age is not None:
+            print(f"🪞 Account overview from the local mirror ({mirror_age:.0f}s old)")
+            account, opportunities = account_overview_from_mirror(sf.org_id, request.account_id, request.account_name)
+            if account is None:
+                raise HTTPException(status_code=404, detail="Account not found")
+        else:
+            # Account and open opportunities come back together from one parent-child query
+            if request.account_id:
+                account = await fetch_account_with_open_opportunities(sf, f"Id = '{escape_soql_string(request.account_id)}'")
+            else:
+                account = await find_account_by_name(sf, request.account_name)
+            if account is None:
+                raise HTTPException(status_code=404, detail="Account not found")
+            opportunities = account.pop('Opportunities')
         
-        # Find longest open opportunity
-        longest_open_opp = {}
-        if opportunities:
-            longest_open_opp = min(opportunities, key=lambda x: x['CreatedDate'])
+        # Pipeline totals, oldest open opportunity and breakdowns in vectorized passes over one snapshot
+        snapshot = OpportunitySnapshot.from_records(opportunities)
+        total_pipeline = snapshot.total_amount()
+        oldest = snapshot.oldest_index()
+        longest_open_opp = opportunities[oldest] if oldest is not None else {}
         
         return SalesforceAccountOverviewResponse(
             success=True,
@@ -1182,6 +2239,15 @@ async def salesforce_account_overview(request: SalesforceAccountOverviewRequest,
             open_opportunities=opportunities,
             total_pipeline_value=total_pipeline,
             longest_open_opportunity=longest_open_opp,
+            pipeline_metrics={
+                "weighted_pipeline": snapshot.weighted_pipeline(),
+                "by_stage": snapshot.group_totals("stage"),
+                "aging_buckets": snapshot.aging_buckets()
+            },
+            from_mirror=mirror_age is not None,
+            mirror_age_seconds=round(mirror_age, 1) if mirror_age is not None else None,
+            **sf.cache_report(),
+            salesforce_usage=sf.usage_report(),
             message=f"Account overview retrieved successfully. {len(opportunities)} open opportunities found."
         )
         
@@ -1198,48 +2264,70 @@ async def salesforce_pipeline_analysis(request: SalesforceGenerateSOQLRequest, a
     """Analyze sales pipeline data by stage, rep, or time period"""
     try:
         # Create Salesforce connection
-        sf, error = create_salesforce_connection(request.credentials)
+        sf, error = await create_salesforce_connection(request.credentials, use_result_cache=request.use_cache)
         if error:
             raise HTTPException(status_code=400, detail=error)
         
-        # Generate appropriate pipeline analysis query
-        pipeline_queries = {
-            "pipeline by stage": """
-                SELECT StageName, COUNT(Id) opportunity_count, SUM(Amount) total_value
-                FROM Opportunity 
-                WHERE IsClosed = false 
-                GROUP BY StageName 
-                ORDER BY SUM(Amount) DESC
-            """,
-            "quarterly pipeline": """
-                SELECT CALENDAR_QUARTER(CloseDate) quarter, COUNT(Id) opportunity_count, SUM(Amount) total_value
-                FROM Opportunity 
-                WHERE IsClosed = false AND CloseDate = THIS_YEAR
-                GROUP BY CALENDAR_QUARTER(CloseDate) 
-                ORDER BY CALENDAR_QUARTER(CloseDate)
-            """,
-            "rep performance": """
-                SELECT Owner.Name, COUNT(Id) opportunity_count, SUM(Amount) total_pipeline
-                FROM Opportunity 
-                WHERE IsClosed = false 
-                GROUP BY Owner.Name 
-                ORDER BY SUM(Amount) DESC
-                LIMIT 20
-            """
-        }
+        # Common dashboard intents are answered from pre-validated templates; the rest go to the LLM
+        template = match_pipeline_template(request.user_query)
+        
+        # Template intents can be computed from the local mirror when the caller accepts its age
+        mirror_age = mirror_age_within(sf, ["Opportunity"], request.max_staleness_seconds) if template else None
+        if mirror_age is not None:
+            records = evaluate_pipeline_template(template, get_mirror_opportunity_snapshot(sf.org_id))
+            if records is not None:
+                print(f"🪞 Pipeline template '{template['intent']}' answered from the local mirror ({mirror_age:.0f}s old)")
+                return {
+                    "success": True,
+                    "generated_soql": template["soql"],
+                    "explanation": template["description"],
+                    "soql_cache_hit": False,
+                    "template_intent": template["intent"],
+                    "from_mirror": True,
+                    "mirror_age_seconds": round(mirror_age, 1),
+                    "data": records,
+                    "total_size": len(records),
+                    **sf.cache_report(),
+                    "salesforce_usage": sf.usage_report(),
+                    "message": f"Pipeline analysis completed from the local mirror. Found {len(records)} records."
+                }
         
-        # Generate SOQL query based on user request
-        generated_query, explanation = generate_soql_with_llm(request.user_query)
+        if template:
+            validation = await validate_soql_query(sf, template["soql"])
+            if not validation["valid"]:
+                print(f"Pipeline template '{template['intent']}' does not fit this org: {validation['errors']}")
+                template = None
         
-        # Execute the generated query
-        result = sf.query(generated_query)
+        if template:
+            print(f"📐 Pipeline template matched: {template['intent']}")
+            generated_query, explanation_note, soql_cache_hit = validation["query"], template["description"], False
+        else:
+            # Generate SOQL query based on user request
+            generated_query, explanation_note, soql_cache_hit = await generate_soql_for_request(sf, request.user_query)
+        explanation_task = start_soql_explanation(generated_query, explanation_note, request.include_explanation)
+        
+        # Execute the generated query while the explanation is generated
+        try:
+            result = await sf.query(generated_query)
+            await remember_generated_soql(sf, request.user_query, generated_query, explanation_note, soql_cache_hit)
+        except BaseException:
+            if explanation_task:
+                explanation_task.cancel()
+            raise
+        explanation = await finish_soql_explanation(explanation_task, explanation_note)
         
         return {
             "success": True,
             "generated_soql": generated_query,
             "explanation": explanation,
+            "soql_cache_hit": soql_cache_hit,
+            "template_intent": template["intent"] if template else None,
+            "from_mirror": False,
+            "mirror_age_seconds": None,
             "data": result['records'],
             "total_size": result['totalSize'],
+            **sf.cache_report(),
+            "salesforce_usage": sf.usage_report(),
             "message": f"Pipeline analysis completed successfully. Found {result['totalSize']} records."
         }
         
@@ -1249,42 +2337,92 @@ async def salesforce_pipeline_analysis(request: SalesforceGenerateSOQLRequest, a
             detail=f"Failed to analyze pipeline: {str(e)}"
         )
 
+@app.post("/salesforce/pipeline-metrics")
+async def salesforce_pipeline_metrics(request: SalesforcePipelineMetricsRequest, api_key: str = Depends(verify_api_key)):
+    """Pipeline breakdowns, weighted pipeline, aging and win rates computed from one Opportunity snapshot"""
+    try:
+        period = request.period.upper() if request.period else None
+        if period and not re.fullmatch(r"[A-Z_]+(:\d+)?", period):
+            raise HTTPException(status_code=400, detail=f"Invalid period '{request.period}', use a date literal such as THIS_QUARTER")
+        
+        # Create Salesforce connection
+        sf, error = await create_salesforce_connection(request.credentials, use_result_cache=request.use_cache)
+        if error:
+            raise HTTPException(status_code=400, detail=error)
+        
+        # The mirror can answer calendar periods; fiscal and relative (N-day) literals are queried live
+        mirror_age = mirror_age_within(sf, ["Opportunity"], request.max_staleness_seconds)
+        close_date_range = date_literal_range(period, datetime.utcnow().date()) if period else None
+        if mirror_age is not None and (period is None or close_date_range):
+            snapshot = get_mirror_opportunity_snapshot(sf.org_id)
+        else:
+            mirror_age, close_date_range = None, None
+            soql = f"SELECT {', '.join(SNAPSHOT_FIELDS)} FROM Opportunity"
+            if period:
+                soql += f" WHERE CloseDate = {period}"
+            records = []
+            async for batch in sf.iter_query_batches(soql):
+                records.extend(batch['records'])
+            snapshot = OpportunitySnapshot.from_records(records)
+        
+        return {
+            "success": True,
+            "period": period,
+            "metrics": snapshot.summary(close_date_range),
+            "from_mirror": mirror_age is not None,
+            "mirror_age_seconds": round(mirror_age, 1) if mirror_age is not None else None,
+            **sf.cache_report(),
+            "salesforce_usage": sf.usage_report(),
+            "message": f"Pipeline metrics computed from {snapshot.size} opportunities."
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to compute pipeline metrics: {str(e)}"
+        )
+
 @app.post("/salesforce/opportunity-details")
 async def salesforce_opportunity_details(request: SalesforceGenerateSOQLRequest, api_key: str = Depends(verify_api_key)):
     """Get detailed information about specific opportunities"""
     try:
         # Create Salesforce connection
-        sf, error = create_salesforce_connection(request.credentials)
+        sf, error = await create_salesforce_connection(request.credentials, use_result_cache=request.use_cache)
         if error:
             raise HTTPException(status_code=400, detail=error)
         
         # Generate SOQL for opportunity details
-        generated_query, explanation = generate_soql_with_llm(request.user_query)
+        generated_query, explanation_note, soql_cache_hit = await generate_soql_for_request(sf, request.user_query)
+        explanation_task = start_soql_explanation(generated_query, explanation_note, request.include_explanation)
         
-        # Execute the generated query
-        result = sf.query(generated_query)
-        
-        # If specific opportunity requested, get additional details like activities
-        opportunities = result['records']
+        # Execute the generated query (and fetch activities) while the explanation is generated
+        try:
+            result = await sf.query(generated_query)
+            await remember_generated_soql(sf, request.user_query, generated_query, explanation_note, soql_cache_hit)
+            
+            # If specific opportunity requested, get additional details like activities
+            opportunities = result['records']
+            activities = await fetch_recent_activities(sf, opportunities)
+        except BaseException:
+            if explanation_task:
+                explanation_task.cancel()
+            raise
+        explanation = await finish_soql_explanation(explanation_task, explanation_note)
         for opp in opportunities:
             if 'Id' in opp:
-                # Get recent activities for this opportunity
-                activity_query = f"""
-                    SELECT Id, Subject, Status, Priority, ActivityDate, Owner.Name
-                    FROM Task 
-                    WHERE WhatId = '{opp['Id']}' 
-                    ORDER BY ActivityDate DESC 
-                    LIMIT 10
-                """
-                activities = sf.query(activity_query)
-                opp['recent_activities'] = activities['records']
+                opp['recent_activities'] = activities.get(opp['Id'], [])
         
         return {
             "success": True,
             "generated_soql": generated_query,
             "explanation": explanation,
+            "soql_cache_hit": soql_cache_hit,
             "data": opportunities,
             "total_size": result['totalSize'],
+            **sf.cache_report(),
+            "salesforce_usage": sf.usage_report(),
             "message": f"Opportunity details retrieved successfully. Found {result['totalSize']} opportunities."
         }
         
@@ -1298,6 +2436,9 @@ async def salesforce_opportunity_details(request: SalesforceGenerateSOQLRequest,
 class SalesforceAgenticRequest(BaseModel):
     credentials: SalesforceCredentials
     user_query: str
+    use_cache: bool = True  # Serve repeated queries from the SOQL result cache
+    planner_mode: Optional[str] = None  # "one_shot" or "iterative"; AGENTIC_PLANNER_MODE when omitted
+    deadline_seconds: Optional[float] = None  # Time budget for the whole request; AGENTIC_DEADLINE_SECONDS when omitted
 
 class SalesforceAgenticResponse(BaseModel):
     success: bool
@@ -1305,19 +2446,39 @@ class SalesforceAgenticResponse(BaseModel):
     queries_executed: List[str]
     errors_encountered: List[str]
     corrections_made: List[str]
+    from_cache: bool = False  # Every query result came from the SOQL result cache
+    cache_age_seconds: Optional[float] = None  # Age of the oldest cached result used
+    salesforce_usage: Optional[Dict[str, Any]] = None  # API calls made for this request
+    llm_usage: Optional[Dict[str, Any]] = None  # LLM completions and tokens used for this request
+    deadline: Optional[Dict[str, Any]] = None  # Time budget, seconds per phase and the phase that ran out of time
     message: str
 
+class SalesforceAgenticStreamRequest(SalesforceAgenticRequest):
+    event_format: str = "ndjson"  # "ndjson" (one JSON event per line) or "sse" (text/event-stream)
+
 # Agentic Salesforce Tool Implementation
 # Agentic Salesforce Tool Implementation - FIXED VERSION
 # Sequential Reasoning Agentic Salesforce Tool Implementation
-async def salesforce_agentic_handler(credentials: SalesforceCredentials, user_query: str) -> SalesforceAgenticResponse:
+async def salesforce_agentic_handler(
+    credentials: SalesforceCredentials,
+    user_query: str,
+    use_cache: bool = True,
+    planner_mode: Optional[str] = None,
+    on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    deadline_seconds: Optional[float] = None
+) -> SalesforceAgenticResponse:
     """
-    Intelligent Salesforce agent with sequential reasoning and step-by-step execution
+    Intelligent Salesforce agent that plans, then executes the plan steps in dependency order (independent steps concurrently).
+    In one-shot mode the plan already contains each step's SOQL, so the LLM is only called again for steps that fail.
+    `on_event(event_type, data)` receives progress events as they happen, and the final analysis token by token.
+    Every LLM and Salesforce call is bounded by the budget of its phase (plan, execute, analysis); when one runs
+    out, the steps that finished are analyzed (or returned raw) instead of spending more time and tokens.
     """
+    planner_mode = planner_mode or AGENTIC_PLANNER_MODE
     print("\n" + "="*80)
     print("🚀 SALESFORCE AGENTIC TOOL STARTED")
     print("="*80)
-    print(f"📝 User Query: {user_query}")
+    print(f"📝 User Query: {user_query} (planner: {planner_mode})")
     print(f"🔐 Credentials: {credentials.username} ({'sandbox' if credentials.is_sandbox else 'production'})")
     print("-"*80)
     
@@ -1326,11 +2487,71 @@ async def salesforce_agentic_handler(credentials: SalesforceCredentials, user_qu
     errors_encountered = []
     corrections_made = []
     final_result = {}
+    sf = None
+    llm_usage = {"planner_mode": planner_mode, "completions": 0, "prompt_tokens": 0, "completion_tokens": 0}
+    deadline = RequestDeadline(deadline_seconds or AGENTIC_DEADLINE_SECONDS, AGENTIC_PHASE_BUDGETS.get(planner_mode, AGENTIC_PHASE_BUDGETS["iterative"]))
+    deadline.start_phase("plan")
+    
+    async def complete(**kwargs):
+        """Chat completion that adds its token usage to llm_usage"""
+        response = await deadline.run(client.chat.completions.create(**kwargs))
+        llm_usage["completions"] += 1
+        if getattr(response, "usage", None):
+            llm_usage["prompt_tokens"] += response.usage.prompt_tokens
+            llm_usage["completion_tokens"] += response.usage.completion_tokens
+        return response
+    
+    def emit(event_type: str, **data):
+        if on_event:
+            on_event(event_type, data)
+    
+    def add_correction(step_number: int, correction: str):
+        corrections_made.append(f"Step {step_number}: {correction}")
+        emit("correction_applied", step_number=step_number, correction=correction)
+    
+    async def complete_streamed(event_type: str, **kwargs) -> str:
+        """Chat completion text; streamed as `event_type` events when there is a listener"""
+        if not on_event:
+            response = await complete(**kwargs)
+            return response.choices[0].message.content
+        
+        async def stream_text() -> str:
+            stream = await client.chat.completions.create(**kwargs, stream=True, stream_options={"include_usage": True})
+            llm_usage["completions"] += 1
+            parts = []
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    emit(event_type, text=chunk.choices[0].delta.content)
+                if getattr(chunk, "usage", None):
+                    llm_usage["prompt_tokens"] += chunk.usage.prompt_tokens
+                    llm_usage["completion_tokens"] += chunk.usage.completion_tokens
+            return "".join(parts)
+        
+        return await deadline.run(stream_text())
+    
+    async def run_query(step_number: int, query: str) -> Dict[str, Any]:
+        """sf.query, reported with its row count and latency"""
+        started = time.perf_counter()
+        result = await deadline.run(sf.query(query))
+        emit(
+            "query_executed",
+            step_number=step_number,
+            query=query,
+            row_count=result["totalSize"],
+            latency_ms=round((time.perf_counter() - started) * 1000, 1)
+        )
+        return result
+    
+    def record_deadline_exceeded(e: DeadlineExceeded):
+        print(f"⏰ {e}")
+        errors_encountered.append(str(e))
+        emit("deadline_exceeded", phase=e.phase, elapsed_seconds=round(e.elapsed, 3))
     
     try:
         # Create Salesforce connection
         print("🔌 Creating Salesforce connection...")
-        sf, error = create_salesforce_connection(credentials)
+        sf, error = await deadline.run(create_salesforce_connection(credentials, use_result_cache=use_cache))
         if error:
             return SalesforceAgenticResponse(
                 success=False,
@@ -1339,6 +2560,7 @@ async def salesforce_agentic_handler(credentials: SalesforceCredentials, user_qu
                 queries_executed=[],
                 errors_encountered=[error],
                 corrections_made=[],
+                deadline=deadline.report(),
                 message=f"Failed to connect to Salesforce: {error}"
             )
         
@@ -1346,7 +2568,8 @@ async def salesforce_agentic_handler(credentials: SalesforceCredentials, user_qu
         print("-"*60)
         
         # Step 1: Generate COMPLETE reasoning plan upfront
-        client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        client = get_async_openai_client()
+        object_fields = await deadline.run(get_prompt_object_fields(sf, AGENTIC_PROMPT_OBJECT_FIELDS))
         
         reasoning_prompt = f"""
         You are a Salesforce expert agent. Create a COMPLETE step-by-step reasoning plan to answer this user query.
@@ -1354,12 +2577,7 @@ async def salesforce_agentic_handler(credentials: SalesforceCredentials, user_qu
         User Query: "{user_query}"
         
         Available Salesforce objects and fields:
-        - Account: Id, Name, Type, Industry, AnnualRevenue, NumberOfEmployees, Phone, Website
-        - Contact: Id, Name, FirstName, LastName, Email, Phone, AccountId, Title
-        - Opportunity: Id, Name, Amount, StageName, CloseDate, Probability, AccountId, OwnerId, Type, CreatedDate
-        - Lead: Id, Name, FirstName, LastName, Email, Phone, Company, Status
-        - Task: Id, Subject, Status, Priority, ActivityDate, WhoId, WhatId
-        - Event: Id, Subject, StartDateTime, EndDateTime, WhoId, WhatId
+{object_fields}
         
         Create a JSON response with:
         {{
@@ -1369,41 +2587,66 @@ async def salesforce_agentic_handler(credentials: SalesforceCredentials, user_qu
                     "step_description": "Find the account by name",
                     "query_purpose": "Get account ID for further queries",
                     "expected_outcome": "Account ID and basic info",
-                    "fallback_if_fails": "Try broader name search"
+                    "fallback_if_fails": "Try broader name search",
+                    "depends_on": []
                 }},
                 {{
                     "step_number": 2,
-                    "step_description": "Get all opportunities for the account",
+                    "step_description": "Get all open opportunities for the account",
                     "query_purpose": "Retrieve opportunity data",
                     "expected_outcome": "List of opportunities with amounts and stages",
-                    "fallback_if_fails": "Check if account has any opportunities"
+                    "fallback_if_fails": "Check if account has any opportunities",
+                    "depends_on": [1]
+                }},
+                {{
+                    "step_number": 3,
+                    "step_description": "Get the contacts of the account",
+                    "query_purpose": "Identify the people involved",
+                    "expected_outcome": "List of contacts with titles",
+                    "fallback_if_fails": "Check if account has any contacts",
+                    "depends_on": [1]
                 }}
             ],
             "success_criteria": "What data is needed to fully answer the user's question",
             "potential_challenges": ["What could go wrong", "How to handle each challenge"]
         }}
         
-        Make the reasoning plan COMPLETE and SEQUENTIAL - each step should build on the previous one.
+        Make the reasoning plan COMPLETE. "depends_on" lists the step_numbers whose results (IDs, names)
+        a step needs; steps that do not need each other's results must not depend on each other, so they can run in parallel.
         Format as valid JSON only.
         """
+        if planner_mode == "one_shot":
+            reasoning_prompt += """
+        Also give every step a "soql" field with the exact SOQL query that accomplishes it:
+        - One query per step, using only the objects and fields listed above
+        - For open opportunities: WHERE IsClosed = false
+        - When a step needs a value found by an earlier step, use the bind variable :account_id, :account_name or
+          :opportunity_id for it and list that step in depends_on; it is filled in from the earlier step's results
+        - When the value only filters records, prefer a semi-join (AccountId IN (SELECT Id FROM Account WHERE Name = 'Acme'))
+          so the step does not depend on another step
+        """
         
         print("🤖 Calling GPT-4 to generate reasoning plan...")
-        reasoning_response = client.chat.completions.create(
-            model="gpt-4.1",
-            messages=[{"role": "user", "content": reasoning_prompt}],
-            max_tokens=1000,
-            temperature=0.1
-        )
-        
         try:
+            reasoning_response = await complete(
+                model="gpt-4.1",
+                messages=[{"role": "user", "content": reasoning_prompt}],
+                max_tokens=2000 if planner_mode == "one_shot" else 1000,
+                temperature=0.1,
+                **({"response_format": {"type": "json_object"}} if planner_mode == "one_shot" else {})
+            )
             full_reasoning_plan = json.loads(reasoning_response.choices[0].message.content)
             print("✅ Reasoning plan generated successfully!")
             print(f"📋 Plan has {len(full_reasoning_plan.get('reasoning_plan', []))} steps")
             for step in full_reasoning_plan.get('reasoning_plan', []):
                 print(f"   Step {step.get('step_number', '?')}: {step.get('step_description', 'Unknown')}")
+                if step.get('soql'):
+                    print(f"      SOQL: {step['soql']}")
             reasoning_steps.append({"step": "complete_reasoning_generated", "plan": full_reasoning_plan})
-        except json.JSONDecodeError:
-            # Fallback reasoning plan
+        except (json.JSONDecodeError, DeadlineExceeded) as e:
+            # Fallback reasoning plan, also used when planning runs out of time so the request still gets an answer
+            if isinstance(e, DeadlineExceeded):
+                record_deadline_exceeded(e)
             full_reasoning_plan = {
                 "reasoning_plan": [
                     {
@@ -1411,41 +2654,84 @@ async def salesforce_agentic_handler(credentials: SalesforceCredentials, user_qu
                         "step_description": "Find account by extracting name from query",
                         "query_purpose": "Get account ID",
                         "expected_outcome": "Account record with ID",
-                        "fallback_if_fails": "Try partial name search"
+                        "fallback_if_fails": "Try partial name search",
+                        "depends_on": []
                     }
                 ],
                 "success_criteria": "Find relevant data for user query",
                 "potential_challenges": ["Name variations", "No data found"]
             }
-            reasoning_steps.append({"step": "fallback_reasoning_used", "details": "JSON parse failed, using basic plan"})
+            reasoning_steps.append({
+                "step": "fallback_reasoning_used",
+                "details": "Planning ran out of time, using basic plan" if isinstance(e, DeadlineExceeded) else "JSON parse failed, using basic plan"
+            })
         
-        print("\n⚡ STEP 2: SEQUENTIAL EXECUTION OF REASONING PLAN")
+        print("\n⚡ STEP 2: EXECUTING REASONING PLAN (DEPENDENCY ORDER)")
         print("-"*60)
         
-        # Step 2: Execute reasoning plan step by step
-        current_data = {}
-        context_data = {}
-        plan_steps = full_reasoning_plan.get("reasoning_plan", [])
+        # Step 2: Execute the plan as a DAG; steps whose dependencies are done run concurrently
+        deadline.start_phase("execute")
+        plan_steps = normalize_plan(full_reasoning_plan.get("reasoning_plan", []))
+        full_reasoning_plan["reasoning_plan"] = plan_steps
+        emit(
+            "plan_generated",
+            planner_mode=planner_mode,
+            steps=plan_steps,
+            critical_path_steps=critical_path_length(plan_steps),
+            success_criteria=full_reasoning_plan.get("success_criteria")
+        )
         
         reasoning_steps.append({
-            "step": "starting_sequential_execution", 
+            "step": "starting_plan_execution", 
             "total_steps_planned": len(plan_steps),
+            "critical_path_steps": critical_path_length(plan_steps),
             "plan_overview": [step["step_description"] for step in plan_steps]
         })
         
-        print(f"\nExecuting {len(plan_steps)} reasoning steps sequentially...")
+        print(f"\nExecuting {len(plan_steps)} reasoning steps ({critical_path_length(plan_steps)} on the critical path, up to {AGENTIC_MAX_PARALLEL_STEPS} at a time)...")
         
-        for step_info in plan_steps:
+        # Planned queries of steps without dependencies are ready now, so they share Composite Batch round trips
+        prefetched_results = {}
+        prefetch_latency_ms = 0.0
+        if planner_mode == "one_shot":
+            root_queries = {}
+            try:
+                for step in plan_steps:
+                    if step.get("soql") and not step["depends_on"]:
+                        validation = await deadline.run(validate_soql_query(sf, clean_soql_query(step["soql"], {}), {}))
+                        if validation["valid"]:
+                            root_queries[step["step_number"]] = validation["query"]
+                if len(root_queries) > 1:
+                    started = time.perf_counter()
+                    results = await deadline.run(sf.query_many(list(root_queries.values())))
+                    prefetch_latency_ms = round((time.perf_counter() - started) * 1000, 1)
+                    prefetched_results = {number: (query, result) for (number, query), result in zip(root_queries.items(), results)}
+                    print(f"📦 Prefetched {len(prefetched_results)} independent planned queries")
+            except DeadlineExceeded:
+                # The steps themselves stop at their first call and keep what finished
+                pass
+        
+        async def execute_step(step_info: Dict[str, Any], dependency_results: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+            """Run one plan step, starting from the data and context collected by the steps it depends on"""
             step_number = step_info["step_number"]
-            print(f"\n🎯 Executing Step {step_number}: {step_info['step_description']}")
-            print(f"   Purpose: {step_info.get('query_purpose', 'Not specified')}")
             step_description = step_info["step_description"]
+            print(f"\n🎯 Executing Step {step_number}: {step_description}")
+            print(f"   Purpose: {step_info.get('query_purpose', 'Not specified')}")
+            emit("step_started", step_number=step_number, description=step_description, depends_on=step_info["depends_on"])
+            
+            # Later dependencies (in plan order) override earlier ones, as in sequential execution
+            step_data = {}
+            step_context = {}
+            for dependency_result in dependency_results.values():
+                step_data.update(dependency_result["data"])
+                step_context.update(dependency_result["context"])
             
             reasoning_steps.append({
                 "step": f"executing_reasoning_step_{step_number}",
                 "description": step_description,
                 "purpose": step_info.get("query_purpose", ""),
-                "expected": step_info.get("expected_outcome", "")
+                "expected": step_info.get("expected_outcome", ""),
+                "depends_on": step_info["depends_on"]
             })
             
             # Generate query for this specific reasoning step
@@ -1453,42 +2739,48 @@ async def salesforce_agentic_handler(credentials: SalesforceCredentials, user_qu
             max_attempts_per_step = 5  # Max attempts per reasoning step
             attempt = 0
             
+            planned_query = step_info.get("soql") if planner_mode == "one_shot" else None
+            
             while not step_success and attempt < max_attempts_per_step:
                 attempt += 1
                 
-                query_generation_prompt = f"""
-                Current reasoning step: {step_number}
-                Step description: {step_description}
-                Query purpose: {step_info.get('query_purpose', '')}
-                Expected outcome: {step_info.get('expected_outcome', '')}
-                
-                User query: {user_query}
-                Previous data collected: {str(current_data)[:600]}
-                Available context (IDs, names, etc.): {str(context_data)[:400]}
-                Attempt number: {attempt}
-                
-                Generate ONE SOQL query to accomplish this specific reasoning step.
-                
-                RULES:
-                - Generate only ONE query for this step
-                - NO bind variables (:variable) - use actual values
-                - Use context data when available (account IDs, etc.)
-                - For open opportunities: WHERE IsClosed = false
-                - Include all fields needed for this step
-                
-                Previous errors in this step: {[e for e in errors_encountered if f"step_{step_number}" in str(e)][-2:]}
-                
-                Return only the SOQL query, nothing else.
-                """
-                
-                query_response = client.chat.completions.create(
-                    model="gpt-4.1",
-                    messages=[{"role": "user", "content": query_generation_prompt}],
-                    max_tokens=300,
-                    temperature=0.1
-                )
-                
-                generated_query = query_response.choices[0].message.content.strip()
+                if attempt == 1 and planned_query:
+                    # One-shot mode: the first attempt uses the query from the plan
+                    generated_query = planned_query
+                else:
+                    query_generation_prompt = f"""
+                    Current reasoning step: {step_number}
+                    Step description: {step_description}
+                    Query purpose: {step_info.get('query_purpose', '')}
+                    Expected outcome: {step_info.get('expected_outcome', '')}
+                    
+                    User query: {user_query}
+                    Previous data collected: {str(step_data)[:600]}
+                    Available context (IDs, names, etc.): {str(step_context)[:400]}
+                    Attempt number: {attempt}
+                    
+                    Generate ONE SOQL query to accomplish this specific reasoning step.
+                    
+                    RULES:
+                    - Generate only ONE query for this step
+                    - NO bind variables (:variable) - use actual values
+                    - Use context data when available (account IDs, etc.)
+                    - For open opportunities: WHERE IsClosed = false
+                    - Include all fields needed for this step
+                    
+                    Previous errors in this step: {[e for e in errors_encountered if f"step_{step_number}" in str(e)][-2:]}
+                    
+                    Return only the SOQL query, nothing else.
+                    """
+                    
+                    query_response = await complete(
+                        model="gpt-4.1",
+                        messages=[{"role": "user", "content": query_generation_prompt}],
+                        max_tokens=300,
+                        temperature=0.1
+                    )
+                    
+                    generated_query = query_response.choices[0].message.content.strip()
                 
                 # Clean and validate the query
                 if not generated_query.upper().startswith('SELECT'):
@@ -1504,8 +2796,33 @@ async def salesforce_agentic_handler(credentials: SalesforceCredentials, user_qu
                     continue
                 
                 # Clean query
-                cleaned_query = clean_soql_query(generated_query, context_data)
-                print(f"�� Generated query: {cleaned_query}")
+                cleaned_query = clean_soql_query(generated_query, step_context)
+                print(f"🔍 Step {step_number} generated query: {cleaned_query}")
+                
+                # Validate locally against the org schema so malformed queries never cost an API call
+                validation = await deadline.run(validate_soql_query(sf, cleaned_query, step_context))
+                if validation["corrections"]:
+                    add_correction(step_number, f"Corrected locally ({'; '.join(validation['corrections'])})")
+                    print(f"🔧 Corrected locally: {validation['query']}")
+                if not validation["valid"]:
+                    print(f"🚫 Rejected locally: {'; '.join(validation['errors'])}")
+                    errors_encountered.append(f"step_{step_number}_attempt_{attempt}: Local validation failed: {'; '.join(validation['errors'])}")
+                    emit("query_failed", step_number=step_number, attempt=attempt, query=cleaned_query, error=f"Local validation failed: {'; '.join(validation['errors'])}")
+                    reasoning_steps.append({
+                        "step": f"step_{step_number}_validation_failed",
+                        "attempt": attempt,
+                        "errors": validation["errors"],
+                        "query": cleaned_query
+                    })
+                    continue
+                cleaned_query = validation["query"]
+                emit(
+                    "query_generated",
+                    step_number=step_number,
+                    attempt=attempt,
+                    query=cleaned_query,
+                    source="plan" if attempt == 1 and planned_query else "llm"
+                )
                 
                 reasoning_steps.append({
                     "step": f"step_{step_number}_attempt_{attempt}",
@@ -1515,39 +2832,43 @@ async def salesforce_agentic_handler(credentials: SalesforceCredentials, user_qu
                 
                 # Execute the query
                 try:
-                    print("⏳ Executing query...")
-                    result = sf.query(cleaned_query)
-                    print(f"✅ Query executed! Found {result['totalSize']} records")
+                    print(f"⏳ Executing step {step_number} query...")
+                    prefetched = prefetched_results.pop(step_number, None) if attempt == 1 else None
+                    if prefetched and prefetched[0] == cleaned_query:
+                        result = prefetched[1]
+                        if isinstance(result, Exception):
+                            raise result
+                        emit(
+                            "query_executed",
+                            step_number=step_number,
+                            query=cleaned_query,
+                            row_count=result["totalSize"],
+                            latency_ms=prefetch_latency_ms,
+                            batched=True
+                        )
+                    else:
+                        result = await run_query(step_number, cleaned_query)
+                    print(f"✅ Step {step_number} query executed! Found {result['totalSize']} records")
                     queries_executed.append(cleaned_query)
+                    field_corrector.record_success(sf.org_id, validation["field_corrections"])
                     
                     # Store results for this step
                     step_key = f"step_{step_number}_result"
-                    current_data[step_key] = {
+                    step_data[step_key] = {
                         "step_description": step_description,
                         "query": cleaned_query,
                         "records": result['records'],
                         "total_size": result['totalSize']
                     }
                     
-                    # Extract context data for next steps
-                    if result['records']:
-                        for record in result['records']:
-                            if 'Id' in record:
-                                if record['Id'].startswith('001'):  # Account ID
-                                    context_data['account_id'] = record['Id']
-                                elif record['Id'].startswith('006'):  # Opportunity ID
-                                    context_data['opportunity_id'] = record['Id']
-                            if 'Name' in record:
-                                if 'account_name' not in context_data:
-                                    context_data['account_name'] = record['Name']
-                            if 'AccountId' in record:
-                                context_data['account_id'] = record['AccountId']
+                    # Extract context data for dependent steps
+                    extract_record_context(result['records'], step_context)
                     
                     step_success = True
                     reasoning_steps.append({
                         "step": f"step_{step_number}_success",
                         "records_found": result['totalSize'],
-                        "context_extracted": list(context_data.keys())
+                        "context_extracted": list(step_context.keys())
                     })
                     
                     # If no records found, might still be success depending on the query type
@@ -1557,10 +2878,13 @@ async def salesforce_agentic_handler(credentials: SalesforceCredentials, user_qu
                             "details": "Query executed successfully but no records found"
                         })
                     
+                except DeadlineExceeded:
+                    raise
                 except Exception as e:
                     error_msg = str(e)
-                    print(f"❌ Query failed: {error_msg[:100]}...")
+                    print(f"❌ Step {step_number} query failed: {error_msg[:100]}...")
                     errors_encountered.append(f"step_{step_number}_attempt_{attempt}: {error_msg}")
+                    emit("query_failed", step_number=step_number, attempt=attempt, query=cleaned_query, error=error_msg)
                     
                     reasoning_steps.append({
                         "step": f"step_{step_number}_error",
@@ -1571,42 +2895,49 @@ async def salesforce_agentic_handler(credentials: SalesforceCredentials, user_qu
                     
                     # Try to fix the error
                     if "MALFORMED_QUERY" in error_msg or "bind variables" in error_msg.lower():
-                        fixed_query = fix_bind_variables(cleaned_query, context_data)
+                        fixed_query = fix_bind_variables(cleaned_query, step_context)
                         if fixed_query != cleaned_query:
-                            corrections_made.append(f"Step {step_number}: Fixed bind variables")
+                            add_correction(step_number, "Fixed bind variables")
                             print("🔧 Fixed bind variables in query")
                             try:
-                                result = sf.query(fixed_query)
+                                result = await run_query(step_number, fixed_query)
                                 queries_executed.append(fixed_query)
-                                current_data[f"step_{step_number}_result"] = {
+                                step_data[f"step_{step_number}_result"] = {
                                     "step_description": step_description,
                                     "query": fixed_query,
                                     "records": result['records'],
                                     "total_size": result['totalSize']
                                 }
+                                extract_record_context(result['records'], step_context)
                                 step_success = True
-                                corrections_made.append(f"Step {step_number}: Successfully fixed and executed query")
+                                add_correction(step_number, "Successfully fixed and executed query")
                                 break
-                            except:
+                            except DeadlineExceeded:
+                                raise
+                            except Exception:
                                 pass
                     
                     elif "INVALID_FIELD" in error_msg:
-                        corrected_query = await fix_invalid_field_error(cleaned_query, error_msg, sf)
+                        corrected_query, field_corrections = await deadline.run(fix_invalid_field_error(cleaned_query, error_msg, sf))
                         if corrected_query != cleaned_query:
-                            corrections_made.append(f"Step {step_number}: Fixed invalid field")
+                            add_correction(step_number, f"Fixed invalid field ({', '.join(c['field'] + ' -> ' + c['replacement'] for c in field_corrections)})")
                             print("🔧 Fixed invalid field in query")
                             try:
-                                result = sf.query(corrected_query)
+                                result = await run_query(step_number, corrected_query)
                                 queries_executed.append(corrected_query)
-                                current_data[f"step_{step_number}_result"] = {
+                                field_corrector.record_success(sf.org_id, field_corrections)
+                                step_data[f"step_{step_number}_result"] = {
                                     "step_description": step_description,
                                     "query": corrected_query,
                                     "records": result['records'],
                                     "total_size": result['totalSize']
                                 }
+                                extract_record_context(result['records'], step_context)
                                 step_success = True
                                 break
-                            except:
+                            except DeadlineExceeded:
+                                raise
+                            except Exception:
                                 pass
             
             # If step failed completely, try fallback
@@ -1623,13 +2954,13 @@ async def salesforce_agentic_handler(credentials: SalesforceCredentials, user_qu
                 Original step failed: {step_description}
                 Fallback strategy: {fallback_description}
                 User query: {user_query}
-                Context available: {str(context_data)}
+                Context available: {str(step_context)}
                 
                 Generate a broader/simpler SOQL query as fallback.
                 Return only the SOQL query.
                 """
                 
-                fallback_response = client.chat.completions.create(
+                fallback_response = await complete(
                     model="gpt-4.1",
                     messages=[{"role": "user", "content": fallback_prompt}],
                     max_tokens=200,
@@ -1640,22 +2971,52 @@ async def salesforce_agentic_handler(credentials: SalesforceCredentials, user_qu
                 
                 try:
                     if fallback_query.upper().startswith('SELECT'):
-                        fallback_query = clean_soql_query(fallback_query, context_data)
-                        result = sf.query(fallback_query)
+                        fallback_query = clean_soql_query(fallback_query, step_context)
+                        validation = await deadline.run(validate_soql_query(sf, fallback_query, step_context))
+                        if not validation["valid"]:
+                            raise ValueError(f"Local validation failed: {'; '.join(validation['errors'])}")
+                        fallback_query = validation["query"]
+                        emit("query_generated", step_number=step_number, attempt=attempt + 1, query=fallback_query, source="fallback")
+                        result = await run_query(step_number, fallback_query)
                         queries_executed.append(fallback_query)
-                        current_data[f"step_{step_number}_fallback_result"] = {
+                        field_corrector.record_success(sf.org_id, validation["field_corrections"])
+                        step_data[f"step_{step_number}_fallback_result"] = {
                             "step_description": f"{step_description} (fallback)",
                             "query": fallback_query,
                             "records": result['records'],
                             "total_size": result['totalSize']
                         }
-                        corrections_made.append(f"Step {step_number}: Used fallback strategy successfully")
+                        extract_record_context(result['records'], step_context)
+                        add_correction(step_number, "Used fallback strategy successfully")
                         print("🔄 Fallback strategy worked!")
-                except:
+                except DeadlineExceeded:
+                    raise
+                except Exception:
                     reasoning_steps.append({
                         "step": f"step_{step_number}_fallback_failed",
                         "details": "Fallback strategy also failed"
                     })
+            
+            own_results = {key: value for key, value in step_data.items() if key.startswith(f"step_{step_number}_")}
+            emit("step_completed", step_number=step_number, success=bool(own_results), results=own_results)
+            completed_steps[step_number] = {"data": step_data, "context": step_context}
+            return completed_steps[step_number]
+        
+        completed_steps = {}
+        try:
+            await run_plan(plan_steps, execute_step, max_parallel=AGENTIC_MAX_PARALLEL_STEPS)
+        except DeadlineExceeded as e:
+            # Steps still running are cancelled; the analysis works with the ones that finished
+            record_deadline_exceeded(e)
+            print(f"⏰ Continuing with {len(completed_steps)} of {len(plan_steps)} steps completed")
+        
+        # Merge what every completed step collected, in plan order
+        current_data = {}
+        context_data = {}
+        for step in plan_steps:
+            if step["step_number"] in completed_steps:
+                current_data.update(completed_steps[step["step_number"]]["data"])
+                context_data.update(completed_steps[step["step_number"]]["context"])
         
         print("\n📊 STEP 3: ANALYZING COLLECTED DATA")
         print("-"*60)
@@ -1663,6 +3024,7 @@ async def salesforce_agentic_handler(credentials: SalesforceCredentials, user_qu
         print(f"🎯 Context data: {context_data}")
         
         # Step 3: Analyze all collected data and generate comprehensive response
+        deadline.start_phase("analysis")
         reasoning_steps.append({
             "step": "analyzing_collected_data",
             "total_data_points": len(current_data),
@@ -1676,7 +3038,7 @@ async def salesforce_agentic_handler(credentials: SalesforceCredentials, user_qu
             Complete reasoning plan that was executed:
             {json.dumps(full_reasoning_plan, indent=2)[:1000]}
             
-            Data collected from sequential execution:
+            Data collected from plan execution:
             {json.dumps(current_data, default=str, indent=2)[:2500]}
             
             Context extracted:
@@ -1694,15 +3056,15 @@ async def salesforce_agentic_handler(credentials: SalesforceCredentials, user_qu
             """
             
             print("🤖 Generating final analysis with GPT-4...")
-            analysis_response = client.chat.completions.create(
-                model="gpt-4.1",
-                messages=[{"role": "user", "content": analysis_prompt}],
-                max_tokens=800,
-                temperature=0.2
-            )
-            
             try:
-                final_analysis = json.loads(analysis_response.choices[0].message.content)
+                analysis_content = await complete_streamed(
+                    "analysis_token",
+                    model="gpt-4.1",
+                    messages=[{"role": "user", "content": analysis_prompt}],
+                    max_tokens=800,
+                    temperature=0.2
+                )
+                final_analysis = json.loads(analysis_content)
                 print("✅ Final analysis generated successfully!")
                 print(f"💡 Answer: {final_analysis.get('answer', 'No answer')[:100]}...")
                 final_result = {
@@ -1729,9 +3091,26 @@ async def salesforce_agentic_handler(credentials: SalesforceCredentials, user_qu
                     queries_executed=queries_executed,
                     errors_encountered=errors_encountered,
                     corrections_made=corrections_made,
+                    **sf.cache_report(),
+                    salesforce_usage=sf.usage_report(),
+                    llm_usage=llm_usage,
+                    deadline=deadline.report(),
                     message=f"Sequential reasoning completed: {final_analysis.get('answer', 'Analysis completed')}"
                 )
                 
+            except DeadlineExceeded as e:
+                record_deadline_exceeded(e)
+                final_result = {
+                    "analysis": {
+                        "answer": f"Collected {sum(d.get('total_size', 0) for d in current_data.values())} records, but the time budget ran out before the analysis finished.",
+                        "insights": ["Data was retrieved, see raw_data", "The analysis was cut off by the request deadline"],
+                        "metrics": {"total_records": sum(d.get('total_size', 0) for d in current_data.values()), "reasoning_steps_completed": len(completed_steps)},
+                        "recommendations": ["Review raw data for specific insights", "Retry with a larger deadline_seconds"]
+                    },
+                    "raw_data": current_data,
+                    "context_data": context_data,
+                    "reasoning_plan_executed": full_reasoning_plan
+                }
             except json.JSONDecodeError:
                 final_result = {
                     "analysis": {
@@ -1747,7 +3126,11 @@ async def salesforce_agentic_handler(credentials: SalesforceCredentials, user_qu
         else:
             final_result = {
                 "analysis": {
-                    "answer": f"Sequential reasoning executed {len(plan_steps)} steps but no data was found for '{user_query}'.",
+                    "answer": (
+                        f"The time budget ran out during {deadline.exceeded_phase} before any step returned data for '{user_query}'."
+                        if deadline.exceeded_phase else
+                        f"Sequential reasoning executed {len(plan_steps)} steps but no data was found for '{user_query}'."
+                    ),
                     "insights": ["Complete reasoning plan was generated and executed", "No matching records found in Salesforce"],
                     "metrics": {"reasoning_steps_attempted": len(plan_steps), "queries_executed": len(queries_executed), "records_found": 0},
                     "recommendations": ["Verify account/opportunity names exist", "Check if data is available in Salesforce", "Try broader search terms"]
@@ -1763,10 +3146,16 @@ async def salesforce_agentic_handler(credentials: SalesforceCredentials, user_qu
             queries_executed=queries_executed,
             errors_encountered=errors_encountered,
             corrections_made=corrections_made,
+            **(sf.cache_report() if sf else {}),
+            salesforce_usage=sf.usage_report() if sf else None,
+            llm_usage=llm_usage,
+            deadline=deadline.report(),
             message=final_result["analysis"]["answer"]
         )
         
     except Exception as e:
+        if isinstance(e, DeadlineExceeded):
+            emit("deadline_exceeded", phase=e.phase, elapsed_seconds=round(e.elapsed, 3))
         return SalesforceAgenticResponse(
             success=False,
             final_result={"error": str(e)},
@@ -1774,25 +3163,85 @@ async def salesforce_agentic_handler(credentials: SalesforceCredentials, user_qu
             queries_executed=queries_executed,
             errors_encountered=errors_encountered + [str(e)],
             corrections_made=corrections_made,
+            **(sf.cache_report() if sf else {}),
+            salesforce_usage=sf.usage_report() if sf else None,
+            llm_usage=llm_usage,
+            deadline=deadline.report(),
             message=f"Sequential reasoning failed: {str(e)}"
         )
+def extract_record_context(records: List[Dict[str, Any]], context_data: dict):
+    """Collect account/opportunity IDs and names from query results for the steps that follow"""
+    for record in records:
+        if 'Id' in record:
+            if record['Id'].startswith('001'):  # Account ID
+                context_data['account_id'] = record['Id']
+            elif record['Id'].startswith('006'):  # Opportunity ID
+                context_data['opportunity_id'] = record['Id']
+        if 'Name' in record:
+            if 'account_name' not in context_data:
+                context_data['account_name'] = record['Name']
+        if 'AccountId' in record:
+            context_data['account_id'] = record['AccountId']
+
 def clean_soql_query(query: str, context_data: dict) -> str:
-    """Clean SOQL query by removing bind variables and fixing common issues"""
-    cleaned = query.strip()
-    
-    # Replace bind variables with actual values
-    if ':accountId' in cleaned and 'account_id' in context_data:
-        cleaned = cleaned.replace(':accountId', f"'{context_data['account_id']}'")
-    
-    # Remove any remaining bind variables
-    import re
-    cleaned = re.sub(r':\w+', '', cleaned)
+    """Clean SOQL query by stripping surrounding text and substituting bind variables from the context"""
+    # Unresolved bind variables are left in place and reported by validate_soql_query
+    return validate_soql(query, context=context_data)["query"]
+
+# Relationship hops whose describes are loaded while validating one query
+SOQL_VALIDATION_SCHEMA_ROUNDS = 3
+
+async def validate_soql_against_schema(sf: AsyncSalesforce, query: str, context_data: Optional[dict] = None) -> Dict[str, Any]:
+    """Run validate_soql, loading the describes it needs from the schema cache"""
+    describes: Dict[str, Any] = {}
+    result = validate_soql(query, describes, context_data)
+    for _ in range(SOQL_VALIDATION_SCHEMA_ROUNDS):
+        # Related objects are only known once the previous level of the query has been resolved
+        if not result["unloaded_objects"]:
+            break
+        loaded = await asyncio.gather(
+            *(salesforce_schema_cache.get_object(sf, name) for name in result["unloaded_objects"]),
+            return_exceptions=True
+        )
+        if any(isinstance(describe, Exception) for describe in loaded):
+            # Without the schema only syntax and aggregates can be checked
+            return validate_soql(query, None, context_data)
+        for name, describe in zip(result["unloaded_objects"], loaded):
+            describes[name.lower()] = describe
+        result = validate_soql(query, describes, context_data)
+    return result
+
+async def validate_soql_query(sf: AsyncSalesforce, query: str, context_data: Optional[dict] = None) -> Dict[str, Any]:
+    """
+    Validate (and where possible correct) a query locally against the org's cached schema.
+    Invalid field names are rewritten by the field corrector; the corrections applied are
+    returned in "field_corrections" so they can be recorded once Salesforce accepts the query.
+    """
+    result = await validate_soql_against_schema(sf, query, context_data)
+    result["field_corrections"] = []
+    if not result["invalid_fields"]:
+        return result
     
-    # Fix common issues
-    cleaned = cleaned.replace('= AND', 'AND')
-    cleaned = cleaned.replace('WHERE AND', 'WHERE')
+    # Field positions must refer to the text being rewritten, so re-check the auto-corrected query first
+    base = result["query"]
+    located = await validate_soql_against_schema(sf, base, context_data) if result["corrections"] else result
+    load = partial(salesforce_schema_cache.get_object, sf)
+    edits = []
+    field_corrections = []
+    for invalid in located["invalid_fields"]:
+        replacement = await field_corrector.correct(sf.org_id, load, invalid["object"], invalid["field"])
+        if replacement:
+            edits.append((invalid["start"], invalid["end"], invalid["prefix"] + replacement))
+            field_corrections.append({"object": invalid["object"], "field": invalid["field"], "replacement": replacement})
+    if not edits:
+        return result
     
-    return cleaned
+    corrected = await validate_soql_against_schema(sf, apply_edits(base, edits), context_data)
+    corrected["corrections"] = result["corrections"] + [
+        f"Replaced field {correction['field']} with {correction['replacement']}" for correction in field_corrections
+    ] + corrected["corrections"]
+    corrected["field_corrections"] = field_corrections
+    return corrected
 
 def fix_bind_variables(query: str, context_data: dict) -> str:
     """Fix bind variables in SOQL queries"""
@@ -1853,35 +3302,134 @@ def generate_broader_search_queries(user_query: str, context_data: dict) -> list
         ])
     
     return queries
-async def fix_invalid_field_error(query: str, error_msg: str, sf) -> str:
-    """Try to fix invalid field errors by checking object describe"""
+async def fix_invalid_field_error(query: str, error_msg: str, sf) -> tuple[str, List[Dict[str, str]]]:
+    """
+    Fix an INVALID_FIELD error reported by Salesforce by matching the invalid column against the
+    org's describe fields (learned corrections, edit distance, labels, relationship paths).
+    Returns the rewritten query and the corrections applied.
+    """
     try:
-        # Extract object name from query
-        query_upper = query.upper()
-        from_index = query_upper.find('FROM ') + 5
-        object_name = query_upper[from_index:].split()[0]
-        
-        # Get object description to find valid fields
-        obj_describe = getattr(sf, object_name).describe()
-        valid_fields = [field['name'] for field in obj_describe['fields']]
-        
-        # Try to replace invalid field with similar valid field
-        for field in valid_fields:
-            if field.lower() in error_msg.lower():
-                # Replace in query
-                corrected_query = query.replace(field, field)  # This is a simple approach
-                return corrected_query
-                
-        return query
-    except:
-        return query
+        match = re.search(r"No such column '(\w+)' on entity '(\w+)'", error_msg)
+        if not match:
+            return query, []
+        invalid_name, entity = match.groups()
+        root_object = parse_soql(query)["object"]
+        load = partial(salesforce_schema_cache.get_object, sf)
+        
+        edits = []
+        corrections = []
+        for kind, text, start, end in tokenize(query):
+            if kind != "ident":
+                continue
+            parts = text.split(".")
+            if parts[-1].lower() != invalid_name.lower():
+                continue
+            # A bare name belongs to the entity in the error, a dotted path is relative to the FROM object
+            object_name, path = (entity, text) if len(parts) == 1 else (root_object, text)
+            replacement = await field_corrector.correct(sf.org_id, load, object_name, path)
+            if replacement and replacement != text:
+                edits.append((start, end, replacement))
+                corrections.append({"object": object_name, "field": path, "replacement": replacement})
+        
+        return apply_edits(query, edits), corrections
+    except Exception as e:
+        print(f"Could not correct invalid field: {e}")
+        return query, []
+
+def validate_agentic_request(request: SalesforceAgenticRequest) -> Optional[float]:
+    """Check the agentic request options, returning its deadline capped at AGENTIC_MAX_DEADLINE_SECONDS"""
+    if request.planner_mode and request.planner_mode not in AGENTIC_PLANNER_MODES:
+        raise HTTPException(status_code=400, detail=f"planner_mode must be one of: {', '.join(AGENTIC_PLANNER_MODES)}")
+    if request.deadline_seconds is not None and request.deadline_seconds <= 0:
+        raise HTTPException(status_code=400, detail="deadline_seconds must be positive")
+    return min(request.deadline_seconds, AGENTIC_MAX_DEADLINE_SECONDS) if request.deadline_seconds else None
 
 @app.post("/salesforce/agentic", response_model=SalesforceAgenticResponse)
-async def salesforce_agentic_tool(request: SalesforceAgenticRequest, api_key: str = Depends(verify_api_key)):
+async def salesforce_agentic_tool(request: SalesforceAgenticRequest, http_request: Request, api_key: str = Depends(verify_api_key)):
     """
-    Intelligent Salesforce agent that reasons, executes queries, handles errors, and corrects itself
+    Intelligent Salesforce agent that reasons, executes queries, handles errors, and corrects itself.
+    The run is cancelled if the client disconnects before it finishes.
     """
-    return await salesforce_agentic_handler(request.credentials, request.user_query)
+    deadline_seconds = validate_agentic_request(request)
+    run = asyncio.create_task(salesforce_agentic_handler(
+        request.credentials,
+        request.user_query,
+        request.use_cache,
+        request.planner_mode,
+        deadline_seconds=deadline_seconds
+    ))
+    try:
+        while not run.done():
+            await asyncio.wait({run}, timeout=AGENTIC_DISCONNECT_POLL_SECONDS)
+            if not run.done() and await http_request.is_disconnected():
+                print("🔌 Agentic client disconnected, cancelling the run")
+                raise HTTPException(status_code=499, detail="Client disconnected")
+        return run.result()
+    finally:
+        if not run.done():
+            run.cancel()
+            await asyncio.gather(run, return_exceptions=True)
+
+AGENTIC_EVENT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream"
+}
+
+def format_agentic_event(event_type: str, data: Dict[str, Any], event_format: str) -> str:
+    if event_format == "sse":
+        return f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+    return json.dumps({"event": event_type, "data": data}, default=str) + "\n"
+
+@app.post("/salesforce/agentic/stream")
+async def salesforce_agentic_stream(request: SalesforceAgenticStreamRequest, http_request: Request, api_key: str = Depends(verify_api_key)):
+    """
+    Run the Salesforce agent, streaming its progress as NDJSON or server-sent events: plan_generated,
+    step_started, query_generated, query_executed, query_failed, correction_applied, step_completed,
+    analysis_token and finally result (the SalesforceAgenticResponse). Disconnecting cancels the run.
+    """
+    if request.event_format not in AGENTIC_EVENT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"event_format must be one of: {', '.join(AGENTIC_EVENT_MEDIA_TYPES)}")
+    deadline_seconds = validate_agentic_request(request)
+    
+    async def events():
+        queue: asyncio.Queue = asyncio.Queue()
+        run = asyncio.create_task(salesforce_agentic_handler(
+            request.credentials,
+            request.user_query,
+            request.use_cache,
+            request.planner_mode,
+            on_event=lambda event_type, data: queue.put_nowait((event_type, data)),
+            deadline_seconds=deadline_seconds
+        ))
+        run.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), AGENTIC_STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await http_request.is_disconnected():
+                        print("🔌 Agentic stream client disconnected, cancelling the run")
+                        return
+                    if request.event_format == "sse":
+                        yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    break
+                yield format_agentic_event(*event, request.event_format)
+            yield format_agentic_event("result", run.result().model_dump(), request.event_format)
+        except Exception as e:
+            yield format_agentic_event("error", {"detail": f"Failed to run Salesforce agent: {str(e)}"}, request.event_format)
+        finally:
+            # Also reached when the response is cancelled because the client went away
+            if not run.done():
+                run.cancel()
+                await asyncio.gather(run, return_exceptions=True)
+    
+    return StreamingResponse(
+        events(),
+        media_type=AGENTIC_EVENT_MEDIA_TYPES[request.event_format],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,209 @@
+"""
+Vectorized pipeline analytics over one snapshot of Opportunity records.
+
+The records are loaded once into NumPy columns (from SOQL results, the local mirror
+or a pyarrow Table). Breakdowns by stage, quarter, owner and forecast category,
+weighted pipeline, aging buckets and win rates are then computed with array
+operations instead of a Salesforce GROUP BY per question.
+"""
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from salesforce_mirror import field_value
+
+# Opportunity fields a snapshot is built from
+SNAPSHOT_FIELDS = [
+    "Id", "Amount", "Probability", "StageName", "CloseDate", "CreatedDate", "IsClosed", "IsWon",
+    "ForecastCategoryName", "Owner.Name"
+]
+
+# Groupings: name -> source field, and the key used for it in aggregate-style records
+GROUPINGS = {
+    "stage": ("StageName", "StageName"),
+    "owner": ("Owner.Name", "Name"),
+    "forecast_category": ("ForecastCategoryName", "ForecastCategoryName"),
+    "quarter": ("CloseDate", "quarter")
+}
+
+# Upper bounds (in days) of the open-opportunity age buckets; older deals fall in the last bucket
+AGING_BUCKET_DAYS = (30, 60, 90, 180)
+
+
+def _dates(values: Sequence[Any]) -> np.ndarray:
+    # Datetimes ("2024-01-31T10:00:00.000+0000") are reduced to their date
+    return np.array([value[:10] if value else None for value in values], dtype="datetime64[D]")
+
+
+def _categories(values: Sequence[Any]) -> Tuple[np.ndarray, List[Any]]:
+    """Encode values as integer codes plus the list of distinct labels (None is a label too)"""
+    index: Dict[Any, int] = {}
+    codes = np.fromiter((index.setdefault(value, len(index)) for value in values), dtype=np.int64, count=len(values))
+    return codes, list(index)
+
+
+class OpportunitySnapshot:
+    """Columnar Opportunity snapshot; every analytic is a vectorized pass over its arrays"""
+
+    def __init__(self, columns: Dict[str, Sequence[Any]]):
+        self.size = len(columns["Id"])
+        self.ids = list(columns["Id"])
+        self.amount = np.array([np.nan if value is None else value for value in columns["Amount"]], dtype=np.float64)
+        self.probability = np.array(
+            [np.nan if value is None else value for value in columns.get("Probability", [None] * self.size)],
+            dtype=np.float64
+        )
+        self.is_closed = np.array([bool(value) for value in columns["IsClosed"]], dtype=bool)
+        self.is_won = np.array([bool(value) for value in columns["IsWon"]], dtype=bool)
+        self.close_date = _dates(columns["CloseDate"])
+        self.created_date = _dates(columns.get("CreatedDate", [None] * self.size))
+        self._categorical = {
+            field: _categories(columns.get(field, [None] * self.size))
+            for field in ("StageName", "ForecastCategoryName", "Owner.Name")
+        }
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]]) -> "OpportunitySnapshot":
+        """Build a snapshot from SOQL result records (relationship fields nested)"""
+        return cls({field: [field_value(record, field) for record in records] for field in SNAPSHOT_FIELDS})
+
+    @classmethod
+    def from_columns(cls, columns) -> "OpportunitySnapshot":
+        """Build a snapshot from a column mapping (e.g. a mirror table) or a pyarrow Table"""
+        if hasattr(columns, "column_names"):
+            columns = {name: columns.column(name).to_pylist() for name in columns.column_names}
+        return cls(columns)
+
+    def mask(
+        self,
+        is_closed: Optional[bool] = None,
+        is_won: Optional[bool] = None,
+        close_date_range: Optional[Tuple[date, date]] = None
+    ) -> np.ndarray:
+        """Row filter; the close date range is inclusive"""
+        mask = np.ones(self.size, dtype=bool)
+        if is_closed is not None:
+            mask &= self.is_closed == is_closed
+        if is_won is not None:
+            mask &= self.is_won == is_won
+        if close_date_range:
+            start, end = (np.datetime64(value, "D") for value in close_date_range)
+            mask &= (self.close_date >= start) & (self.close_date <= end)
+        return mask
+
+    def _group_codes(self, grouping: str) -> Tuple[np.ndarray, List[Any]]:
+        field, _ = GROUPINGS[grouping]
+        if grouping == "quarter":
+            # CALENDAR_QUARTER(CloseDate); code 0 holds opportunities without a close date
+            months = self.close_date.astype("datetime64[M]").astype(np.int64) % 12
+            codes = np.where(np.isnat(self.close_date), 0, months // 3 + 1)
+            return codes, [None, 1, 2, 3, 4]
+        return self._categorical[field]
+
+    def group_totals(self, grouping: str, mask: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """
+        Count, total amount and probability-weighted amount per group, as
+        {"key", "count", "total", "weighted"} dicts. Totals are None when every
+        amount in the group is null, like SUM() in SOQL.
+        """
+        codes, labels = self._group_codes(grouping)
+        mask = np.ones(self.size, dtype=bool) if mask is None else mask
+        codes = codes[mask]
+        amount = self.amount[mask]
+        has_amount = ~np.isnan(amount)
+        weighted = np.nan_to_num(amount * self.probability[mask] / 100.0)
+        counts = np.bincount(codes, minlength=len(labels))
+        amount_counts = np.bincount(codes, weights=has_amount, minlength=len(labels))
+        totals = np.bincount(codes, weights=np.nan_to_num(amount), minlength=len(labels))
+        weighted_totals = np.bincount(codes, weights=weighted, minlength=len(labels))
+        return [
+            {
+                "key": labels[code],
+                "count": int(counts[code]),
+                "total": float(totals[code]) if amount_counts[code] else None,
+                "weighted": float(weighted_totals[code])
+            }
+            for code in np.flatnonzero(counts)
+        ]
+
+    def total_amount(self, mask: Optional[np.ndarray] = None) -> float:
+        amount = self.amount if mask is None else self.amount[mask]
+        return float(np.nansum(amount))
+
+    def weighted_pipeline(self, mask: Optional[np.ndarray] = None) -> float:
+        """Sum of Amount x Probability over the rows (open opportunities by default)"""
+        mask = self.mask(is_closed=False) if mask is None else mask
+        return float(np.nansum(self.amount[mask] * self.probability[mask] / 100.0))
+
+    def oldest_index(self, mask: Optional[np.ndarray] = None) -> Optional[int]:
+        """Row of the earliest created opportunity, or None when no row has a created date"""
+        created = self.created_date.astype(np.int64).astype(np.float64)
+        created[np.isnat(self.created_date)] = np.inf
+        if mask is not None:
+            created[~mask] = np.inf
+        if not self.size or np.isinf(created.min()):
+            return None
+        return int(np.argmin(created))
+
+    def aging_buckets(
+        self,
+        mask: Optional[np.ndarray] = None,
+        today: Optional[date] = None,
+        bucket_days: Sequence[int] = AGING_BUCKET_DAYS
+    ) -> List[Dict[str, Any]]:
+        """Opportunities (open ones by default) bucketed by days since creation"""
+        mask = (self.mask(is_closed=False) if mask is None else mask) & ~np.isnat(self.created_date)
+        ages = (np.datetime64(today or date.today(), "D") - self.created_date[mask]).astype(np.int64)
+        buckets = np.digitize(ages, np.asarray(bucket_days), right=True)
+        counts = np.bincount(buckets, minlength=len(bucket_days) + 1)
+        totals = np.bincount(buckets, weights=np.nan_to_num(self.amount[mask]), minlength=len(bucket_days) + 1)
+        bounds = [0, *(days + 1 for days in bucket_days)]
+        labels = [f"{low}-{high}" for low, high in zip(bounds, bucket_days)] + [f"{bucket_days[-1] + 1}+"]
+        return [
+            {"bucket": label, "count": int(count), "total": float(total)}
+            for label, count, total in zip(labels, counts, totals)
+        ]
+
+    def win_rates(self, grouping: Optional[str] = None, mask: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """Won / closed ratios by count and by amount, overall or per group"""
+        closed = self.mask(is_closed=True) if mask is None else mask & self.is_closed
+        if grouping:
+            codes, labels = self._group_codes(grouping)
+        else:
+            codes, labels = np.zeros(self.size, dtype=np.int64), [None]
+        codes = codes[closed]
+        won = self.is_won[closed]
+        amount = np.nan_to_num(self.amount[closed])
+        closed_counts = np.bincount(codes, minlength=len(labels))
+        won_counts = np.bincount(codes, weights=won, minlength=len(labels))
+        closed_amounts = np.bincount(codes, weights=amount, minlength=len(labels))
+        won_amounts = np.bincount(codes, weights=amount * won, minlength=len(labels))
+        return [
+            {
+                "key": labels[code],
+                "closed": int(closed_counts[code]),
+                "won": int(won_counts[code]),
+                "win_rate": round(float(won_counts[code] / closed_counts[code]), 4),
+                "won_amount": float(won_amounts[code]),
+                "amount_win_rate": round(float(won_amounts[code] / closed_amounts[code]), 4) if closed_amounts[code] else None
+            }
+            for code in np.flatnonzero(closed_counts)
+        ]
+
+    def summary(self, close_date_range: Optional[Tuple[date, date]] = None, today: Optional[date] = None) -> Dict[str, Any]:
+        """Every pipeline breakdown from this snapshot in one pass per metric"""
+        period = self.mask(close_date_range=close_date_range)
+        open_mask = period & ~self.is_closed
+        return {
+            "opportunities": int(period.sum()),
+            "open_pipeline": self.total_amount(open_mask),
+            "weighted_pipeline": self.weighted_pipeline(open_mask),
+            "by_stage": self.group_totals("stage", open_mask),
+            "by_quarter": self.group_totals("quarter", open_mask),
+            "by_owner": self.group_totals("owner", open_mask),
+            "by_forecast_category": self.group_totals("forecast_category", open_mask),
+            "aging_buckets": self.aging_buckets(open_mask, today),
+            "win_rate": (self.win_rates(mask=period) or [None])[0],
+            "win_rates_by_owner": self.win_rates("owner", period)
+        }
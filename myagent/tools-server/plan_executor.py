@@ -0,0 +1,81 @@
+"""
+Dependency-aware execution of multi-step agent plans.
+
+Each step lists the step numbers whose results it needs in `depends_on`. A step
+starts as soon as all of them have finished, with at most `max_parallel` steps
+running at once, so a plan takes critical-path time instead of the sum of its
+steps. Results are passed to dependent steps, which carry context (IDs, names)
+forward along every path of the plan.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List
+
+
+def normalize_plan(steps: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Give every step a unique step_number and a valid depends_on list. Dependencies may
+    only point at earlier steps, which keeps the plan acyclic; unknown references are
+    dropped. A step without depends_on depends on the previous step, as in a
+    sequential plan.
+    """
+    normalized = []
+    positions: Dict[int, int] = {}
+    for step in steps:
+        number = step.get("step_number")
+        if not isinstance(number, int) or number in positions:
+            number = max(positions, default=0) + 1
+        depends_on = step.get("depends_on")
+        if depends_on is None:
+            depends_on = [normalized[-1]["step_number"]] if normalized else []
+        elif not isinstance(depends_on, list):
+            depends_on = [depends_on]
+        normalized.append({
+            **step,
+            "step_number": number,
+            "depends_on": sorted(
+                {dependency for dependency in depends_on if isinstance(dependency, int) and dependency in positions},
+                key=positions.get
+            )
+        })
+        positions[number] = len(positions)
+    return normalized
+
+
+def critical_path_length(steps: List[Dict[str, Any]]) -> int:
+    """Number of steps on the longest dependency chain of a normalized plan"""
+    depth: Dict[int, int] = {}
+    for step in steps:
+        depth[step["step_number"]] = 1 + max((depth[dependency] for dependency in step["depends_on"]), default=0)
+    return max(depth.values(), default=0)
+
+
+async def run_plan(
+    steps: List[Dict[str, Any]],
+    run_step: Callable[[Dict[str, Any], Dict[int, Any]], Awaitable[Any]],
+    max_parallel: int = 4
+) -> Dict[int, Any]:
+    """
+    Run a normalized plan as a DAG. `run_step(step, dependency_results)` receives the results
+    of the step's dependencies in plan order. Returns results by step number; if a step
+    raises, the remaining steps are cancelled and the exception propagates.
+    """
+    semaphore = asyncio.Semaphore(max_parallel)
+    tasks: Dict[int, asyncio.Task] = {}
+
+    async def run(step: Dict[str, Any]) -> Any:
+        dependencies = step["depends_on"]
+        results = await asyncio.gather(*(tasks[dependency] for dependency in dependencies))
+        async with semaphore:
+            return await run_step(step, dict(zip(dependencies, results)))
+
+    # Dependencies always precede their dependents, so their tasks already exist
+    for step in steps:
+        tasks[step["step_number"]] = asyncio.create_task(run(step))
+    try:
+        results = await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+    return dict(zip(tasks, results))
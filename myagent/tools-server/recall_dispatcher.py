@@ -0,0 +1,249 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+
+
+class TokenBucket:
+    """Simple token bucket: `rate` tokens per second, up to `capacity` tokens"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available (0 if one is available now)"""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self._refill()
+        self.tokens -= 1
+
+    def full_in(self) -> float:
+        """Seconds until the bucket is back at capacity (0 if it is full)"""
+        self._refill()
+        return max(0.0, (self.capacity - self.tokens) / self.rate)
+
+
+class PendingNotification:
+    def __init__(self, item: str, on_done: Optional[Callable[[bool], None]]):
+        self.item = item
+        self.on_done = on_done
+        self.enqueued_at = time.monotonic()
+
+
+class RecallNotificationDispatcher:
+    """
+    Queue for outbound Recall.ai bot chat messages.
+
+    Items queued for the same bot within `coalesce_window` seconds are sent as one
+    message. Sends are rate limited per bot and globally with token buckets, and
+    failed sends are retried with exponential backoff before being dropped.
+    """
+
+    def __init__(
+        self,
+        send_message: Callable[[str, str], Awaitable[bool]],
+        format_message: Callable[[List[str]], str],
+        global_rate: float = 5.0,
+        global_burst: int = 10,
+        per_bot_rate: float = 0.5,
+        per_bot_burst: int = 2,
+        max_attempts: int = 5,
+        base_backoff: float = 2.0,
+        max_backoff: float = 60.0,
+        coalesce_window: float = 1.0,
+        max_concurrent_sends: int = 10
+    ):
+        self.send_message = send_message
+        self.format_message = format_message
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.per_bot_rate = per_bot_rate
+        self.per_bot_burst = per_bot_burst
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.coalesce_window = coalesce_window
+
+        self._pending: Dict[str, List[PendingNotification]] = {}
+        self._attempts: Dict[str, int] = {}
+        self._due: Dict[str, float] = {}
+        self._in_flight: set = set()
+        self._bot_buckets: Dict[str, TokenBucket] = {}
+        self._send_slots = asyncio.Semaphore(max_concurrent_sends)
+        self._wakeup = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+        self._send_tasks: set = set()
+
+        self._latencies: Deque[float] = deque(maxlen=1000)
+        self.stats = {
+            "enqueued": 0,
+            "messages_sent": 0,
+            "items_delivered": 0,
+            "items_coalesced": 0,
+            "send_failures": 0,
+            "retries": 0,
+            "items_dropped": 0
+        }
+
+    def start(self):
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        for task in list(self._send_tasks):
+            task.cancel()
+
+    def enqueue(self, bot_id: str, item: str, on_done: Optional[Callable[[bool], None]] = None):
+        """Queue an item (e.g. a research download link) for delivery to a bot"""
+        self._pending.setdefault(bot_id, []).append(PendingNotification(item, on_done))
+        self.stats["enqueued"] += 1
+        if bot_id not in self._due and bot_id not in self._in_flight:
+            self._due[bot_id] = time.monotonic() + self.coalesce_window
+        self._wakeup.set()
+
+    def queue_depth(self) -> int:
+        return sum(len(items) for items in self._pending.values())
+
+    def metrics(self) -> Dict[str, float]:
+        latencies = sorted(self._latencies)
+        latency = {}
+        if latencies:
+            latency = {
+                "avg_seconds": round(sum(latencies) / len(latencies), 3),
+                "p50_seconds": round(latencies[len(latencies) // 2], 3),
+                "p95_seconds": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+                "max_seconds": round(latencies[-1], 3)
+            }
+        return {
+            **self.stats,
+            "queue_depth": self.queue_depth(),
+            "bots_waiting": len(self._pending),
+            "in_flight": len(self._in_flight),
+            "bot_buckets": len(self._bot_buckets),
+            "delivery_latency": latency
+        }
+
+    def _prune_bot_buckets(self) -> Optional[float]:
+        """
+        Drop the buckets of bots with nothing pending, due or in flight once they have refilled
+        (a new bucket would start full too). Bot ids are per meeting, so they would otherwise
+        accumulate for the life of the process. Returns when the next idle bucket will be full.
+        """
+        next_full = None
+        for bot_id, bucket in list(self._bot_buckets.items()):
+            if bot_id in self._pending or bot_id in self._due or bot_id in self._in_flight:
+                continue
+            full_in = bucket.full_in()
+            if full_in == 0:
+                del self._bot_buckets[bot_id]
+            else:
+                next_full = full_in if next_full is None else min(next_full, full_in)
+        return None if next_full is None else time.monotonic() + next_full
+
+    def _bot_bucket(self, bot_id: str) -> TokenBucket:
+        if bot_id not in self._bot_buckets:
+            self._bot_buckets[bot_id] = TokenBucket(self.per_bot_rate, self.per_bot_burst)
+        return self._bot_buckets[bot_id]
+
+    async def _run(self):
+        while True:
+            now = time.monotonic()
+            next_due = None
+            for bot_id, due_at in list(self._due.items()):
+                if due_at > now:
+                    next_due = due_at if next_due is None else min(next_due, due_at)
+                    continue
+
+                wait = max(self.global_bucket.wait_time(), self._bot_bucket(bot_id).wait_time())
+                if wait > 0:
+                    self._due[bot_id] = now + wait
+                    next_due = now + wait if next_due is None else min(next_due, now + wait)
+                    continue
+
+                self.global_bucket.consume()
+                self._bot_bucket(bot_id).consume()
+                del self._due[bot_id]
+                items = self._pending.pop(bot_id, [])
+                if not items:
+                    continue
+                self._in_flight.add(bot_id)
+                task = asyncio.create_task(self._deliver(bot_id, items))
+                self._send_tasks.add(task)
+                task.add_done_callback(self._send_tasks.discard)
+
+            prune_at = self._prune_bot_buckets()
+            if prune_at is not None:
+                next_due = prune_at if next_due is None else min(next_due, prune_at)
+            self._wakeup.clear()
+            timeout = None if next_due is None else max(0.0, next_due - time.monotonic())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _deliver(self, bot_id: str, items: List[PendingNotification]):
+        try:
+            async with self._send_slots:
+                try:
+                    sent = await self.send_message(bot_id, self.format_message([n.item for n in items]))
+                except Exception as e:
+                    print(f"Error sending message to recall.ai bot {bot_id}: {e}")
+                    sent = False
+        finally:
+            self._in_flight.discard(bot_id)
+
+        if sent:
+            now = time.monotonic()
+            self.stats["messages_sent"] += 1
+            self.stats["items_delivered"] += len(items)
+            self.stats["items_coalesced"] += len(items) - 1
+            self._attempts.pop(bot_id, None)
+            for notification in items:
+                self._latencies.append(now - notification.enqueued_at)
+                self._finish(notification, True)
+        else:
+            self.stats["send_failures"] += 1
+            attempts = self._attempts.get(bot_id, 0) + 1
+            if attempts >= self.max_attempts:
+                print(f"Dropping {len(items)} notification(s) for bot {bot_id} after {attempts} attempts")
+                self.stats["items_dropped"] += len(items)
+                self._attempts.pop(bot_id, None)
+                for notification in items:
+                    self._finish(notification, False)
+            else:
+                self.stats["retries"] += 1
+                self._attempts[bot_id] = attempts
+                backoff = min(self.max_backoff, self.base_backoff * (2 ** (attempts - 1)))
+                self._pending[bot_id] = items + self._pending.get(bot_id, [])
+                self._due[bot_id] = time.monotonic() + backoff * random.uniform(0.8, 1.2)
+
+        # Items queued while this send was in flight still need a delivery slot
+        if bot_id in self._pending and bot_id not in self._due:
+            self._due[bot_id] = time.monotonic() + self.coalesce_window
+        self._wakeup.set()
+
+    @staticmethod
+    def _finish(notification: PendingNotification, success: bool):
+        if notification.on_done:
+            try:
+                notification.on_done(success)
+            except Exception as e:
+                print(f"Error in notification callback: {e}")
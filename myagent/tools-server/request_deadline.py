@@ -0,0 +1,86 @@
+"""
+Time budgets for requests that run in phases.
+
+A request gets one deadline, split across its phases by share. A phase may use
+its share of the time left when it starts, so time an earlier phase did not
+need rolls over to the later ones and the last phase gets whatever remains.
+Every LLM and Salesforce call goes through `run`, which cancels it once the
+current phase is out of time. A request without a deadline still records how
+long each phase took, but never cancels anything.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(Exception):
+    """A phase of the request ran out of time"""
+
+    def __init__(self, phase: Optional[str], elapsed: float):
+        super().__init__(f"Deadline exceeded during {phase or 'request'} after {elapsed:.1f}s")
+        self.phase = phase
+        self.elapsed = elapsed
+
+
+class RequestDeadline:
+    """Overall deadline of one request (none when `seconds` is None), with budgets for its phases in `phase_shares` order"""
+
+    def __init__(self, seconds: Optional[float], phase_shares: Dict[str, float]):
+        self.seconds = seconds
+        self.phase_shares = dict(phase_shares)
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + seconds if seconds is not None else None
+        self.phase: Optional[str] = None
+        self.phase_expires_at = self.expires_at
+        self.phase_seconds: Dict[str, float] = {}
+        self.exceeded_phase: Optional[str] = None
+        self._phase_started_at = self.started_at
+
+    def start_phase(self, phase: str):
+        """Enter the next phase; its budget is its share of the time left across it and the phases after it"""
+        now = time.monotonic()
+        self._close_phase(now)
+        self.phase = phase
+        self._phase_started_at = now
+        names = list(self.phase_shares)
+        remaining_shares = sum(self.phase_shares[name] for name in names[names.index(phase):])
+        share = self.phase_shares[phase] / remaining_shares if remaining_shares else 1.0
+        if self.expires_at is not None:
+            self.phase_expires_at = now + max(self.expires_at - now, 0.0) * share
+
+    def _close_phase(self, now: float):
+        if self.phase is not None:
+            self.phase_seconds[self.phase] = round(now - self._phase_started_at, 3)
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left in the current phase, or None without a deadline"""
+        if self.phase_expires_at is None:
+            return None
+        return max(self.phase_expires_at - time.monotonic(), 0.0)
+
+    async def run(self, awaitable: Awaitable[T]) -> T:
+        """Await a call, cancelling it and raising DeadlineExceeded when the current phase runs out of time"""
+        if self.expires_at is None:
+            return await awaitable
+        try:
+            return await asyncio.wait_for(awaitable, self.remaining())
+        except asyncio.TimeoutError:
+            # A timeout raised by the call itself before the phase deadline is not ours to translate
+            if self.remaining() > 0:
+                raise
+            self.exceeded_phase = self.exceeded_phase or self.phase
+            raise DeadlineExceeded(self.phase, self.elapsed()) from None
+
+    def report(self) -> Dict[str, Any]:
+        self._close_phase(time.monotonic())
+        return {
+            "deadline_seconds": self.seconds,
+            "elapsed_seconds": round(self.elapsed(), 3),
+            "phase_seconds": dict(self.phase_seconds),
+            "exceeded_phase": self.exceeded_phase
+        }
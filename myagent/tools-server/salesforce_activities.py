@@ -0,0 +1,43 @@
+"""
+Recent Task activity for a page of records.
+
+Tasks are read by WhatId for every record type with one query per chunk of
+ids, instead of one Task query per record, and capped per record in memory.
+Records whose Tasks cannot be read get an empty list.
+"""
+from typing import Any, Dict, List
+
+from soql_parser import escape_soql_string
+
+# Max record ids per "Id IN (...)" filter, keeps generated SOQL well under the query length limit
+SOQL_ID_CHUNK_SIZE = 200
+RECENT_ACTIVITIES_PER_RECORD = 10
+
+
+async def fetch_recent_activities(sf, records: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Most recent Tasks (newest first, at most RECENT_ACTIVITIES_PER_RECORD) related to each record through WhatId"""
+    ids = list(dict.fromkeys(record['Id'] for record in records if record.get('Id')))
+    chunks = [ids[start:start + SOQL_ID_CHUNK_SIZE] for start in range(0, len(ids), SOQL_ID_CHUNK_SIZE)]
+    queries = [
+        f"""
+            SELECT WhatId, Id, Subject, Status, Priority, ActivityDate, Owner.Name
+            FROM Task
+            WHERE WhatId IN ({', '.join(f"'{escape_soql_string(record_id)}'" for record_id in chunk)})
+            ORDER BY ActivityDate DESC
+        """
+        for chunk in chunks
+    ]
+
+    activities: Dict[str, List[Dict[str, Any]]] = {record_id: [] for record_id in ids}
+    # The chunk queries are independent, so they share Composite Batch round trips
+    results = await sf.query_many(queries, fetch_all=True) if queries else []
+    for chunk, result in zip(chunks, results):
+        if isinstance(result, Exception):
+            # Activities are supplementary; the records are still returned without them
+            print(f"Could not fetch recent activities for {len(chunk)} records: {result}")
+            continue
+        for task in result['records']:
+            related = activities.get(task.get('WhatId'))
+            if related is not None and len(related) < RECENT_ACTIVITIES_PER_RECORD:
+                related.append({name: value for name, value in task.items() if name != 'WhatId'})
+    return activities
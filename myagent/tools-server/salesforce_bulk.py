@@ -0,0 +1,247 @@
+import asyncio
+import codecs
+import csv
+import io
+import json
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import aiohttp
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = None
+    pq = None
+
+BULK_RESULT_CHUNK_SIZE = 64 * 1024
+PARQUET_ROW_GROUP_SIZE = 50000
+
+
+class BulkQueryError(Exception):
+    pass
+
+
+class BulkQueryClient:
+    """Minimal async client for Salesforce Bulk API 2.0 query jobs"""
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        instance_url: str,
+        session_id: str,
+        api_version: str,
+        poll_interval: float = 1.0,
+        max_poll_interval: float = 10.0,
+        timeout: float = 1800.0
+    ):
+        self.session = session
+        self.jobs_url = f"{instance_url.rstrip('/')}/services/data/v{api_version}/jobs/query"
+        self.headers = {
+            "Authorization": f"Bearer {session_id}",
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.timeout = timeout
+
+    async def _json(self, response: aiohttp.ClientResponse) -> Any:
+        if response.status >= 300:
+            raise BulkQueryError(f"Bulk API request failed ({response.status}): {await response.text()}")
+        return await response.json()
+
+    async def create_job(self, soql: str, include_deleted: bool = False) -> str:
+        payload = {
+            "operation": "queryAll" if include_deleted else "query",
+            "query": soql,
+            "contentType": "CSV",
+            "columnDelimiter": "COMMA",
+            "lineEnding": "LF"
+        }
+        async with self.session.post(self.jobs_url, json=payload, headers=self.headers) as response:
+            job = await self._json(response)
+        return job["id"]
+
+    async def get_job(self, job_id: str) -> Dict[str, Any]:
+        async with self.session.get(f"{self.jobs_url}/{job_id}", headers=self.headers) as response:
+            return await self._json(response)
+
+    async def abort_job(self, job_id: str):
+        try:
+            async with self.session.patch(
+                f"{self.jobs_url}/{job_id}",
+                json={"state": "Aborted"},
+                headers=self.headers
+            ) as response:
+                await response.read()
+        except Exception as e:
+            print(f"Failed to abort bulk query job {job_id}: {e}")
+
+    async def wait_for_job(self, job_id: str) -> Dict[str, Any]:
+        """Poll a job with exponential backoff until it completes, aborting it on timeout or cancellation"""
+        deadline = time.monotonic() + self.timeout
+        interval = self.poll_interval
+        try:
+            while True:
+                job = await self.get_job(job_id)
+                state = job.get("state")
+                if state == "JobComplete":
+                    return job
+                if state in ("Failed", "Aborted"):
+                    raise BulkQueryError(f"Bulk query job {job_id} {state.lower()}: {job.get('errorMessage', '')}")
+                if time.monotonic() + interval > deadline:
+                    raise BulkQueryError(f"Bulk query job {job_id} did not complete within {self.timeout:.0f}s")
+                await asyncio.sleep(interval)
+                interval = min(self.max_poll_interval, interval * 1.5)
+        except (BulkQueryError, asyncio.CancelledError):
+            await asyncio.shield(self.abort_job(job_id))
+            raise
+
+    async def iter_result_pages(self, job_id: str, max_records: Optional[int] = None) -> AsyncIterator[AsyncIterator[bytes]]:
+        """
+        Yield one byte-chunk iterator per result page. Each page is a complete CSV
+        document with a header row; pages are linked by the Sforce-Locator header.
+        """
+        locator = None
+        # Result pages can be large, only bound the time between reads
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=300)
+        while True:
+            params = {}
+            if locator:
+                params["locator"] = locator
+            if max_records:
+                params["maxRecords"] = str(max_records)
+            async with self.session.get(
+                f"{self.jobs_url}/{job_id}/results",
+                params=params,
+                headers={**self.headers, "Accept": "text/csv"},
+                timeout=timeout
+            ) as response:
+                if response.status >= 300:
+                    raise BulkQueryError(f"Failed to fetch bulk query results ({response.status}): {await response.text()}")
+                yield response.content.iter_chunked(BULK_RESULT_CHUNK_SIZE)
+                locator = response.headers.get("Sforce-Locator")
+            if not locator or locator == "null":
+                return
+
+
+async def iter_csv_bytes(pages: AsyncIterator[AsyncIterator[bytes]]) -> AsyncIterator[bytes]:
+    """Concatenate result pages into one CSV stream, keeping only the first page's header"""
+    first_page = True
+    async for page in pages:
+        skip_header = not first_page
+        first_page = False
+        async for chunk in page:
+            if skip_header:
+                newline = chunk.find(b"\n")
+                if newline < 0:
+                    continue
+                chunk = chunk[newline + 1:]
+                skip_header = False
+            if chunk:
+                yield chunk
+
+
+async def iter_csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[List[str]]:
+    """Incrementally parse a CSV byte stream into rows, handling quoted fields that span lines"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    record = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            record = f"{record}\n{line}" if record else line
+            # A record is complete once its quotes are balanced
+            if record.count('"') % 2 == 0:
+                if record:
+                    yield next(csv.reader([record]))
+                record = ""
+    buffer += decoder.decode(b"", final=True)
+    record = f"{record}\n{buffer}" if record else buffer
+    if record:
+        yield next(csv.reader(io.StringIO(record)))
+
+
+async def iter_ndjson(pages: AsyncIterator[AsyncIterator[bytes]]) -> AsyncIterator[bytes]:
+    """Convert the CSV result pages to NDJSON, one object per record (empty fields become null)"""
+    header = None
+    async for row in iter_csv_rows(iter_csv_bytes(pages)):
+        if header is None:
+            header = row
+            continue
+        yield (json.dumps({name: (value if value != "" else None) for name, value in zip(header, row)}) + "\n").encode("utf-8")
+
+
+class _DrainableSink:
+    """File-like object for ParquetWriter whose written bytes can be drained while writing"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+async def iter_parquet(pages: AsyncIterator[AsyncIterator[bytes]]) -> AsyncIterator[bytes]:
+    """Convert the CSV result pages to Parquet, writing one row group per PARQUET_ROW_GROUP_SIZE rows"""
+    if pa is None:
+        raise BulkQueryError("Parquet output requires the pyarrow package")
+
+    header = None
+    rows: List[List[str]] = []
+    sink = _DrainableSink()
+    writer = None
+
+    def write_rows():
+        nonlocal writer
+        columns = list(zip(*rows)) if rows else [[] for _ in header]
+        table = pa.table({
+            name: pa.array([value if value != "" else None for value in column], type=pa.string())
+            for name, column in zip(header, columns)
+        })
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+        writer.write_table(table)
+        rows.clear()
+
+    async for row in iter_csv_rows(iter_csv_bytes(pages)):
+        if header is None:
+            header = row
+            continue
+        rows.append(row)
+        if len(rows) >= PARQUET_ROW_GROUP_SIZE:
+            write_rows()
+            data = sink.drain()
+            if data:
+                yield data
+
+    if header is None:
+        return
+    if rows or writer is None:
+        write_rows()
+    writer.close()
+    data = sink.drain()
+    if data:
+        yield data
@@ -0,0 +1,304 @@
+import asyncio
+import concurrent.futures
+import time
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
+from urllib.parse import quote
+
+from simple_salesforce import Salesforce
+from simple_salesforce.exceptions import (
+    SalesforceError,
+    SalesforceExpiredSession,
+    SalesforceGeneralError,
+    SalesforceMalformedRequest,
+    SalesforceMoreThanOneRecord,
+    SalesforceRefusedRequest,
+    SalesforceResourceNotFound
+)
+
+# Composite Batch accepts at most 25 subrequests per call
+COMPOSITE_BATCH_MAX_SUBREQUESTS = 25
+
+# Subrequest status -> the exception simple_salesforce raises for the same status on a direct call
+SUBREQUEST_ERRORS = {
+    300: SalesforceMoreThanOneRecord,
+    400: SalesforceMalformedRequest,
+    401: SalesforceExpiredSession,
+    403: SalesforceRefusedRequest,
+    404: SalesforceResourceNotFound
+}
+
+
+class SalesforceExecutor:
+    """Bounded thread pool for blocking simple_salesforce calls, with per-org concurrency limits"""
+
+    def __init__(self, max_workers: int = 32, per_org_concurrency: int = 8):
+        self.max_workers = max_workers
+        self.per_org_concurrency = per_org_concurrency
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="salesforce"
+        )
+        self._org_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._org_active: Dict[str, int] = {}
+        self._org_waiting: Dict[str, int] = {}
+
+    async def run(self, org_id: str, fn: Callable, *args, **kwargs) -> Any:
+        """Run a blocking call in the pool, waiting for a free slot for the org first"""
+        semaphore = self._org_semaphores.setdefault(org_id, asyncio.Semaphore(self.per_org_concurrency))
+        self._org_waiting[org_id] = self._org_waiting.get(org_id, 0) + 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self._org_waiting[org_id] -= 1
+        self._org_active[org_id] = self._org_active.get(org_id, 0) + 1
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(partial(fn, *args, **kwargs))
+        # A cancelled caller stops waiting, but a call already running in its thread cannot be
+        # interrupted, so the org's slot is only released once the thread is done with it
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release, org_id, semaphore))
+        return await asyncio.wrap_future(future)
+
+    def _release(self, org_id: str, semaphore: asyncio.Semaphore):
+        self._org_active[org_id] -= 1
+        semaphore.release()
+
+    async def run_unbounded(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run a blocking call that is not tied to an org yet (e.g. the login itself)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "per_org_concurrency": self.per_org_concurrency,
+            "active_by_org": {org: n for org, n in self._org_active.items() if n},
+            "waiting_by_org": {org: n for org, n in self._org_waiting.items() if n}
+        }
+
+
+class AsyncSalesforce:
+    """Async facade over a pooled simple_salesforce session.
+
+    Every call runs on the shared SalesforceExecutor so a slow SOQL query never
+    blocks the event loop, and calls for one org are capped by its concurrency limit.
+    A facade is created per request, so `usage` counts the calls that request made.
+    With a `result_cache`, finished query results are served from and stored in it,
+    scoped to `username`: records are only ever served back to the user whose sharing
+    rules and field-level security produced them, and without a username nothing is cached.
+    """
+
+    def __init__(self, sf: Salesforce, executor: SalesforceExecutor, result_cache=None, username: Optional[str] = None):
+        self.sf = sf
+        self.executor = executor
+        self.username = username.lower() if username else None
+        self.result_cache = result_cache if self.username else None
+        self.usage = {"round_trips": 0, "api_calls": 0, "batched_queries": 0, "cache_hits": 0, "cache_misses": 0}
+        self.oldest_cache_age: Optional[float] = None
+
+    @property
+    def org_id(self) -> str:
+        # Session ids are prefixed with the 15 character org id ("00D...!...")
+        return self.sf.session_id.split('!')[0] if self.sf.session_id else self.sf.sf_instance
+
+    @property
+    def session_id(self) -> str:
+        return self.sf.session_id
+
+    @property
+    def sf_instance(self) -> str:
+        return self.sf.sf_instance
+
+    @property
+    def sf_version(self) -> str:
+        return self.sf.sf_version
+
+    def session_only(self) -> "AsyncSalesforce":
+        """
+        A facade over the same session that keeps no login credentials, for background work
+        that outlives the request. It stops working when the session expires.
+        """
+        sf = Salesforce(session_id=self.session_id, instance=self.sf_instance, version=self.sf_version, session=self.sf.session)
+        return AsyncSalesforce(sf, self.executor, username=self.username)
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        self.usage["round_trips"] += 1
+        self.usage["api_calls"] += 1
+        return await self.executor.run(self.org_id, fn, *args, **kwargs)
+
+    def usage_report(self) -> Dict[str, Any]:
+        """Calls made through this facade, plus the org's daily API usage from the last response"""
+        report = dict(self.usage)
+        org_usage = (getattr(self.sf, "api_usage", None) or {}).get("api-usage")
+        if org_usage:
+            report["org_api_usage"] = {"used": org_usage.used, "limit": org_usage.total}
+        return report
+
+    def cache_report(self) -> Dict[str, Any]:
+        """from_cache (every query of the request was answered by the result cache) and the oldest cached result's age"""
+        return {
+            "from_cache": bool(self.usage["cache_hits"]) and not self.usage["cache_misses"],
+            "cache_age_seconds": round(self.oldest_cache_age, 1) if self.oldest_cache_age is not None else None
+        }
+
+    async def _cached(self, soql: str, include_deleted: bool) -> Optional[Dict[str, Any]]:
+        if self.result_cache is None:
+            return None
+        result, age = await self.result_cache.get(self.org_id, self.username, soql, include_deleted, probe=self._probe)
+        if result is None:
+            self.usage["cache_misses"] += 1
+            return None
+        self.usage["cache_hits"] += 1
+        self.oldest_cache_age = max(age, self.oldest_cache_age or 0.0)
+        return result
+
+    async def _probe(self, soql: str) -> Dict[str, Any]:
+        # Revalidation probes bypass the cache and see deleted records
+        return await self.run(self.sf.query, soql, include_deleted=True)
+
+    def _store(self, soql: str, result: Dict[str, Any], include_deleted: bool, fetched_at: float):
+        if self.result_cache is not None:
+            self.result_cache.set(self.org_id, self.username, soql, result, include_deleted, fetched_at)
+
+    async def query(self, soql: str, include_deleted: bool = False) -> Dict[str, Any]:
+        cached = await self._cached(soql, include_deleted)
+        if cached is not None:
+            return cached
+        fetched_at = time.time()
+        result = await self.run(self.sf.query, soql, include_deleted=include_deleted)
+        self._store(soql, result, include_deleted, fetched_at)
+        return result
+
+    async def query_more(self, next_records_url: str) -> Dict[str, Any]:
+        return await self.run(self.sf.query_more, next_records_url, identifier_is_url=True)
+
+    async def query_all(self, soql: str, include_deleted: bool = False) -> Dict[str, Any]:
+        """Run a query and follow every queryMore batch (each batch is its own API call)"""
+        records = []
+        total_size = None
+        async for batch in self.iter_query_batches(soql, include_deleted=include_deleted):
+            if total_size is None:
+                total_size = batch['totalSize']
+            records.extend(batch['records'])
+        return {'totalSize': total_size, 'done': True, 'records': records}
+
+    async def query_many(
+        self,
+        soqls: List[str],
+        include_deleted: bool = False,
+        fetch_all: bool = False
+    ) -> List[Union[Dict[str, Any], SalesforceError]]:
+        """
+        Run independent queries through Composite Batch, up to 25 per HTTP round trip, and
+        return their results in order. A failed query yields its exception in its slot
+        instead of failing the others (like gather(return_exceptions=True)). With
+        `fetch_all`, queryMore batches of each result are followed as well. Queries
+        answered by the result cache are left out of the batch.
+        """
+        results: List[Any] = [await self._cached(soql, include_deleted) for soql in soqls]
+        pending = [index for index, result in enumerate(results) if result is None]
+        if pending:
+            fetched_at = time.time()
+            fetched = await self._query_many_live([soqls[index] for index in pending], include_deleted, fetch_all)
+            for index, result in zip(pending, fetched):
+                results[index] = result
+                if isinstance(result, dict):
+                    self._store(soqls[index], result, include_deleted, fetched_at)
+        return results
+
+    async def _query_many_live(
+        self,
+        soqls: List[str],
+        include_deleted: bool,
+        fetch_all: bool
+    ) -> List[Union[Dict[str, Any], SalesforceError]]:
+        resource = "queryAll" if include_deleted else "query"
+        chunks = [
+            soqls[start:start + COMPOSITE_BATCH_MAX_SUBREQUESTS]
+            for start in range(0, len(soqls), COMPOSITE_BATCH_MAX_SUBREQUESTS)
+        ]
+
+        async def run_chunk(chunk: List[str]) -> List[Union[Dict[str, Any], SalesforceError]]:
+            if len(chunk) == 1:
+                try:
+                    return [await self.run(self.sf.query, chunk[0], include_deleted=include_deleted)]
+                except SalesforceError as e:
+                    return [e]
+            payload = {
+                "batchRequests": [
+                    {"method": "GET", "url": f"v{self.sf_version}/{resource}/?q={quote(soql)}"}
+                    for soql in chunk
+                ],
+                "haltOnError": False
+            }
+            response = await self.run(self.sf.restful, "composite/batch", method="POST", json=payload)
+            # One round trip, but subrequests are counted individually towards the org's API limits
+            self.usage["api_calls"] += len(chunk) - 1
+            self.usage["batched_queries"] += len(chunk)
+            results = []
+            for soql, item in zip(chunk, response["results"]):
+                status = item.get("statusCode", 500)
+                if status >= 300:
+                    error = SUBREQUEST_ERRORS.get(status, SalesforceGeneralError)
+                    results.append(error(f"composite/batch {resource}: {soql.strip()}", status, resource, item.get("result")))
+                else:
+                    results.append(item["result"])
+            return results
+
+        results = [result for chunk_results in await asyncio.gather(*(run_chunk(chunk) for chunk in chunks)) for result in chunk_results]
+
+        if fetch_all:
+            async def follow(result: Dict[str, Any]) -> Dict[str, Any]:
+                records = list(result['records'])
+                while not result.get('done', True) and result.get('nextRecordsUrl'):
+                    result = await self.query_more(result['nextRecordsUrl'])
+                    records.extend(result['records'])
+                return {**result, 'done': True, 'records': records}
+
+            results = await asyncio.gather(*(
+                follow(result) if isinstance(result, dict) else asyncio.sleep(0, result)
+                for result in results
+            ))
+        return list(results)
+
+    async def iter_query_batches(self, soql: str, include_deleted: bool = False, follow: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield each result batch of a query, following nextRecordsUrl (queryMore) unless `follow` is False.
+        The next batch is requested while the caller is still consuming the current one.
+        """
+        fetched_at = time.time()
+        result = await self.query(soql, include_deleted=include_deleted)
+        # A result spanning several batches is cached once every batch has been read
+        records = None
+        if follow and self.result_cache is not None and not result.get('done', True) \
+                and result['totalSize'] <= self.result_cache.max_records_per_entry:
+            records = list(result['records'])
+        next_batch = None
+        try:
+            while True:
+                next_batch = None
+                if follow and not result.get('done', True) and result.get('nextRecordsUrl'):
+                    next_batch = asyncio.ensure_future(self.query_more(result['nextRecordsUrl']))
+                yield result
+                if next_batch is None:
+                    if records is not None and result.get('done', True):
+                        self._store(soql, {'totalSize': len(records), 'done': True, 'records': records}, include_deleted, fetched_at)
+                    return
+                result = await next_batch
+                if records is not None:
+                    records.extend(result['records'])
+        finally:
+            if next_batch is not None and not next_batch.done():
+                next_batch.cancel()
+
+    async def search(self, sosl: str) -> Dict[str, Any]:
+        return await self.run(self.sf.search, sosl)
+
+    async def describe_object(self, object_name: str, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        return await self.run(lambda: getattr(self.sf, object_name).describe(headers=headers))
+
+    async def restful(self, path: str, params: Optional[Dict[str, Any]] = None, method: str = 'GET', **kwargs) -> Any:
+        return await self.run(self.sf.restful, path, params=params, method=method, **kwargs)
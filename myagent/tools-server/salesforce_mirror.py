@@ -0,0 +1,381 @@
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from simple_salesforce.exceptions import SalesforceExpiredSession
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Mirrors are persisted as JSON without pyarrow
+    pa = None
+    pq = None
+
+# Fields mirrored per object; fields the org does not have are dropped when the object is first loaded
+MIRROR_OBJECT_FIELDS = {
+    "Account": [
+        "Id", "Name", "Type", "Industry", "AnnualRevenue", "NumberOfEmployees", "Phone", "Website",
+        "BillingAddress", "OwnerId", "Owner.Name", "CreatedDate", "SystemModstamp"
+    ],
+    "Opportunity": [
+        "Id", "Name", "AccountId", "Account.Name", "Amount", "StageName", "CloseDate", "Probability", "IsClosed",
+        "IsWon", "ForecastCategoryName", "Type", "OwnerId", "Owner.Name", "CreatedDate", "LastActivityDate",
+        "SystemModstamp"
+    ],
+    "Contact": [
+        "Id", "Name", "FirstName", "LastName", "Email", "Phone", "Title", "Department", "AccountId", "OwnerId",
+        "CreatedDate", "SystemModstamp"
+    ],
+    "Task": [
+        "Id", "Subject", "Status", "Priority", "ActivityDate", "WhatId", "WhoId", "AccountId", "OwnerId",
+        "IsClosed", "IsArchived", "CreatedDate", "SystemModstamp"
+    ]
+}
+
+# Deleted records stay in the recycle bin (and so in queryAll deltas) for 15 days; a mirror
+# that has not synced for longer than this could miss deletes and is reloaded in full
+MAX_DELTA_AGE_SECONDS = 14 * 86400
+
+
+def field_value(record: Dict[str, Any], path: str) -> Any:
+    """Read a field path such as Owner.Name from a SOQL result record"""
+    value = record
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def soql_datetime(value: str) -> str:
+    """Convert an API datetime (2024-01-31T10:00:00.000+0000) to a SOQL literal"""
+    parsed = datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z")
+    return parsed.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class MirrorTable:
+    """Column-oriented copy of one object: a list per field plus an Id -> row index"""
+
+    def __init__(self, fields: List[str], columns: Optional[Dict[str, List[Any]]] = None):
+        self.fields = fields
+        self.columns = columns or {field: [] for field in fields}
+        self.index = {record_id: row for row, record_id in enumerate(self.columns["Id"])}
+
+    def __len__(self) -> int:
+        return len(self.columns["Id"])
+
+    def upsert(self, record: Dict[str, Any]):
+        row = self.index.get(record["Id"])
+        if row is None:
+            self.index[record["Id"]] = len(self)
+            for field in self.fields:
+                self.columns[field].append(field_value(record, field))
+        else:
+            for field in self.fields:
+                self.columns[field][row] = field_value(record, field)
+
+    def delete(self, record_id: str) -> bool:
+        row = self.index.pop(record_id, None)
+        if row is None:
+            return False
+        # Move the last row into the gap so deletes stay O(1)
+        last = len(self) - 1
+        for column in self.columns.values():
+            column[row] = column[last]
+            column.pop()
+        if row != last:
+            self.index[self.columns["Id"][row]] = row
+        return True
+
+    def records(self, fields: List[str], rows: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        """Rebuild SOQL-shaped records (relationship fields nested) for the given rows"""
+        rows = range(len(self)) if rows is None else rows
+        records = []
+        for row in rows:
+            record = {}
+            for field in fields:
+                value = self.columns[field][row] if field in self.columns else None
+                if "." in field:
+                    # A null lookup comes back as a null relationship, like the API returns it
+                    relationship, name = field.split(".", 1)
+                    if value is not None and record.get(relationship) is None:
+                        record[relationship] = {}
+                    if record.get(relationship) is not None:
+                        record[relationship][name] = value
+                    else:
+                        record[relationship] = None
+                else:
+                    record[field] = value
+            records.append(record)
+        return records
+
+
+class SalesforceMirror:
+    """Per-org local mirror of Account, Opportunity, Contact and Task.
+
+    An org is loaded in full once and then kept current with SystemModstamp delta
+    syncs (queryAll, so deletes are seen) on a schedule. Tables are held in memory
+    as columns and persisted per org as Parquet, or JSON without pyarrow. Reads
+    state how old the mirror is so callers can apply their own freshness bound.
+
+    A mirror holds what its sync user can see (sharing rules and field-level
+    security apply to the sync queries), so each object records the user it was
+    synced as and callers decide who may read it. Scheduled syncs run as the
+    user who enrolled the org; a sync as another user reloads each object in full.
+    """
+
+    def __init__(
+        self,
+        mirror_dir: str,
+        schema_cache,
+        sync_interval: float = 300.0,
+        objects: Optional[Dict[str, List[str]]] = None,
+        on_change: Optional[Callable[[str, str], None]] = None
+    ):
+        self.mirror_dir = mirror_dir
+        self.schema_cache = schema_cache
+        self.sync_interval = sync_interval
+        self.objects = objects or MIRROR_OBJECT_FIELDS
+        self.on_change = on_change  # Called with (org id, object) when a sync saw modified or deleted records
+        self._tables: Dict[str, Dict[str, MirrorTable]] = {}
+        self._state: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._connectors: Dict[str, Callable[[], Awaitable[Any]]] = {}
+        self._sync_users: Dict[str, str] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._syncs: Set[asyncio.Task] = set()
+        self.stats_counters = {"full_loads": 0, "delta_syncs": 0, "records_synced": 0, "records_deleted": 0, "reads": 0, "errors": 0}
+        os.makedirs(mirror_dir, exist_ok=True)
+
+    def _org_dir(self, org_id: str) -> str:
+        return os.path.join(self.mirror_dir, org_id)
+
+    def _load_org(self, org_id: str):
+        if org_id in self._state:
+            return
+        tables, state = {}, {}
+        try:
+            with open(os.path.join(self._org_dir(org_id), "state.json")) as f:
+                state = json.load(f)
+            for object_name, object_state in state.items():
+                tables[object_name] = MirrorTable(object_state["fields"], self._read_columns(org_id, object_name))
+        except (OSError, ValueError, KeyError) as e:
+            if state:
+                print(f"Discarding unreadable Salesforce mirror for org {org_id}: {e}")
+            tables, state = {}, {}
+        self._tables[org_id] = tables
+        self._state[org_id] = state
+
+    def _read_columns(self, org_id: str, object_name: str) -> Dict[str, List[Any]]:
+        path = os.path.join(self._org_dir(org_id), object_name)
+        if pq is not None and os.path.exists(f"{path}.parquet"):
+            return pq.read_table(f"{path}.parquet").to_pydict()
+        with open(f"{path}.json") as f:
+            return json.load(f)
+
+    def _write_org(self, org_id: str, object_name: str, columns: Dict[str, List[Any]], state: Dict[str, Any]):
+        directory = self._org_dir(org_id)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, object_name)
+        if pq is not None:
+            pq.write_table(pa.table(columns), f"{path}.parquet.tmp")
+            os.replace(f"{path}.parquet.tmp", f"{path}.parquet")
+        else:
+            with open(f"{path}.json.tmp", "w") as f:
+                json.dump(columns, f)
+            os.replace(f"{path}.json.tmp", f"{path}.json")
+        with open(os.path.join(directory, "state.json.tmp"), "w") as f:
+            json.dump(state, f)
+        os.replace(os.path.join(directory, "state.json.tmp"), os.path.join(directory, "state.json"))
+
+    async def _persist(self, org_id: str, object_name: str):
+        # Snapshot the columns so a concurrent sync does not change them while they are written
+        table = self._tables[org_id][object_name]
+        columns = {field: list(values) for field, values in table.columns.items()}
+        state = json.loads(json.dumps(self._state[org_id]))
+        try:
+            await asyncio.to_thread(self._write_org, org_id, object_name, columns, state)
+        except Exception as e:
+            print(f"Failed to persist Salesforce mirror {object_name} for org {org_id}: {e}")
+
+    def is_enrolled(self, org_id: str) -> bool:
+        self._load_org(org_id)
+        return org_id in self._connectors or bool(self._state[org_id])
+
+    def enroll(self, org_id: str, username: str, connect: Callable[[], Awaitable[Any]]):
+        """Mirror an org as `username`; `connect` returns an AsyncSalesforce logged in as that user for the scheduled syncs"""
+        self._load_org(org_id)
+        self._connectors[org_id] = connect
+        self._sync_users[org_id] = username
+
+    def sync_user(self, org_id: str) -> Optional[str]:
+        """The user scheduled syncs of the org run as (the last one it was enrolled or synced as)"""
+        self._load_org(org_id)
+        users = [state.get("synced_as") for state in self._state[org_id].values()]
+        return self._sync_users.get(org_id) or next((user for user in users if user), None)
+
+    def synced_as(self, org_id: str, object_names: List[str]) -> Optional[str]:
+        """The user every one of the objects was synced as, or None if they differ or one was never loaded"""
+        self._load_org(org_id)
+        state = self._state[org_id]
+        users = {state[name].get("synced_as") if name in state else None for name in object_names}
+        return users.pop() if len(users) == 1 else None
+
+    def age(self, org_id: str, object_names: List[str]) -> Optional[float]:
+        """Seconds since the oldest of the objects was last synced, or None if one was never loaded"""
+        self._load_org(org_id)
+        state = self._state[org_id]
+        if not all(name in state for name in object_names):
+            return None
+        return time.time() - min(state[name]["synced_at"] for name in object_names)
+
+    def synced_at(self, org_id: str, object_name: str) -> Optional[float]:
+        self._load_org(org_id)
+        state = self._state[org_id].get(object_name)
+        return state["synced_at"] if state else None
+
+    def table(self, org_id: str, object_name: str) -> Optional[MirrorTable]:
+        self._load_org(org_id)
+        table = self._tables[org_id].get(object_name)
+        if table is not None:
+            self.stats_counters["reads"] += 1
+        return table
+
+    async def _mirror_fields(self, sf, object_name: str) -> List[str]:
+        wanted = self.objects[object_name]
+        try:
+            describe = await self.schema_cache.get_object(sf, object_name)
+        except Exception as e:
+            print(f"Could not describe {object_name} for the mirror, using the default fields: {e}")
+            return wanted
+        if not describe:
+            raise ValueError(f"Object {object_name} does not exist in this org")
+        names = {field["name"].lower() for field in describe["fields"]}
+        relationships = {(field.get("relationshipName") or "").lower() for field in describe["fields"]}
+        return [
+            field for field in wanted
+            if field.lower() in names or ("." in field and field.split(".")[0].lower() in relationships)
+        ]
+
+    async def sync_object(self, sf, object_name: str, full: bool = False):
+        org_id = sf.org_id
+        self._load_org(org_id)
+        state = self._state[org_id].get(object_name)
+        if state and not full and time.time() - state["synced_at"] > MAX_DELTA_AGE_SECONDS:
+            print(f"🪞 Mirror of {object_name} for org {org_id} is too old for a delta sync, reloading")
+            full = True
+        if state and not full and state.get("synced_as") != sf.username:
+            print(f"🪞 Mirror of {object_name} for org {org_id} was synced as another user, reloading")
+            full = True
+        full = full or state is None
+
+        fields = await self._mirror_fields(sf, object_name) if full else state["fields"]
+        table = MirrorTable(fields) if full else self._tables[org_id][object_name]
+        watermark = None if full else state.get("watermark")
+        select = list(fields)
+        if not full:
+            select.append("IsDeleted")
+        soql = f"SELECT {', '.join(select)} FROM {object_name}"
+        if watermark:
+            # >= re-reads records modified in the same second; upserts make that harmless
+            soql += f" WHERE SystemModstamp >= {soql_datetime(watermark)}"
+
+        started_at = time.time()
+        synced = deleted = 0
+        previous_watermark = watermark
+        async for batch in sf.iter_query_batches(soql, include_deleted=not full):
+            for record in batch["records"]:
+                if record.get("IsDeleted") or record.get("IsArchived"):
+                    deleted += table.delete(record["Id"])
+                else:
+                    table.upsert(record)
+                    synced += 1
+                modstamp = record.get("SystemModstamp")
+                if modstamp and (watermark is None or modstamp > watermark):
+                    watermark = modstamp
+
+        self._tables[org_id][object_name] = table
+        self._state[org_id][object_name] = {
+            "fields": fields,
+            "watermark": watermark,
+            "synced_at": started_at,
+            "loaded_at": started_at if full else state["loaded_at"],
+            "records": len(table),
+            "synced_as": sf.username
+        }
+        self.stats_counters["full_loads" if full else "delta_syncs"] += 1
+        self.stats_counters["records_synced"] += synced
+        self.stats_counters["records_deleted"] += deleted
+        await self._persist(org_id, object_name)
+        # Records re-read at the watermark itself are not changes
+        if self.on_change and (deleted or watermark != previous_watermark):
+            self.on_change(org_id, object_name)
+        print(f"🪞 Mirrored {object_name} for org {org_id} ({'full' if full else 'delta'}): {synced} upserted, {deleted} deleted")
+
+    async def sync(self, sf, full: bool = False):
+        """Bring every mirrored object of an org up to date; one sync per org runs at a time"""
+        lock = self._locks.setdefault(sf.org_id, asyncio.Lock())
+        async with lock:
+            for object_name in self.objects:
+                try:
+                    await self.sync_object(sf, object_name, full=full)
+                except SalesforceExpiredSession:
+                    # Scheduled syncs resume once the sync user connects again and re-enrolls a live session
+                    self.stats_counters["errors"] += 1
+                    self._connectors.pop(sf.org_id, None)
+                    print(f"Salesforce session for the mirror of org {sf.org_id} expired, pausing scheduled syncs")
+                    return
+                except Exception as e:
+                    self.stats_counters["errors"] += 1
+                    print(f"Error mirroring {object_name} for org {sf.org_id}: {e}")
+
+    def sync_in_background(self, sf, full: bool = False):
+        task = asyncio.create_task(self.sync(sf, full=full))
+        self._syncs.add(task)
+        task.add_done_callback(self._syncs.discard)
+
+    async def run(self):
+        """Background loop that delta-syncs every enrolled org once its mirror is older than sync_interval"""
+        print("Salesforce mirror scheduler started")
+        while True:
+            for org_id, connect in list(self._connectors.items()):
+                age = self.age(org_id, list(self.objects))
+                if (age is not None and age < self.sync_interval) or self._locks.get(org_id, asyncio.Lock()).locked():
+                    continue
+                try:
+                    self.sync_in_background(await connect())
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.stats_counters["errors"] += 1
+                    print(f"Error starting mirror sync for org {org_id}: {e}")
+            await asyncio.sleep(min(self.sync_interval, 30))
+
+    def status(self, org_id: str) -> Dict[str, Any]:
+        self._load_org(org_id)
+        now = time.time()
+        return {
+            "org_id": org_id,
+            "scheduled": org_id in self._connectors,
+            "sync_user": self.sync_user(org_id),
+            "syncing": self._locks.get(org_id, asyncio.Lock()).locked(),
+            "objects": {
+                name: {
+                    "records": state["records"],
+                    "age_seconds": round(now - state["synced_at"], 1),
+                    "watermark": state["watermark"]
+                }
+                for name, state in self._state[org_id].items()
+            }
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "orgs": len(self._state),
+            "scheduled_orgs": len(self._connectors),
+            "records": sum(len(table) for tables in self._tables.values() for table in tables.values()),
+            "sync_interval": self.sync_interval,
+            **self.stats_counters
+        }
@@ -0,0 +1,108 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict
+
+from simple_salesforce import Salesforce
+
+
+class SalesforceSessionPool:
+    """Pool of authenticated Salesforce sessions keyed by a hash of the credentials.
+
+    A session is reused until it has been idle longer than `idle_ttl`, after which
+    it is re-authenticated on next use. Sessions that expire server-side are
+    re-authenticated transparently by simple_salesforce on INVALID_SESSION_ID;
+    the pool hooks that login call so re-logins are counted as well.
+    """
+
+    def __init__(self, idle_ttl: float = 3600.0, max_sessions: int = 200):
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self.stats_counters = {
+            "hits": 0,
+            "misses": 0,
+            "logins": 0,
+            "relogins": 0,
+            "login_failures": 0,
+            "evictions": 0
+        }
+
+    @staticmethod
+    def credentials_key(username: str, password: str, security_token: str, domain: str) -> str:
+        # The password is part of the key so a wrong password never reuses another caller's session
+        material = "\0".join([username.lower(), password, security_token, domain])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get_session(self, username: str, password: str, security_token: str, domain: str) -> Salesforce:
+        key = self.credentials_key(username, password, security_token, domain)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Serialize logins per credential set so concurrent requests share one login
+        with key_lock:
+            with self._lock:
+                entry = self._sessions.get(key)
+                if entry:
+                    self._sessions.move_to_end(key)
+
+            if entry:
+                if time.time() - entry["last_used"] > self.idle_ttl:
+                    # Likely expired server-side, refresh before use instead of failing a request
+                    entry["sf"]._refresh_session()
+                else:
+                    with self._lock:
+                        self.stats_counters["hits"] += 1
+                entry["last_used"] = time.time()
+                return entry["sf"]
+
+            with self._lock:
+                self.stats_counters["misses"] += 1
+            try:
+                sf = Salesforce(
+                    username=username,
+                    password=password,
+                    security_token=security_token,
+                    domain=domain
+                )
+            except Exception:
+                with self._lock:
+                    self.stats_counters["login_failures"] += 1
+                raise
+
+            self._count_logins(sf)
+            with self._lock:
+                self.stats_counters["logins"] += 1
+                self._sessions[key] = {"sf": sf, "created_at": time.time(), "last_used": time.time()}
+                while len(self._sessions) > self.max_sessions:
+                    evicted_key, _ = self._sessions.popitem(last=False)
+                    self._key_locks.pop(evicted_key, None)
+                    self.stats_counters["evictions"] += 1
+            return sf
+
+    def _count_logins(self, sf: Salesforce):
+        """Wrap the session's login callable so transparent re-authentication is counted"""
+        login = sf._salesforce_login_partial
+
+        def counted_login():
+            with self._lock:
+                self.stats_counters["relogins"] += 1
+            return login()
+
+        sf._salesforce_login_partial = counted_login
+
+    def invalidate(self, username: str, password: str, security_token: str, domain: str):
+        key = self.credentials_key(username, password, security_token, domain)
+        with self._lock:
+            self._sessions.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                **self.stats_counters
+            }
@@ -0,0 +1,214 @@
+import asyncio
+import json
+import os
+import time
+from email.utils import formatdate
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from simple_salesforce.exceptions import SalesforceError, SalesforceResourceNotFound
+
+# Describes fetched within this window (e.g. a warm-up) are written to disk together
+SCHEMA_PERSIST_DELAY_SECONDS = 1.0
+
+# Field properties kept from describe(), enough for prompts, validation and corrections
+FIELD_PROPERTIES = ("name", "label", "type", "relationshipName", "referenceTo", "filterable", "groupable", "sortable", "aggregatable")
+
+
+def format_object_fields(object_fields: Dict[str, List[str]]) -> str:
+    """Format an object -> fields mapping as the "- Object: field, field" lines used in prompts"""
+    return "\n".join(f"- {object_name}: {', '.join(fields)}" for object_name, fields in object_fields.items())
+
+
+def compact_describe(describe: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": describe["name"],
+        "label": describe.get("label"),
+        "fields": [{prop: field.get(prop) for prop in FIELD_PROPERTIES} for field in describe.get("fields", [])],
+        "childRelationships": [
+            {"relationshipName": child["relationshipName"], "childSObject": child["childSObject"], "field": child.get("field")}
+            for child in describe.get("childRelationships", []) if child.get("relationshipName")
+        ]
+    }
+
+
+class SalesforceSchemaCache:
+    """Per-org cache of sObject describe results.
+
+    Describes are loaded lazily (or warmed when a session is created), kept in
+    memory, persisted as one JSON file per org, and revalidated with
+    If-Modified-Since once they are older than `ttl`. Writes are coalesced per
+    org and run off the event loop.
+    """
+
+    def __init__(self, cache_dir: str, ttl: float = 86400.0):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self._orgs: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._fetches: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._warmups: Set[asyncio.Task] = set()
+        self._pending_writes: Set[str] = set()
+        self._writes: Set[asyncio.Task] = set()
+        self.stats_counters = {"hits": 0, "describes": 0, "not_modified": 0, "errors": 0, "writes": 0}
+
+    def _org_path(self, org_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{org_id}.json")
+
+    def _org(self, org_id: str) -> Dict[str, Dict[str, Any]]:
+        if org_id not in self._orgs:
+            objects = {}
+            try:
+                with open(self._org_path(org_id)) as f:
+                    objects = json.load(f)
+            except (OSError, ValueError):
+                pass
+            self._orgs[org_id] = objects
+        return self._orgs[org_id]
+
+    def _write_org(self, org_id: str, objects: Dict[str, Dict[str, Any]]):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._org_path(org_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(objects, f)
+        os.replace(tmp_path, path)
+
+    def _persist(self, org_id: str):
+        """Schedule a write of the org's describes; changes made before it starts share it"""
+        if org_id in self._pending_writes:
+            return
+        try:
+            task = asyncio.get_running_loop().create_task(self._persist_later(org_id))
+        except RuntimeError:
+            # No event loop (e.g. a script), write right away
+            try:
+                self._write_org(org_id, dict(self._orgs[org_id]))
+            except OSError as e:
+                print(f"Failed to persist schema cache for org {org_id}: {e}")
+            return
+        self._pending_writes.add(org_id)
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    async def _persist_later(self, org_id: str):
+        await asyncio.sleep(SCHEMA_PERSIST_DELAY_SECONDS)
+        # Changes from here on schedule their own write
+        self._pending_writes.discard(org_id)
+        # Entries are replaced, never mutated, so a shallow copy is a consistent snapshot
+        objects = dict(self._orgs[org_id])
+        try:
+            await asyncio.to_thread(self._write_org, org_id, objects)
+            self.stats_counters["writes"] += 1
+        except OSError as e:
+            print(f"Failed to persist schema cache for org {org_id}: {e}")
+
+    async def flush(self):
+        """Wait for scheduled writes (used at shutdown)"""
+        while self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+
+    def peek(self, org_id: str, object_name: str) -> Optional[Dict[str, Any]]:
+        """Return a cached describe without fetching (may be stale)"""
+        entry = self._org(org_id).get(object_name.lower())
+        return entry["describe"] if entry else None
+
+    async def get_object(self, sf, object_name: str) -> Optional[Dict[str, Any]]:
+        """Return the describe for an object, fetching or revalidating it when needed"""
+        org_id = sf.org_id
+        key = object_name.lower()
+        entry = self._org(org_id).get(key)
+        if entry and time.time() - entry["fetched_at"] < self.ttl:
+            self.stats_counters["hits"] += 1
+            return entry["describe"]
+
+        fetch = self._fetches.get((org_id, key))
+        if fetch is None:
+            fetch = asyncio.ensure_future(self._fetch(sf, object_name, entry))
+            self._fetches[(org_id, key)] = fetch
+            fetch.add_done_callback(lambda _: self._fetches.pop((org_id, key), None))
+        return await asyncio.shield(fetch)
+
+    async def _fetch(self, sf, object_name: str, entry: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        org_id = sf.org_id
+        key = object_name.lower()
+        headers = {"If-Modified-Since": formatdate(entry["fetched_at"], usegmt=True)} if entry else None
+        try:
+            describe = compact_describe(await sf.describe_object(object_name, headers=headers))
+            self.stats_counters["describes"] += 1
+        except SalesforceResourceNotFound:
+            # Remember missing objects too, so they are not described on every request
+            describe = None
+        except SalesforceError as e:
+            if entry and getattr(e, "status", None) == 304:
+                self.stats_counters["not_modified"] += 1
+                describe = entry["describe"]
+            else:
+                self.stats_counters["errors"] += 1
+                print(f"Error describing {object_name}: {e}")
+                if entry:
+                    return entry["describe"]
+                raise
+
+        self._org(org_id)[key] = {"describe": describe, "fetched_at": time.time()}
+        self._persist(org_id)
+        return describe
+
+    async def warm(self, sf, object_names: Iterable[str]):
+        """Load describes for several objects concurrently (used when a session is created)"""
+        await asyncio.gather(*(self.get_object(sf, name) for name in object_names), return_exceptions=True)
+
+    def warm_in_background(self, sf, object_names: Iterable[str]):
+        """Start warming the cache for an org unless it is already fresh"""
+        object_names = list(object_names)
+        if self.is_warm(sf.org_id, object_names):
+            return
+        task = asyncio.create_task(self.warm(sf, object_names))
+        self._warmups.add(task)
+        task.add_done_callback(self._warmups.discard)
+
+    def is_warm(self, org_id: str, object_names: Iterable[str]) -> bool:
+        objects = self._org(org_id)
+        now = time.time()
+        return all(
+            name.lower() in objects and now - objects[name.lower()]["fetched_at"] < self.ttl
+            for name in object_names
+        )
+
+    def invalidate(self, org_id: str, object_name: Optional[str] = None):
+        if object_name:
+            self._org(org_id).pop(object_name.lower(), None)
+        else:
+            self._org(org_id).clear()
+        self._persist(org_id)
+
+    async def field_names(self, sf, object_name: str) -> List[str]:
+        describe = await self.get_object(sf, object_name)
+        return [field["name"] for field in describe["fields"]] if describe else []
+
+    async def describe_for_prompt(self, sf, default_fields: Dict[str, List[str]], max_fields: int = 40) -> str:
+        """
+        Build the "Object: field, field, ..." lines used in the LLM prompts from the org's
+        real schema. Default fields that exist come first, followed by custom fields.
+        Objects that cannot be described fall back to the default list.
+        """
+        describes = await asyncio.gather(
+            *(self.get_object(sf, name) for name in default_fields),
+            return_exceptions=True
+        )
+        object_fields = {}
+        for (object_name, defaults), describe in zip(default_fields.items(), describes):
+            if not describe or isinstance(describe, Exception):
+                object_fields[object_name] = defaults
+                continue
+            existing = {field["name"].lower(): field["name"] for field in describe["fields"]}
+            fields = [existing[name.lower()] for name in defaults if name.lower() in existing]
+            custom = [field["name"] for field in describe["fields"] if field["name"].endswith("__c")]
+            fields += [name for name in custom if name not in fields]
+            object_fields[object_name] = fields[:max_fields]
+        return format_object_fields(object_fields)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "orgs": len(self._orgs),
+            "objects": sum(len(objects) for objects in self._orgs.values()),
+            **self.stats_counters
+        }
@@ -0,0 +1,585 @@
+"""
+Local SOQL parser and validator.
+
+Checks LLM-generated SOQL before it is sent to Salesforce: syntax, bind
+variables, aggregate/GROUP BY consistency and (given describe metadata from
+the schema cache) object and field names. Problems that have an unambiguous
+fix are corrected in place; everything else is reported as an error so the
+query never costs an API call.
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+AGGREGATE_FUNCTIONS = {"COUNT", "COUNT_DISTINCT", "SUM", "AVG", "MIN", "MAX"}
+NUMERIC_AGGREGATES = {"SUM", "AVG"}
+NUMERIC_TYPES = {"currency", "double", "int", "long", "percent"}
+DATE_LITERALS = {
+    "YESTERDAY", "TODAY", "TOMORROW", "LAST_WEEK", "THIS_WEEK", "NEXT_WEEK", "LAST_MONTH", "THIS_MONTH",
+    "NEXT_MONTH", "LAST_90_DAYS", "NEXT_90_DAYS", "THIS_QUARTER", "LAST_QUARTER", "NEXT_QUARTER",
+    "THIS_YEAR", "LAST_YEAR", "NEXT_YEAR", "THIS_FISCAL_QUARTER", "LAST_FISCAL_QUARTER",
+    "NEXT_FISCAL_QUARTER", "THIS_FISCAL_YEAR", "LAST_FISCAL_YEAR", "NEXT_FISCAL_YEAR"
+}
+CLAUSE_KEYWORDS = {"FROM", "WHERE", "WITH", "GROUP", "HAVING", "ORDER", "LIMIT", "OFFSET", "FOR", "USING", "UPDATE"}
+
+TOKEN_PATTERN = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+  | (?P<datetime>\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2}))
+  | (?P<date>\d{4}-\d{2}-\d{2})
+  | (?P<number>-?\d+(?:\.\d+)?)
+  | (?P<nliteral>(?:[A-Za-z_]+_)?N_[A-Za-z_]+:\d+)
+  | (?P<bind>:[A-Za-z_]\w*)
+  | (?P<ident>[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)
+  | (?P<op>!=|<>|<=|>=|=|<|>)
+  | (?P<punct>[(),])
+""", re.VERBOSE)
+
+
+class SOQLSyntaxError(ValueError):
+    pass
+
+
+def tokenize(query: str) -> List[Tuple[str, str, int, int]]:
+    """Split a query into (kind, text, start, end) tokens"""
+    tokens = []
+    position = 0
+    while position < len(query):
+        match = TOKEN_PATTERN.match(query, position)
+        if not match:
+            raise SOQLSyntaxError(f"Unexpected character '{query[position]}' at position {position}")
+        if match.lastgroup != "ws":
+            tokens.append((match.lastgroup, match.group(), match.start(), match.end()))
+        position = match.end()
+    return tokens
+
+
+def strip_query_text(text: str) -> str:
+    """Remove markdown fences, leading prose and trailing semicolons around a generated query"""
+    text = re.sub(r"```(?:sql|soql)?", "", text, flags=re.IGNORECASE).strip()
+    select = re.search(r"\bSELECT\b", text, re.IGNORECASE)
+    if select:
+        text = text[select.start():]
+    return text.strip().rstrip(";").strip()
+
+
+def normalize_expression(text: str) -> str:
+    return re.sub(r"\s+", "", text).upper()
+
+
+class _Parser:
+    """Recursive descent parser producing a light dict-based description of a query"""
+
+    def __init__(self, query: str, tokens: List[Tuple[str, str, int, int]]):
+        self.query = query
+        self.tokens = tokens
+        self.index = 0
+
+    def peek(self, offset: int = 0) -> Optional[Tuple[str, str, int, int]]:
+        index = self.index + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def next(self) -> Tuple[str, str, int, int]:
+        token = self.peek()
+        if token is None:
+            raise SOQLSyntaxError("Unexpected end of query")
+        self.index += 1
+        return token
+
+    def at_keyword(self, *keywords: str, offset: int = 0) -> bool:
+        token = self.peek(offset)
+        return token is not None and token[0] == "ident" and token[1].upper() in keywords
+
+    def at_punct(self, value: str) -> bool:
+        token = self.peek()
+        return token is not None and token[0] == "punct" and token[1] == value
+
+    def expect_keyword(self, keyword: str) -> Tuple[str, str, int, int]:
+        if not self.at_keyword(keyword):
+            found = self.peek()
+            raise SOQLSyntaxError(f"Expected {keyword} but found {found[1] if found else 'end of query'}")
+        return self.next()
+
+    def expect_punct(self, value: str) -> Tuple[str, str, int, int]:
+        if not self.at_punct(value):
+            found = self.peek()
+            raise SOQLSyntaxError(f"Expected '{value}' but found {found[1] if found else 'end of query'}")
+        return self.next()
+
+    def expect_ident(self, what: str) -> Tuple[str, str, int, int]:
+        token = self.peek()
+        if token is None or token[0] != "ident":
+            raise SOQLSyntaxError(f"Expected {what} but found {token[1] if token else 'end of query'}")
+        return self.next()
+
+    def parse(self) -> Dict[str, Any]:
+        query = self.parse_query()
+        if self.peek() is not None:
+            raise SOQLSyntaxError(f"Unexpected '{self.peek()[1]}' at position {self.peek()[2]}")
+        return query
+
+    def parse_query(self, nested: bool = False) -> Dict[str, Any]:
+        query = {
+            "select": [], "subqueries": [], "semi_joins": [], "where": [], "group_by": [], "group_by_end": None,
+            "having": [], "order_by": [], "alias": None, "limit": None
+        }
+        self.expect_keyword("SELECT")
+        self.parse_select_list(query)
+        self.expect_keyword("FROM")
+        object_token = self.expect_ident("an object name")
+        query["object"] = object_token[1]
+        query["object_span"] = (object_token[2], object_token[3])
+
+        token = self.peek()
+        if token and token[0] == "ident" and token[1].upper() not in CLAUSE_KEYWORDS:
+            query["alias"] = self.next()[1]
+        if self.at_keyword("USING"):
+            self.next()
+            self.expect_keyword("SCOPE")
+            self.expect_ident("a scope")
+        if self.at_keyword("WHERE"):
+            self.next()
+            self.parse_condition(query, query["where"])
+        if self.at_keyword("WITH"):
+            # WITH SECURITY_ENFORCED / DATA CATEGORY ... is passed through unchecked
+            self.next()
+            while self.peek() and not self.at_keyword("GROUP", "ORDER", "LIMIT", "OFFSET", "FOR", "UPDATE") and not self.at_punct(")"):
+                self.next()
+
+        query["group_by_at"] = self.peek()[2] if self.peek() else len(self.query)
+        if self.at_keyword("GROUP"):
+            self.next()
+            self.expect_keyword("BY")
+            if self.at_keyword("ROLLUP", "CUBE"):
+                self.next()
+                self.expect_punct("(")
+                self.parse_expression_list(query["group_by"])
+                self.expect_punct(")")
+            else:
+                self.parse_expression_list(query["group_by"])
+            query["group_by_end"] = query["group_by"][-1]["end"]
+        if self.at_keyword("HAVING"):
+            self.next()
+            self.parse_condition(query, query["having"])
+        if self.at_keyword("ORDER"):
+            self.next()
+            self.expect_keyword("BY")
+            while True:
+                query["order_by"].append(self.parse_expression())
+                if self.at_keyword("ASC", "DESC"):
+                    self.next()
+                if self.at_keyword("NULLS"):
+                    self.next()
+                    if not self.at_keyword("FIRST", "LAST"):
+                        raise SOQLSyntaxError("Expected FIRST or LAST after NULLS")
+                    self.next()
+                if not self.at_punct(","):
+                    break
+                self.next()
+        for clause in ("LIMIT", "OFFSET"):
+            if self.at_keyword(clause):
+                self.next()
+                token = self.next()
+                if token[0] not in ("number", "bind"):
+                    raise SOQLSyntaxError(f"{clause} requires a number, found {token[1]}")
+                if clause == "LIMIT" and token[0] == "number":
+                    query["limit"] = int(float(token[1]))
+        if self.at_keyword("FOR", "UPDATE"):
+            self.next()
+            self.expect_ident("VIEW, REFERENCE or UPDATE")
+            if self.at_keyword("TRACKING", "VIEWSTAT"):
+                self.next()
+        if nested and not self.at_punct(")"):
+            found = self.peek()
+            raise SOQLSyntaxError(f"Unexpected '{found[1] if found else 'end of query'}' in subquery")
+        return query
+
+    def parse_select_list(self, query: Dict[str, Any]):
+        while True:
+            if self.at_punct("("):
+                self.next()
+                subquery = self.parse_query(nested=True)
+                self.expect_punct(")")
+                query["subqueries"].append(subquery)
+            elif self.at_keyword("TYPEOF"):
+                # Polymorphic TYPEOF ... END blocks are passed through unchecked
+                while not self.at_keyword("END"):
+                    self.next()
+                self.next()
+            else:
+                item = self.parse_expression()
+                token = self.peek()
+                if token and token[0] == "ident" and not self.at_keyword("FROM"):
+                    if item["kind"] == "field":
+                        raise SOQLSyntaxError(f"Unexpected '{token[1]}' after field {item['text']}")
+                    item["alias"] = self.next()[1]
+                query["select"].append(item)
+            if not self.at_punct(","):
+                return
+            self.next()
+            if self.at_keyword("FROM"):
+                raise SOQLSyntaxError("Trailing comma before FROM")
+
+    def parse_expression_list(self, items: List[Dict[str, Any]]):
+        while True:
+            items.append(self.parse_expression())
+            if not self.at_punct(","):
+                return
+            self.next()
+
+    def parse_expression(self) -> Dict[str, Any]:
+        """A field path or a function call such as SUM(Amount), COUNT() or CALENDAR_QUARTER(CloseDate)"""
+        token = self.expect_ident("a field name")
+        if not self.at_punct("("):
+            if token[1].upper() in CLAUSE_KEYWORDS:
+                raise SOQLSyntaxError(f"Expected a field name but found {token[1]}")
+            return {"kind": "field", "path": token[1], "text": token[1], "start": token[2], "end": token[3], "alias": None}
+
+        function = token[1].upper()
+        self.next()
+        arguments = []
+        if not self.at_punct(")"):
+            while True:
+                arguments.append(self.parse_expression())
+                if not self.at_punct(","):
+                    break
+                self.next()
+        end = self.expect_punct(")")[3]
+        if function == "COUNT" and not arguments:
+            kind = "count_all"
+        elif function in AGGREGATE_FUNCTIONS or any(arg["kind"] in ("aggregate", "count_all") for arg in arguments):
+            kind = "aggregate"
+        else:
+            kind = "function"
+        fields = [arg for arg in arguments if arg["kind"] == "field"] + [
+            field for arg in arguments if arg["kind"] != "field" for field in arg.get("fields", [])
+        ]
+        return {
+            "kind": kind, "function": function, "fields": fields,
+            "path": fields[0]["path"] if len(fields) == 1 else None,
+            "text": self.query[token[2]:end], "start": token[2], "end": end, "alias": None
+        }
+
+    def parse_condition(self, query: Dict[str, Any], conditions: List[Dict[str, Any]]):
+        self.parse_and(query, conditions)
+        while self.at_keyword("OR"):
+            self.next()
+            self.parse_and(query, conditions)
+
+    def parse_and(self, query: Dict[str, Any], conditions: List[Dict[str, Any]]):
+        self.parse_not(query, conditions)
+        while self.at_keyword("AND"):
+            self.next()
+            self.parse_not(query, conditions)
+
+    def parse_not(self, query: Dict[str, Any], conditions: List[Dict[str, Any]]):
+        if self.at_keyword("NOT"):
+            self.next()
+            self.parse_not(query, conditions)
+        elif self.at_punct("("):
+            self.next()
+            self.parse_condition(query, conditions)
+            self.expect_punct(")")
+        else:
+            self.parse_comparison(query, conditions)
+
+    def parse_comparison(self, query: Dict[str, Any], conditions: List[Dict[str, Any]]):
+        operand = self.parse_expression()
+        token = self.peek()
+        if token and token[0] == "op":
+            operator = self.next()[1]
+        elif self.at_keyword("NOT") and self.at_keyword("IN", offset=1):
+            self.next()
+            self.next()
+            operator = "NOT IN"
+        elif self.at_keyword("LIKE", "IN", "INCLUDES", "EXCLUDES"):
+            operator = self.next()[1].upper()
+        else:
+            raise SOQLSyntaxError(f"Expected a comparison operator after {operand['text']} but found {token[1] if token else 'end of query'}")
+
+        values = []
+        if operator in ("IN", "NOT IN", "INCLUDES", "EXCLUDES") and self.peek() and self.peek()[0] == "bind":
+            # Collection bind (Id IN :ids), substituted with a parenthesized list
+            values.append(self.next())
+        elif operator in ("IN", "NOT IN", "INCLUDES", "EXCLUDES"):
+            self.expect_punct("(")
+            if self.at_keyword("SELECT"):
+                query["semi_joins"].append(self.parse_query(nested=True))
+            else:
+                while True:
+                    values.append(self.parse_value())
+                    if not self.at_punct(","):
+                        break
+                    self.next()
+            self.expect_punct(")")
+        else:
+            values.append(self.parse_value())
+        conditions.append({"operand": operand, "operator": operator, "values": values})
+
+    def parse_value(self) -> Tuple[str, str, int, int]:
+        token = self.peek()
+        if token is None:
+            raise SOQLSyntaxError("Expected a value but found end of query")
+        if token[0] in ("string", "number", "date", "datetime", "nliteral", "bind"):
+            return self.next()
+        if token[0] == "ident":
+            value = token[1].upper()
+            if value in ("TRUE", "FALSE", "NULL") or value in DATE_LITERALS or re.fullmatch(r"[A-Z]{3}\d+(\.\d+)?", value):
+                return self.next()
+            raise SOQLSyntaxError(f"Invalid value {token[1]} (string values must be quoted)")
+        raise SOQLSyntaxError(f"Expected a value but found {token[1]}")
+
+
+def parse_soql(query: str) -> Dict[str, Any]:
+    """Parse a SOQL query, raising SOQLSyntaxError when it is malformed"""
+    return _Parser(query, tokenize(query)).parse()
+
+
+def _bind_value(name: str, context: Dict[str, Any]) -> Optional[Any]:
+    snake_case = re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+    for key in (name, snake_case, name.lower()):
+        if context.get(key) is not None:
+            return context[key]
+    return None
+
+
+def escape_soql_string(value: str) -> str:
+    """Escape a value for use inside a single-quoted SOQL string literal"""
+    return value.replace("\\", "\\\\").replace("'", "\\'")
+
+
+def escape_sosl_term(value: str) -> str:
+    """Escape SOSL reserved characters in a search term used inside FIND {...}"""
+    return re.sub(r"([?&|!{}\[\]()^~*:\\\"'+-])", r"\\\1", value)
+
+
+def _quote(value: Any) -> str:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        # Collection binds are only valid after IN / NOT IN / INCLUDES / EXCLUDES
+        return "(" + ", ".join(_quote(item) for item in value) + ")"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + escape_soql_string(str(value)) + "'"
+
+
+def apply_edits(query: str, edits: List[Tuple[int, int, str]]) -> str:
+    for start, end, replacement in sorted(edits, reverse=True):
+        query = query[:start] + replacement + query[end:]
+    return query
+
+
+class _SchemaValidator:
+    """Checks a parsed query against describe metadata ({lower object name: describe or None})"""
+
+    def __init__(self, describes: Dict[str, Optional[Dict[str, Any]]], result: Dict[str, Any], edits: List[Tuple[int, int, str]]):
+        self.describes = describes
+        self.result = result
+        self.edits = edits
+
+    def describe(self, object_name: str) -> Optional[Dict[str, Any]]:
+        key = object_name.lower()
+        if key not in self.describes:
+            if object_name not in self.result["unloaded_objects"]:
+                self.result["unloaded_objects"].append(object_name)
+            return None
+        return self.describes[key]
+
+    def resolve_field(self, describe: Dict[str, Any], path: str, alias: Optional[str], span: Tuple[int, int]) -> Optional[Dict[str, Any]]:
+        parts = path.split(".")
+        prefix = ""
+        if alias and len(parts) > 1 and parts[0].lower() == alias.lower():
+            prefix = parts[0] + "."
+            parts = parts[1:]
+        current = describe
+        for index, part in enumerate(parts):
+            fields = {field["name"].lower(): field for field in current["fields"]}
+            if index == len(parts) - 1:
+                field = fields.get(part.lower())
+                if field is None:
+                    self.invalid_field(describe["name"], current["name"], ".".join(parts), part, prefix, span)
+                return field
+            relationship = next(
+                (field for field in current["fields"] if (field.get("relationshipName") or "").lower() == part.lower()),
+                None
+            )
+            if relationship is None:
+                self.invalid_field(describe["name"], current["name"], ".".join(parts), part, prefix, span)
+                return None
+            targets = relationship.get("referenceTo") or []
+            if len(targets) != 1:
+                # Polymorphic relationships (What, Who, ...) cannot be checked statically
+                return None
+            current = self.describe(targets[0])
+            if current is None:
+                return None
+        return None
+
+    def invalid_field(self, root_object: str, object_name: str, path: str, part: str, prefix: str, span: Tuple[int, int]):
+        # "object"/"field" give the path relative to the queried object, for field correction
+        self.result["errors"].append(f"No such column '{part}' on entity '{object_name}'")
+        self.result["invalid_fields"].append({
+            "object": root_object, "field": path, "prefix": prefix, "start": span[0], "end": span[1]
+        })
+
+    def check_expression(self, describe: Dict[str, Any], expression: Dict[str, Any], alias: Optional[str], clause: str) -> Optional[Dict[str, Any]]:
+        if expression["kind"] == "field":
+            field = self.resolve_field(describe, expression["path"], alias, (expression["start"], expression["end"]))
+            if field and clause == "GROUP BY" and field.get("groupable") is False:
+                self.result["errors"].append(f"Field {expression['path']} cannot be grouped in a query call")
+            if field and clause == "WHERE" and field.get("filterable") is False:
+                self.result["errors"].append(f"Field {expression['path']} cannot be filtered in a query call")
+            return field
+        for argument in expression.get("fields", []):
+            field = self.resolve_field(describe, argument["path"], alias, (argument["start"], argument["end"]))
+            if field and expression.get("function") in NUMERIC_AGGREGATES and field.get("type") not in NUMERIC_TYPES:
+                self.result["errors"].append(
+                    f"Field {argument['path']} ({field.get('type')}) cannot be used with {expression['function']}()"
+                )
+        return None
+
+    def check_query(self, query: Dict[str, Any], describe: Dict[str, Any]):
+        alias = query["alias"]
+        for item in query["select"]:
+            self.check_expression(describe, item, alias, "SELECT")
+        for item in query["group_by"]:
+            self.check_expression(describe, item, alias, "GROUP BY")
+        for item in query["order_by"]:
+            self.check_expression(describe, item, alias, "ORDER BY")
+        for condition in query["where"] + query["having"]:
+            field = self.check_expression(describe, condition["operand"], alias, "WHERE")
+            if field and field.get("type") == "boolean":
+                # 'true'/'false' quoted as strings is a common generation mistake
+                for kind, text, start, end in condition["values"]:
+                    if kind == "string" and text[1:-1].lower() in ("true", "false"):
+                        self.edits.append((start, end, text[1:-1].lower()))
+                        self.result["corrections"].append(f"Unquoted boolean value for {condition['operand']['path']}")
+
+        for subquery in query["subqueries"]:
+            relationships = {child["relationshipName"].lower(): child for child in describe.get("childRelationships", [])}
+            child = relationships.get(subquery["object"].lower())
+            if child is None:
+                self.result["errors"].append(
+                    f"Didn't understand relationship '{subquery['object']}' in FROM part of query call (on {describe['name']})"
+                )
+                continue
+            child_describe = self.describe(child["childSObject"])
+            if child_describe:
+                self.check_query(subquery, child_describe)
+        for semi_join in query["semi_joins"]:
+            self.check_object(semi_join)
+
+    def check_object(self, query: Dict[str, Any]):
+        if query["object"].lower() not in self.describes:
+            self.describe(query["object"])
+            return
+        describe = self.describes[query["object"].lower()]
+        if describe is None:
+            self.result["errors"].append(f"sObject type '{query['object']}' is not supported")
+            return
+        self.check_query(query, describe)
+
+
+def check_aggregates(query: Dict[str, Any], result: Dict[str, Any], edits: List[Tuple[int, int, str]]):
+    """Every non-aggregated SELECT item of an aggregate query must be grouped; missing ones are added"""
+    items = query["select"]
+    aggregated = any(item["kind"] in ("aggregate", "count_all") for item in items)
+    if any(item["kind"] == "count_all" for item in items) and len(items) + len(query["subqueries"]) > 1:
+        result["errors"].append("COUNT() cannot be combined with other fields; use COUNT(Id) instead")
+        return
+    if query["having"] and not query["group_by"]:
+        result["errors"].append("HAVING requires a GROUP BY clause")
+    if not aggregated and not query["group_by"]:
+        return
+    if aggregated and query["subqueries"]:
+        result["errors"].append("Aggregate queries cannot contain relationship subqueries")
+
+    grouped = {normalize_expression(item["text"]) for item in query["group_by"]}
+    missing = [
+        item["text"] for item in items
+        if item["kind"] in ("field", "function") and normalize_expression(item["text"]) not in grouped
+    ]
+    if missing:
+        if query["group_by"]:
+            edits.append((query["group_by_end"], query["group_by_end"], ", " + ", ".join(missing)))
+        else:
+            at = query["group_by_at"]
+            clause = f"GROUP BY {', '.join(missing)}"
+            edits.append((at, at, f" {clause}" if at >= query["query_length"] else f"{clause} "))
+        result["corrections"].append(f"Added {', '.join(missing)} to GROUP BY")
+
+    grouped |= {normalize_expression(text) for text in missing}
+    aliases = {(item["alias"] or "").upper() for item in items if item["alias"]}
+    for item in query["order_by"]:
+        text = normalize_expression(item["text"])
+        if item["kind"] not in ("aggregate", "count_all") and text not in grouped and text not in aliases:
+            result["errors"].append(f"Ordered field {item['text']} must be grouped or aggregated")
+
+
+def validate_soql(
+    query: str,
+    describes: Optional[Dict[str, Optional[Dict[str, Any]]]] = None,
+    context: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Validate (and where unambiguous, correct) a SOQL query without calling Salesforce.
+
+    `describes` maps lower-cased object names to compact describes (None for objects
+    known not to exist). Objects the check needed but that were not supplied are listed
+    in `unloaded_objects` so the caller can load them and validate again.
+    """
+    result = {"valid": False, "query": query, "errors": [], "corrections": [], "invalid_fields": [], "unloaded_objects": []}
+
+    stripped = strip_query_text(query)
+    if stripped != query.strip():
+        result["corrections"].append("Removed text around the SOQL statement")
+    query = stripped
+    result["query"] = query
+
+    try:
+        tokens = tokenize(query)
+    except SOQLSyntaxError as e:
+        result["errors"].append(f"MALFORMED_QUERY: {e}")
+        return result
+
+    edits: List[Tuple[int, int, str]] = []
+    for index, (kind, text, start, end) in enumerate(tokens):
+        if kind == "string" and text.startswith('"'):
+            edits.append((start, end, _quote(text[1:-1].replace('\\"', '"'))))
+            if "Converted double-quoted strings to single quotes" not in result["corrections"]:
+                result["corrections"].append("Converted double-quoted strings to single quotes")
+        elif kind == "bind":
+            value = _bind_value(text[1:], context or {})
+            if value is None:
+                result["errors"].append(f"Unresolved bind variable {text}; use a literal value instead")
+            elif isinstance(value, (list, tuple, set, frozenset)) and (
+                index == 0 or tokens[index - 1][1].upper() not in ("IN", "INCLUDES", "EXCLUDES")
+            ):
+                result["errors"].append(f"Bind variable {text} is a list and can only be used with IN, NOT IN, INCLUDES or EXCLUDES")
+            elif isinstance(value, (list, tuple, set, frozenset)) and not value:
+                result["errors"].append(f"Bind variable {text} is an empty list; a query with IN () cannot match any record")
+            else:
+                edits.append((start, end, _quote(value)))
+                result["corrections"].append(f"Replaced bind variable {text} with {_quote(value)}")
+
+    try:
+        parsed = _Parser(query, tokens).parse()
+    except SOQLSyntaxError as e:
+        result["errors"].append(f"MALFORMED_QUERY: {e}")
+        return result
+
+    parsed["query_length"] = len(query)
+    check_aggregates(parsed, result, edits)
+    if describes is not None:
+        _SchemaValidator(describes, result, edits).check_object(parsed)
+
+    if edits:
+        corrected = apply_edits(query, edits)
+        try:
+            parse_soql(corrected)
+        except SOQLSyntaxError as e:
+            result["errors"].append(f"MALFORMED_QUERY: correction produced an invalid query: {e}")
+            return result
+        result["query"] = corrected
+    result["valid"] = not result["errors"]
+    return result
@@ -0,0 +1,223 @@
+"""
+Result cache for SOQL queries, keyed by org, querying user and normalized query text.
+
+Lookups, stage rollups and overview queries repeat many times a minute across
+endpoints. Results are kept for a TTL that depends on the objects a query reads
+(users change rarely, tasks often), in a size-bounded LRU. Entries can be
+dropped early by Change Data Capture events or by a mirror delta sync, and
+optionally revalidated with a cheap SystemModstamp probe before being served.
+Sharing rules and field-level security make a result specific to the user that
+fetched it, so entries are never served to another user of the same org.
+"""
+import copy
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from simple_salesforce.exceptions import SalesforceMalformedRequest
+
+from soql_parser import SOQLSyntaxError, parse_soql, tokenize
+
+# Default per-object TTLs in seconds; objects not listed use the cache's default TTL
+DEFAULT_OBJECT_TTLS = {
+    "User": 3600, "Profile": 3600, "UserRole": 3600, "RecordType": 3600, "Organization": 3600,
+    "Account": 300, "Contact": 300, "Product2": 900, "Pricebook2": 900, "PricebookEntry": 900,
+    "Opportunity": 120, "OpportunityLineItem": 120, "Lead": 120,
+    "Case": 60, "Task": 60, "Event": 60
+}
+
+# Standard child relationship names used in parent-child subqueries -> the object they read
+CHILD_RELATIONSHIP_OBJECTS = {
+    "OPPORTUNITIES": "Opportunity", "CONTACTS": "Contact", "CASES": "Case", "TASKS": "Task", "EVENTS": "Event",
+    "OPPORTUNITYLINEITEMS": "OpportunityLineItem", "OPPORTUNITYCONTACTROLES": "OpportunityContactRole",
+    "ACTIVITYHISTORIES": "Task", "OPENACTIVITIES": "Task", "NOTES": "Note", "ATTACHMENTS": "Attachment"
+}
+
+# SystemModstamp is set by the Salesforce clock; probes look this far behind the fetch time
+MODSTAMP_CLOCK_SKEW_SECONDS = 30
+
+
+def normalize_soql(soql: str) -> str:
+    """Canonical query text: single spaces, keywords and names upper-cased, string literals untouched"""
+    return " ".join(text if kind == "string" else text.upper() for kind, text, _, _ in tokenize(soql))
+
+
+def query_objects(soql: str) -> Set[str]:
+    """Objects a query reads: the FROM object, parent-child subqueries and semi-joins"""
+    query = parse_soql(soql)
+    objects = set()
+    pending = [(query, False)]
+    while pending:
+        current, is_child = pending.pop()
+        name = current["object"]
+        if is_child:
+            name = CHILD_RELATIONSHIP_OBJECTS.get(name.upper()) or (name[:-3] + "__c" if name.endswith("__r") else name)
+        objects.add(name)
+        pending.extend((subquery, True) for subquery in current["subqueries"])
+        pending.extend((semi_join, False) for semi_join in current["semi_joins"])
+    return objects
+
+
+def modstamp_literal(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class SOQLResultCache:
+    """Per-org, per-user LRU cache of complete SOQL results with per-object TTLs.
+
+    Only finished results (every batch fetched) of at most `max_records_per_entry`
+    records are stored. With `revalidate_after`, an entry older than that is served
+    only after a `SystemModstamp > fetch time` probe (queryAll, so deletes count)
+    finds no changed record of the objects it reads.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2000,
+        default_ttl: float = 120.0,
+        object_ttls: Optional[Dict[str, float]] = None,
+        max_records_per_entry: int = 2000,
+        revalidate_after: Optional[float] = None
+    ):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.object_ttls = {name.lower(): ttl for name, ttl in (object_ttls or DEFAULT_OBJECT_TTLS).items()}
+        self.max_records_per_entry = max_records_per_entry
+        self.revalidate_after = revalidate_after
+        self._entries: "OrderedDict[Tuple[str, str, str, bool], Dict[str, Any]]" = OrderedDict()
+        # (org, user, object) -> (since, checked_at): a probe at checked_at found no change visible to the user after since
+        self._unchanged: Dict[Tuple[str, str, str], Tuple[float, float]] = {}
+        self._unprobeable: Set[str] = set()
+        self.stats_counters = {
+            "hits": 0, "misses": 0, "stores": 0, "too_large": 0, "evictions": 0, "expired": 0,
+            "invalidations": 0, "probes": 0, "probe_invalidations": 0
+        }
+
+    def key(self, org_id: str, user: str, soql: str, include_deleted: bool = False) -> Optional[Tuple[str, str, str, bool]]:
+        """
+        Cache key of a query run by `user` (any stable id of the querying user, e.g. the username),
+        or None when it cannot be cached (no user, unparseable, or FOR VIEW/UPDATE side effects)
+        """
+        if not user:
+            return None
+        try:
+            normalized = normalize_soql(soql)
+        except SOQLSyntaxError:
+            return None
+        if any(f" FOR {clause}" in normalized for clause in ("VIEW", "REFERENCE", "UPDATE")):
+            return None
+        return org_id, user, normalized, include_deleted
+
+    def ttl_for(self, objects: Iterable[str]) -> float:
+        return min((self.object_ttls.get(name.lower(), self.default_ttl) for name in objects), default=self.default_ttl)
+
+    async def get(
+        self,
+        org_id: str,
+        user: str,
+        soql: str,
+        include_deleted: bool = False,
+        probe: Optional[Callable[[str], Awaitable[Dict[str, Any]]]] = None
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
+        """
+        Return (result, age in seconds) for a query `user` cached, or (None, None). `probe` runs a
+        queryAll on the org as that user and is used for SystemModstamp revalidation when enabled.
+        """
+        key = self.key(org_id, user, soql, include_deleted)
+        entry = self._entries.get(key) if key else None
+        now = time.time()
+        if entry is not None and entry["expires_at"] <= now:
+            self._entries.pop(key, None)
+            self.stats_counters["expired"] += 1
+            entry = None
+        if entry is not None and probe and self.revalidate_after is not None and now - entry["verified_at"] > self.revalidate_after:
+            if not await self._revalidate(org_id, user, entry, probe):
+                entry = None
+        if entry is None:
+            self.stats_counters["misses"] += 1
+            return None, None
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        self.stats_counters["hits"] += 1
+        # Callers reshape records (e.g. pop child relationships), so each hit gets its own copy
+        return copy.deepcopy(entry["result"]), now - entry["fetched_at"]
+
+    async def _revalidate(self, org_id: str, user: str, entry: Dict[str, Any], probe: Callable[[str], Awaitable[Dict[str, Any]]]) -> bool:
+        """Probe each object the entry reads for changes since it was fetched; False when it is stale"""
+        now = time.time()
+        for object_name in entry["objects"]:
+            if object_name.lower() in self._unprobeable:
+                continue
+            unchanged = self._unchanged.get((org_id, user, object_name.lower()))
+            since = entry["fetched_at"] - MODSTAMP_CLOCK_SKEW_SECONDS
+            if unchanged and unchanged[0] <= since and now - unchanged[1] <= self.revalidate_after:
+                continue
+            self.stats_counters["probes"] += 1
+            try:
+                result = await probe(
+                    f"SELECT Id FROM {object_name} WHERE SystemModstamp > {modstamp_literal(since)} LIMIT 1"
+                )
+            except SalesforceMalformedRequest:
+                # Objects without SystemModstamp fall back to TTL expiry only
+                self._unprobeable.add(object_name.lower())
+                continue
+            if result["records"]:
+                self.stats_counters["probe_invalidations"] += 1
+                self.invalidate(org_id, [object_name])
+                return False
+            self._unchanged[(org_id, user, object_name.lower())] = (since, now)
+        entry["verified_at"] = now
+        return True
+
+    def set(self, org_id: str, user: str, soql: str, result: Dict[str, Any], include_deleted: bool = False, fetched_at: Optional[float] = None):
+        """Store a complete query result (every batch fetched) that `user` ran"""
+        key = self.key(org_id, user, soql, include_deleted)
+        if key is None or not result.get("done", True):
+            return
+        if len(result["records"]) > self.max_records_per_entry:
+            self.stats_counters["too_large"] += 1
+            return
+        try:
+            objects = query_objects(soql)
+        except SOQLSyntaxError:
+            return
+        fetched_at = fetched_at or time.time()
+        self._entries[key] = {
+            "result": copy.deepcopy(result),
+            "objects": sorted(objects),
+            "fetched_at": fetched_at,
+            "verified_at": fetched_at,
+            "expires_at": fetched_at + self.ttl_for(objects)
+        }
+        self._entries.move_to_end(key)
+        self.stats_counters["stores"] += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats_counters["evictions"] += 1
+
+    def invalidate(self, org_id: str, object_names: Optional[List[str]] = None) -> int:
+        """Drop an org's entries, for every user, that read any of the objects (all of the org's entries by default)"""
+        names = {name.lower() for name in object_names} if object_names is not None else None
+        stale = [
+            key for key, entry in self._entries.items()
+            if key[0] == org_id and (names is None or any(name.lower() in names for name in entry["objects"]))
+        ]
+        for key in stale:
+            del self._entries[key]
+        for unchanged_key in [k for k in self._unchanged if k[0] == org_id and (names is None or k[2] in names)]:
+            del self._unchanged[unchanged_key]
+        self.stats_counters["invalidations"] += len(stale)
+        return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.stats_counters["hits"] + self.stats_counters["misses"]
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "orgs": len({key[0] for key in self._entries}),
+            "users": len({key[:2] for key in self._entries}),
+            "revalidate_after": self.revalidate_after,
+            "hit_rate": round(self.stats_counters["hits"] / lookups, 3) if lookups else 0.0,
+            **self.stats_counters
+        }
@@ -0,0 +1,240 @@
+import math
+import re
+import time
+from collections import OrderedDict
+from operator import mul
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from soql_parser import SOQLSyntaxError, tokenize
+from ttl_cache import TTLCache
+
+# Capitalized words that start requests or name Salesforce concepts rather than records
+NON_ENTITY_WORDS = {
+    "a", "all", "an", "and", "any", "are", "by", "can", "compare", "count", "did", "do", "does", "find", "for",
+    "from", "get", "give", "how", "i", "in", "is", "it", "last", "list", "me", "much", "my", "next", "of", "on",
+    "open", "or", "our", "please", "q1", "q2", "q3", "q4", "show", "tell", "the", "this", "to", "top", "we",
+    "what", "what's", "whats", "when", "where", "which", "who", "why", "with",
+    "account", "accounts", "case", "cases", "contact", "contacts", "deal", "deals", "event", "events", "lead",
+    "leads", "opportunities", "opportunity", "opps", "pipeline", "stage", "stages", "task", "tasks",
+    "closed", "forecast", "leaderboard", "overall", "performance", "quarterly", "rep", "reps", "sales", "total", "won"
+}
+
+# Words that change a query's meaning while embedding almost identically ("this quarter" vs
+# "last quarter"); a cached entry only matches requests containing exactly the same ones
+SIGNIFICANT_TERMS = {
+    "today", "yesterday", "tomorrow", "this", "last", "next", "previous", "current", "week", "month", "quarter",
+    "year", "fiscal", "q1", "q2", "q3", "q4", "january", "february", "march", "april", "may", "june", "july",
+    "august", "september", "october", "november", "december", "open", "closed", "won", "lost", "not", "no",
+    "without", "top", "bottom", "largest", "smallest", "oldest", "newest", "latest", "most", "least"
+}
+
+ENTITY_PATTERN = re.compile(
+    r"\"([^\"]+)\"|(?<!\w)'([^']+)'(?!\w)"  # quoted values
+    r"|(\d{4}-\d{2}-\d{2})"  # ISO dates
+    r"|\b(\d+(?:\.\d+)?)\b"  # numbers
+    r"|\b([A-Z][\w&.-]*(?:\s+[A-Z][\w&.-]*)*)"  # capitalized phrases
+)
+
+
+def extract_values(text: str) -> List[Tuple[str, str, int, int]]:
+    """Find the literal values of a request as (kind, value, start, end): entities, dates and numbers"""
+    values = []
+    for match in ENTITY_PATTERN.finditer(text):
+        quoted = match.group(1) or match.group(2)
+        if quoted:
+            values.append(("entity", quoted, match.start(), match.end()))
+        elif match.group(3):
+            values.append(("date", match.group(3), match.start(), match.end()))
+        elif match.group(4):
+            values.append(("number", match.group(4), match.start(), match.end()))
+        else:
+            words = match.group(5).split()
+            # Drop leading question/command words and object names ("Show Acme" -> "Acme")
+            while words and words[0].lower().rstrip("?,.") in NON_ENTITY_WORDS:
+                words.pop(0)
+            if words:
+                phrase = " ".join(words).rstrip("?,.")
+                start = text.index(phrase, match.start())
+                values.append(("entity", phrase, start, start + len(phrase)))
+    return values
+
+
+def mask_values(text: str, values: List[Tuple[str, str, int, int]]) -> str:
+    for kind, _, start, end in reversed(values):
+        text = text[:start] + f"<{kind}>" + text[end:]
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def significant_terms(masked: str) -> List[str]:
+    return sorted({word for word in re.findall(r"[a-z0-9]+", masked) if word in SIGNIFICANT_TERMS})
+
+
+def parameterize_soql(soql: str, request: str, values: List[Tuple[str, str, int, int]]) -> Optional[str]:
+    """
+    Replace each request value in the SOQL with a {{n}} placeholder. Returns None when the
+    pair could not be reused safely: a value does not appear in the query, or the query
+    contains request text that was not recognised as a value.
+    """
+    try:
+        tokens = tokenize(soql)
+    except SOQLSyntaxError:
+        return None
+    edits = []
+    used = set()
+    for index, (kind, value, _, _) in enumerate(values):
+        for position, (token_kind, text, start, end) in enumerate(tokens):
+            if position in used:
+                continue
+            if kind == "entity" and token_kind == "string":
+                offset = text.lower().find(value.lower())
+                if offset > 0:
+                    edits.append((start + offset, start + offset + len(value), f"{{{{{index}}}}}"))
+                    used.add(position)
+                    break
+            elif kind == "date" and token_kind == "date" and text == value:
+                edits.append((start, end, f"{{{{{index}}}}}"))
+                used.add(position)
+                break
+            elif kind == "number" and token_kind in ("number", "nliteral") and text.split(":")[-1] == value:
+                value_start = end - len(value)
+                edits.append((value_start, end, f"{{{{{index}}}}}"))
+                used.add(position)
+                break
+        else:
+            return None
+    # A string literal copied from the request that was not recognised as a value (e.g. a
+    # lower-case account name) would be reused verbatim for other records
+    for position, (token_kind, text, _, _) in enumerate(tokens):
+        literal = text[1:-1].strip("%").lower()
+        if token_kind == "string" and position not in used and literal and literal in request.lower():
+            return None
+    for start, end, replacement in sorted(edits, reverse=True):
+        soql = soql[:start] + replacement + soql[end:]
+    return soql
+
+
+def fill_template(template: str, values: List[Tuple[str, str, int, int]]) -> str:
+    for index, (kind, value, _, _) in enumerate(values):
+        if kind == "entity":
+            value = value.replace("\\", "\\\\").replace("'", "\\'")
+        template = template.replace(f"{{{{{index}}}}}", value)
+    return template
+
+
+def normalize_vector(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+class SemanticSOQLCache:
+    """Per-org cache of natural-language request -> SOQL pairs, looked up by embedding similarity.
+
+    Literal values in a request (entity names, dates, numbers) are masked before
+    embedding and stored as placeholders in the SOQL template, so "open pipeline
+    for Acme" can answer "Globex open opps". Only queries that executed
+    successfully should be stored.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[str], Awaitable[List[float]]],
+        threshold: float = 0.92,
+        max_entries_per_org: int = 500,
+        ttl: float = 604800.0
+    ):
+        self.embed = embed
+        self.threshold = threshold
+        self.max_entries_per_org = max_entries_per_org
+        self.ttl = ttl
+        self._orgs: Dict[str, "OrderedDict[str, Dict[str, Any]]"] = {}
+        self._embeddings = TTLCache(max_size=2000, ttl=3600)
+        self.stats_counters = {"hits": 0, "misses": 0, "stores": 0, "not_parameterizable": 0, "errors": 0}
+
+    async def _vector(self, masked: str) -> List[float]:
+        vector = self._embeddings.get(masked)
+        if vector is None:
+            vector = normalize_vector(await self.embed(masked))
+            self._embeddings.set(masked, vector)
+        return vector
+
+    async def lookup(self, org_id: str, request: str) -> Optional[Dict[str, Any]]:
+        """Return {"soql", "similarity", "matched_request"} for the closest cached request above the threshold"""
+        entries = self._orgs.get(org_id)
+        if not entries:
+            self.stats_counters["misses"] += 1
+            return None
+        values = extract_values(request)
+        kinds = [kind for kind, _, _, _ in values]
+        masked = mask_values(request, values)
+        terms = significant_terms(masked)
+        try:
+            vector = await self._vector(masked)
+        except Exception as e:
+            print(f"Semantic SOQL cache lookup failed: {e}")
+            self.stats_counters["errors"] += 1
+            return None
+
+        now = time.time()
+        best_key, best_similarity = None, self.threshold
+        for key, entry in list(entries.items()):
+            if now - entry["created_at"] > self.ttl:
+                del entries[key]
+                continue
+            if entry["kinds"] != kinds or entry["terms"] != terms:
+                continue
+            similarity = sum(map(mul, vector, entry["vector"]))
+            if similarity >= best_similarity:
+                best_key, best_similarity = key, similarity
+
+        if best_key is None:
+            self.stats_counters["misses"] += 1
+            return None
+        entries.move_to_end(best_key)
+        entry = entries[best_key]
+        entry["hits"] += 1
+        self.stats_counters["hits"] += 1
+        return {
+            "soql": fill_template(entry["template"], values),
+            "similarity": round(best_similarity, 4),
+            "matched_request": entry["request"]
+        }
+
+    async def store(self, org_id: str, request: str, soql: str):
+        """Cache a request whose generated SOQL executed successfully"""
+        values = extract_values(request)
+        template = parameterize_soql(soql, request, values)
+        if template is None:
+            self.stats_counters["not_parameterizable"] += 1
+            return
+        masked = mask_values(request, values)
+        try:
+            vector = await self._vector(masked)
+        except Exception as e:
+            print(f"Semantic SOQL cache store failed: {e}")
+            self.stats_counters["errors"] += 1
+            return
+        entries = self._orgs.setdefault(org_id, OrderedDict())
+        entries[masked] = {
+            "template": template,
+            "kinds": [kind for kind, _, _, _ in values],
+            "terms": significant_terms(masked),
+            "vector": vector,
+            "request": request,
+            "hits": 0,
+            "created_at": time.time()
+        }
+        entries.move_to_end(masked)
+        while len(entries) > self.max_entries_per_org:
+            entries.popitem(last=False)
+        self.stats_counters["stores"] += 1
+
+    def invalidate(self, org_id: str):
+        self._orgs.pop(org_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "orgs": len(self._orgs),
+            "entries": sum(len(entries) for entries in self._orgs.values()),
+            "threshold": self.threshold,
+            **self.stats_counters
+        }
@@ -0,0 +1,223 @@
+"""
+Pre-validated SOQL templates for the common pipeline-analysis dashboards.
+
+A keyword router maps a request to a template and fills in its parameters (close
+date period, top-N limit). Requests with filters or record names the templates do
+not cover fall through to LLM generation.
+"""
+import re
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from pipeline_analytics import GROUPINGS, OpportunitySnapshot
+from soql_parser import validate_soql
+from soql_semantic_cache import extract_values
+
+# Requests that narrow the data beyond what a template expresses are not routed
+UNSUPPORTED_PATTERN = re.compile(
+    r"\b(over|above|under|below|greater|less|more than|fewer|between|excluding|except|only|without|where|"
+    r"industry|industries|region|territory|segment|type|source|product|campaign|account|accounts|contact|lead)\b",
+    re.IGNORECASE
+)
+PERIOD_PATTERN = re.compile(r"\b(this|last|next)\s+(fiscal\s+)?(week|month|quarter|year)\b", re.IGNORECASE)
+TOP_PATTERN = re.compile(r"\btop\s+(\d{1,3})\b", re.IGNORECASE)
+
+# Ordered from most to least specific; the first template whose patterns all match wins
+PIPELINE_TEMPLATES: List[Dict[str, Any]] = [
+    {
+        "intent": "closed won by rep",
+        "patterns": [r"\b(won|closed[- ]won|bookings|wins)\b", r"\b(reps?|owners?|sales ?(people|persons?|reps?))\b"],
+        "description": "Closed-won deals and revenue per opportunity owner.",
+        "soql": """
+            SELECT Owner.Name, COUNT(Id) opportunity_count, SUM(Amount) total_won
+            FROM Opportunity
+            WHERE IsWon = true AND CloseDate = {period}
+            GROUP BY Owner.Name
+            ORDER BY SUM(Amount) DESC
+            LIMIT {limit}
+        """,
+        "default_period": "THIS_QUARTER",
+        "default_limit": 20,
+        "local": {"where": {"IsWon": True}, "grouping": "owner", "total": "total_won"}
+    },
+    {
+        "intent": "rep performance",
+        "patterns": [r"\b(reps?|owners?|sales ?(people|persons?|reps?)|leaderboard)\b", r"\b(pipeline|performance|open|leaderboard|rank\w*)\b"],
+        "description": "Open pipeline (deal count and value) per opportunity owner.",
+        "soql": """
+            SELECT Owner.Name, COUNT(Id) opportunity_count, SUM(Amount) total_pipeline
+            FROM Opportunity
+            WHERE IsClosed = false{close_date_filter}
+            GROUP BY Owner.Name
+            ORDER BY SUM(Amount) DESC
+            LIMIT {limit}
+        """,
+        "default_limit": 20,
+        "local": {"where": {"IsClosed": False}, "grouping": "owner", "total": "total_pipeline"}
+    },
+    {
+        "intent": "pipeline by forecast category",
+        "patterns": [r"\bforecast\b"],
+        "description": "Open pipeline grouped by forecast category.",
+        "soql": """
+            SELECT ForecastCategoryName, COUNT(Id) opportunity_count, SUM(Amount) total_value
+            FROM Opportunity
+            WHERE IsClosed = false{close_date_filter}
+            GROUP BY ForecastCategoryName
+            ORDER BY SUM(Amount) DESC
+        """,
+        "local": {"where": {"IsClosed": False}, "grouping": "forecast_category", "total": "total_value"}
+    },
+    {
+        "intent": "quarterly pipeline",
+        "patterns": [r"\b(quarterly|by quarter|per quarter|each quarter|quarter by quarter)\b"],
+        "description": "Open pipeline per calendar quarter of the close date.",
+        "soql": """
+            SELECT CALENDAR_QUARTER(CloseDate) quarter, COUNT(Id) opportunity_count, SUM(Amount) total_value
+            FROM Opportunity
+            WHERE IsClosed = false AND CloseDate = {period}
+            GROUP BY CALENDAR_QUARTER(CloseDate)
+            ORDER BY CALENDAR_QUARTER(CloseDate)
+        """,
+        "default_period": "THIS_YEAR",
+        "local": {"where": {"IsClosed": False}, "grouping": "quarter", "total": "total_value"}
+    },
+    {
+        "intent": "pipeline by stage",
+        "patterns": [r"\b((by|per|each|across) stages?|stage breakdown|stages? of (the )?pipeline|pipeline stages?|pipeline by stage)\b"],
+        "description": "Open pipeline (deal count and value) per sales stage.",
+        "soql": """
+            SELECT StageName, COUNT(Id) opportunity_count, SUM(Amount) total_value
+            FROM Opportunity
+            WHERE IsClosed = false{close_date_filter}
+            GROUP BY StageName
+            ORDER BY SUM(Amount) DESC
+        """,
+        "local": {"where": {"IsClosed": False}, "grouping": "stage", "total": "total_value"}
+    },
+    {
+        "intent": "total open pipeline",
+        "patterns": [r"\b(total|how much|overall|size of)\b", r"\b(open )?pipeline\b"],
+        "description": "Total number and value of open opportunities.",
+        "soql": """
+            SELECT COUNT(Id) opportunity_count, SUM(Amount) total_value
+            FROM Opportunity
+            WHERE IsClosed = false{close_date_filter}
+        """,
+        "local": {"where": {"IsClosed": False}, "total": "total_value"}
+    }
+]
+
+
+def render_template(template: Dict[str, Any], period: Optional[str] = None, limit: Optional[int] = None) -> str:
+    soql = template["soql"].format(
+        period=period or template.get("default_period", "THIS_YEAR"),
+        close_date_filter=f" AND CloseDate = {period}" if period else "",
+        limit=limit or template.get("default_limit", 20)
+    )
+    return " ".join(soql.split())
+
+
+def match_pipeline_template(user_query: str) -> Optional[Dict[str, Any]]:
+    """Route a request to a pipeline template, returning {"intent", "soql", "description", "period", "limit"} or None"""
+    if UNSUPPORTED_PATTERN.search(user_query):
+        return None
+    # Named records (e.g. an account) and other literal values need generated SOQL
+    values = [value for value in extract_values(user_query) if not TOP_PATTERN.search(user_query[max(0, value[2] - 4):value[3]])]
+    if values:
+        return None
+
+    for template in PIPELINE_TEMPLATES:
+        if all(re.search(pattern, user_query, re.IGNORECASE) for pattern in template["patterns"]):
+            period_match = PERIOD_PATTERN.search(user_query)
+            period = None
+            if period_match:
+                relative, fiscal, unit = period_match.groups()
+                if fiscal and unit.lower() in ("quarter", "year"):
+                    period = f"{relative}_fiscal_{unit}".upper()
+                else:
+                    period = f"{relative}_{unit}".upper()
+            top_match = TOP_PATTERN.search(user_query)
+            limit = int(top_match.group(1)) if top_match else None
+            return {
+                "intent": template["intent"],
+                "soql": render_template(template, period, limit),
+                "description": template["description"],
+                "template": template,
+                "period": period or template.get("default_period"),
+                "limit": (limit or template["default_limit"]) if "default_limit" in template else None
+            }
+    return None
+
+
+def date_literal_range(literal: str, today: date) -> Optional[Tuple[date, date]]:
+    """Inclusive date range of a calendar date literal (THIS_QUARTER, LAST_MONTH, ...); None for fiscal periods"""
+    match = re.fullmatch(r"(THIS|LAST|NEXT)_(WEEK|MONTH|QUARTER|YEAR)", literal)
+    if not match:
+        return None
+    relative, unit = match.groups()
+    offset = {"THIS": 0, "LAST": -1, "NEXT": 1}[relative]
+    if unit == "WEEK":
+        # Weeks start on Sunday, as in the default Salesforce locale
+        start = today - timedelta(days=(today.weekday() + 1) % 7) + timedelta(weeks=offset)
+        return start, start + timedelta(days=6)
+    if unit == "YEAR":
+        return date(today.year + offset, 1, 1), date(today.year + offset, 12, 31)
+    months = 3 if unit == "QUARTER" else 1
+    index = (today.year * 12 + (today.month - 1) // months * months) + offset * months
+    start = date(index // 12, index % 12 + 1, 1)
+    end_index = index + months
+    return start, date(end_index // 12, end_index % 12 + 1, 1) - timedelta(days=1)
+
+
+def evaluate_pipeline_template(
+    match: Dict[str, Any],
+    snapshot: OpportunitySnapshot,
+    today: Optional[date] = None
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Answer a matched template from an Opportunity snapshot (e.g. of the org mirror), returning
+    records shaped like the template's aggregate query results. Returns None when the
+    template cannot be evaluated locally (fiscal periods depend on the org's fiscal year).
+    """
+    local = match["template"]["local"]
+    date_range = None
+    if match["period"]:
+        date_range = date_literal_range(match["period"], today or date.today())
+        if date_range is None:
+            return None
+    mask = snapshot.mask(
+        is_closed=local["where"].get("IsClosed"),
+        is_won=local["where"].get("IsWon"),
+        close_date_range=date_range
+    )
+
+    grouping = local.get("grouping")
+    if not grouping:
+        return [{
+            "attributes": {"type": "AggregateResult"},
+            "opportunity_count": int(mask.sum()),
+            local["total"]: snapshot.total_amount(mask) if (mask & ~np.isnan(snapshot.amount)).any() else None
+        }]
+    _, group_key = GROUPINGS[grouping]
+    groups = snapshot.group_totals(grouping, mask)
+    if grouping == "quarter":
+        groups.sort(key=lambda group: (group["key"] is not None, group["key"] or 0))
+    else:
+        # Salesforce sorts nulls first unless told otherwise
+        groups.sort(key=lambda group: (group["total"] is not None, -(group["total"] or 0)))
+    if match["limit"]:
+        groups = groups[:match["limit"]]
+    return [
+        {"attributes": {"type": "AggregateResult"}, group_key: group["key"], "opportunity_count": group["count"], local["total"]: group["total"]}
+        for group in groups
+    ]
+
+
+# Templates are part of the code, so a broken one should fail at import rather than per request
+for _template in PIPELINE_TEMPLATES:
+    _validation = validate_soql(render_template(_template, "THIS_QUARTER", 10))
+    if not _validation["valid"] or _validation["corrections"]:
+        raise ValueError(f"Invalid pipeline template '{_template['intent']}': {_validation['errors'] or _validation['corrections']}")
@@ -0,0 +1,72 @@
+import asyncio
+
+from field_correction import FieldCorrector, edit_distance, match_field, normalize_name, suggest_field
+
+
+def field(name, label=None, relationship=None, reference_to=()):
+    return {"name": name, "label": label or name, "relationshipName": relationship, "referenceTo": list(reference_to)}
+
+
+DESCRIBES = {
+    "Opportunity": {"name": "Opportunity", "fields": [
+        field("Id"), field("Name"), field("Amount"), field("StageName", "Stage"), field("CloseDate", "Close Date"),
+        field("Region__c", "Region"), field("AccountId", "Account ID", "Account", ["Account"]),
+        field("OwnerId", "Owner ID", "Owner", ["User"])
+    ]},
+    "Account": {"name": "Account", "fields": [field("Id"), field("Name", "Account Name"), field("Industry")]},
+    "User": {"name": "User", "fields": [field("Id"), field("Name", "Full Name"), field("Email")]}
+}
+
+
+async def load(object_name):
+    return DESCRIBES.get(object_name)
+
+
+def suggest(object_name, path):
+    return asyncio.run(suggest_field(load, object_name, path))
+
+
+def test_normalize_name_ignores_case_separators_and_custom_suffix():
+    assert normalize_name("Region__c") == normalize_name("region") == "region"
+    assert normalize_name("Close_Date") == "closedate"
+
+
+def test_edit_distance_counts_transpositions_once():
+    assert edit_distance("amount", "amount") == 0
+    assert edit_distance("amuont", "amount") == 1
+    assert edit_distance("amout", "amount") == 1
+    assert edit_distance("abc", "xyz") == 3
+
+
+def test_match_field_by_name_label_and_spelling():
+    describe = DESCRIBES["Opportunity"]
+    assert match_field(describe, "stagename") == "StageName"
+    assert match_field(describe, "Stage") == "StageName"
+    assert match_field(describe, "Ammount") == "Amount"
+    assert match_field(describe, "Region") == "Region__c"
+    assert match_field(describe, "Probability") is None
+
+
+def test_match_field_leaves_ambiguous_candidates_alone():
+    describe = {"fields": [field("Code1__c"), field("Code2__c")]}
+    assert match_field(describe, "Code3") is None
+
+
+def test_suggest_field_relationship_paths():
+    assert suggest("Opportunity", "Acount.Name") == "Account.Name"
+    assert suggest("Opportunity", "AccountName") == "Account.Name"
+    assert suggest("Opportunity", "Owner.Emial") == "Owner.Email"
+    assert suggest("Opportunity", "Partner.Name") is None
+    assert suggest("Lead", "Name") is None
+
+
+def test_corrector_prefers_and_persists_learned_corrections(tmp_path):
+    path = tmp_path / "corrections" / "fields.json"
+    corrector = FieldCorrector(str(path))
+    corrector.record_success("00D1", [{"object": "Opportunity", "field": "Stage", "replacement": "Custom_Stage__c"}])
+
+    reloaded = FieldCorrector(str(path))
+    assert asyncio.run(reloaded.correct("00D1", load, "opportunity", "stage")) == "Custom_Stage__c"
+    assert asyncio.run(reloaded.correct("00D2", load, "Opportunity", "Stage")) == "StageName"
+    assert reloaded.stats()["learned_applied"] == 1
+    assert reloaded.stats()["suggested"] == 1
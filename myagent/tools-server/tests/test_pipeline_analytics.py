@@ -0,0 +1,103 @@
+from datetime import date
+
+import pytest
+
+from pipeline_analytics import OpportunitySnapshot
+
+
+def opportunity(id, amount, stage, close_date, created, owner, probability=50, closed=False, won=False, forecast="Pipeline"):
+    return {
+        "Id": id, "Amount": amount, "Probability": probability, "StageName": stage, "CloseDate": close_date,
+        "CreatedDate": f"{created}T10:00:00.000+0000" if created else None, "IsClosed": closed, "IsWon": won,
+        "ForecastCategoryName": forecast, "Owner": {"Name": owner}
+    }
+
+
+RECORDS = [
+    opportunity("006A", 1000.0, "Prospecting", "2024-02-15", "2024-01-01", "Ada", probability=10),
+    opportunity("006B", 3000.0, "Negotiation", "2024-05-20", "2024-05-01", "Ada", probability=80),
+    opportunity("006C", None, "Prospecting", "2024-03-01", "2024-05-25", "Grace", probability=10),
+    opportunity("006D", 2000.0, "Closed Won", "2024-01-10", "2023-11-01", "Grace", 100, True, True, "Closed"),
+    opportunity("006E", 500.0, "Closed Lost", "2024-04-10", "2023-12-01", "Grace", 0, True, False, "Omitted"),
+    opportunity("006F", 4000.0, "Closed Won", "2024-06-30", "2024-02-01", "Ada", 100, True, True, "Closed")
+]
+TODAY = date(2024, 6, 1)
+
+
+@pytest.fixture
+def snapshot():
+    return OpportunitySnapshot.from_records(RECORDS)
+
+
+def by_key(rows):
+    return {row["key"]: row for row in rows}
+
+
+def test_group_totals_by_stage_keeps_null_sums(snapshot):
+    stages = by_key(snapshot.group_totals("stage", snapshot.mask(is_closed=False)))
+    assert stages["Prospecting"] == {"key": "Prospecting", "count": 2, "total": 1000.0, "weighted": 100.0}
+    assert stages["Negotiation"]["weighted"] == 2400.0
+    assert "Closed Won" not in stages
+
+    only_null = snapshot.mask(close_date_range=(date(2024, 3, 1), date(2024, 3, 1)))
+    assert snapshot.group_totals("stage", only_null) == [{"key": "Prospecting", "count": 1, "total": None, "weighted": 0.0}]
+
+
+def test_group_totals_by_quarter(snapshot):
+    quarters = by_key(snapshot.group_totals("quarter"))
+    assert {key: row["count"] for key, row in quarters.items()} == {1: 3, 2: 3}
+    assert quarters[2]["total"] == 7500.0
+
+
+def test_mask_close_date_range_is_inclusive(snapshot):
+    mask = snapshot.mask(close_date_range=(date(2024, 1, 10), date(2024, 2, 15)))
+    assert [id for id, keep in zip(snapshot.ids, mask) if keep] == ["006A", "006D"]
+
+
+def test_weighted_pipeline_and_oldest(snapshot):
+    assert snapshot.weighted_pipeline() == 2500.0
+    assert snapshot.total_amount() == 10500.0
+    assert snapshot.ids[snapshot.oldest_index()] == "006D"
+    assert snapshot.ids[snapshot.oldest_index(snapshot.mask(is_closed=False))] == "006A"
+
+
+def test_aging_buckets(snapshot):
+    buckets = {row["bucket"]: (row["count"], row["total"]) for row in snapshot.aging_buckets(today=TODAY)}
+    assert buckets == {"0-30": (1, 0.0), "31-60": (1, 3000.0), "61-90": (0, 0.0), "91-180": (1, 1000.0), "181+": (0, 0.0)}
+
+
+def test_win_rates(snapshot):
+    overall = snapshot.win_rates()[0]
+    assert overall["closed"] == 3 and overall["won"] == 2
+    assert overall["win_rate"] == round(2 / 3, 4)
+    assert overall["amount_win_rate"] == round(6000 / 6500, 4)
+
+    owners = by_key(snapshot.win_rates("owner"))
+    assert owners["Ada"]["win_rate"] == 1.0
+    assert owners["Grace"]["won_amount"] == 2000.0
+
+
+def test_from_columns_matches_from_records(snapshot):
+    columns = {
+        "Id": [r["Id"] for r in RECORDS], "Amount": [r["Amount"] for r in RECORDS],
+        "Probability": [r["Probability"] for r in RECORDS], "StageName": [r["StageName"] for r in RECORDS],
+        "CloseDate": [r["CloseDate"] for r in RECORDS], "CreatedDate": [r["CreatedDate"] for r in RECORDS],
+        "IsClosed": [r["IsClosed"] for r in RECORDS], "IsWon": [r["IsWon"] for r in RECORDS],
+        "ForecastCategoryName": [r["ForecastCategoryName"] for r in RECORDS],
+        "Owner.Name": [r["Owner"]["Name"] for r in RECORDS]
+    }
+    assert OpportunitySnapshot.from_columns(columns).summary(today=TODAY) == snapshot.summary(today=TODAY)
+
+
+def test_summary_for_period(snapshot):
+    summary = snapshot.summary(close_date_range=(date(2024, 4, 1), date(2024, 6, 30)), today=TODAY)
+    assert summary["opportunities"] == 3
+    assert summary["open_pipeline"] == 3000.0
+    assert summary["win_rate"]["closed"] == 2
+
+
+def test_empty_snapshot():
+    snapshot = OpportunitySnapshot.from_records([])
+    assert snapshot.oldest_index() is None
+    assert snapshot.win_rates() == []
+    assert snapshot.group_totals("stage") == []
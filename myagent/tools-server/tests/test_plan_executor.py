@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from plan_executor import critical_path_length, normalize_plan, run_plan
+
+
+def test_normalize_plan_defaults_to_sequential():
+    plan = normalize_plan([{"step_number": 1}, {"step_number": 2}, {"step_number": 3, "depends_on": []}])
+    assert [step["depends_on"] for step in plan] == [[], [1], []]
+
+
+def test_normalize_plan_renumbers_and_drops_bad_dependencies():
+    plan = normalize_plan([
+        {"step_number": 1},
+        {"step_number": 1, "depends_on": 1},
+        {"step_number": "x", "depends_on": [5, 2, "1", 1]},
+        {"step_number": 7, "depends_on": [7, 3]}
+    ])
+    assert [(step["step_number"], step["depends_on"]) for step in plan] == [(1, []), (2, [1]), (3, [1, 2]), (7, [3])]
+
+
+def test_critical_path_length():
+    plan = normalize_plan([
+        {"step_number": 1, "depends_on": []},
+        {"step_number": 2, "depends_on": []},
+        {"step_number": 3, "depends_on": [1]},
+        {"step_number": 4, "depends_on": [2, 3]}
+    ])
+    assert critical_path_length(plan) == 3
+    assert critical_path_length([]) == 0
+
+
+def test_run_plan_passes_dependency_results_and_runs_branches_concurrently():
+    plan = normalize_plan([
+        {"step_number": 1, "depends_on": []},
+        {"step_number": 2, "depends_on": []},
+        {"step_number": 3, "depends_on": [2, 1]}
+    ])
+    running = set()
+    overlapped = []
+
+    async def run_step(step, dependency_results):
+        running.add(step["step_number"])
+        await asyncio.sleep(0.01)
+        overlapped.append(set(running))
+        running.discard(step["step_number"])
+        return step["step_number"] * 10 + sum(dependency_results.values())
+
+    results = asyncio.run(run_plan(plan, run_step))
+    assert results == {1: 10, 2: 20, 3: 60}
+    assert {1, 2} in overlapped
+
+
+def test_run_plan_respects_max_parallel():
+    plan = normalize_plan([{"step_number": number, "depends_on": []} for number in range(1, 6)])
+    active = 0
+    peak = 0
+
+    async def run_step(step, dependency_results):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+    asyncio.run(run_plan(plan, run_step, max_parallel=2))
+    assert peak == 2
+
+
+def test_run_plan_cancels_remaining_steps_on_failure():
+    plan = normalize_plan([
+        {"step_number": 1, "depends_on": []},
+        {"step_number": 2, "depends_on": []},
+        {"step_number": 3, "depends_on": [2]}
+    ])
+    cancelled = []
+    started = []
+
+    async def run_step(step, dependency_results):
+        started.append(step["step_number"])
+        if step["step_number"] == 1:
+            raise ValueError("bad query")
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(step["step_number"])
+            raise
+
+    with pytest.raises(ValueError):
+        asyncio.run(run_plan(plan, run_step))
+    assert cancelled == [2]
+    assert 3 not in started
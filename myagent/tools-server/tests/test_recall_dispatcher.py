@@ -0,0 +1,70 @@
+import asyncio
+
+from recall_dispatcher import RecallNotificationDispatcher
+
+
+def make_dispatcher(sent, results=None, **kwargs):
+    async def send_message(bot_id, message):
+        sent.append((bot_id, message))
+        return results.pop(0) if results else True
+
+    return RecallNotificationDispatcher(send_message, lambda items: " | ".join(items), **kwargs)
+
+
+def test_items_for_a_bot_are_coalesced():
+    sent = []
+
+    async def scenario():
+        dispatcher = make_dispatcher(sent, coalesce_window=0.05)
+        dispatcher.start()
+        dispatcher.enqueue("bot-1", "a")
+        dispatcher.enqueue("bot-1", "b")
+        await asyncio.sleep(0.2)
+        await dispatcher.stop()
+        return dispatcher.metrics()
+
+    metrics = asyncio.run(scenario())
+    assert sent == [("bot-1", "a | b")]
+    assert metrics["items_coalesced"] == 1
+
+
+def test_idle_bot_buckets_are_dropped_once_refilled():
+    sent = []
+
+    async def scenario():
+        dispatcher = make_dispatcher(sent, coalesce_window=0.01, per_bot_rate=20.0, per_bot_burst=1)
+        dispatcher.start()
+        for number in range(5):
+            dispatcher.enqueue(f"bot-{number}", "link")
+        await asyncio.sleep(0.02)
+        during = dispatcher.metrics()["bot_buckets"]
+        await asyncio.sleep(0.2)
+        after = dispatcher.metrics()["bot_buckets"]
+        await dispatcher.stop()
+        return during, after
+
+    during, after = asyncio.run(scenario())
+    assert len(sent) == 5
+    assert during > 0
+    assert after == 0
+
+
+def test_bucket_of_a_bot_waiting_for_retry_is_kept():
+    sent = []
+
+    async def scenario():
+        dispatcher = make_dispatcher(
+            sent, results=[False], coalesce_window=0.01, per_bot_rate=100.0, base_backoff=0.3
+        )
+        dispatcher.start()
+        dispatcher.enqueue("bot-1", "link")
+        await asyncio.sleep(0.1)
+        waiting = dispatcher.metrics()["bot_buckets"]
+        await asyncio.sleep(0.5)
+        await dispatcher.stop()
+        return waiting, dispatcher.metrics()
+
+    waiting, metrics = asyncio.run(scenario())
+    assert waiting == 1
+    assert metrics["retries"] == 1 and metrics["items_delivered"] == 1
+    assert metrics["bot_buckets"] == 0
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from request_deadline import DeadlineExceeded, RequestDeadline
+
+SHARES = {"plan": 0.25, "execute": 0.5, "analysis": 0.25}
+
+
+def test_phase_budget_is_share_of_remaining_time():
+    deadline = RequestDeadline(8.0, SHARES)
+    deadline.start_phase("plan")
+    assert 1.9 < deadline.remaining() <= 2.0
+    deadline.start_phase("execute")
+    # Time the plan phase did not use rolls over: execute gets 0.5 / 0.75 of what is left
+    assert 5.2 < deadline.remaining() <= 5.34
+    deadline.start_phase("analysis")
+    assert 7.9 < deadline.remaining() <= 8.0
+
+
+def test_run_raises_deadline_exceeded_for_the_phase():
+    async def scenario():
+        deadline = RequestDeadline(0.2, SHARES)
+        deadline.start_phase("plan")
+        with pytest.raises(DeadlineExceeded) as exceeded:
+            await deadline.run(asyncio.sleep(1))
+        assert exceeded.value.phase == "plan"
+        deadline.start_phase("execute")
+        assert await deadline.run(asyncio.sleep(0, "done")) == "done"
+        return deadline.report()
+
+    report = asyncio.run(scenario())
+    assert report["exceeded_phase"] == "plan"
+    assert report["deadline_seconds"] == 0.2
+    assert set(report["phase_seconds"]) == {"plan", "execute"}
+
+
+def test_timeouts_raised_by_the_call_itself_pass_through():
+    async def call_timing_out():
+        raise asyncio.TimeoutError()
+
+    async def scenario():
+        deadline = RequestDeadline(10.0, SHARES)
+        deadline.start_phase("plan")
+        with pytest.raises(asyncio.TimeoutError):
+            await deadline.run(call_timing_out())
+        return deadline.exceeded_phase
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_without_a_deadline_nothing_is_cancelled():
+    async def scenario():
+        deadline = RequestDeadline(None, SHARES)
+        deadline.start_phase("plan")
+        assert deadline.remaining() is None
+        result = await deadline.run(asyncio.sleep(0.05, "slow"))
+        deadline.start_phase("execute")
+        return result, deadline.report()
+
+    result, report = asyncio.run(scenario())
+    assert result == "slow"
+    assert report["deadline_seconds"] is None and report["exceeded_phase"] is None
+    assert report["phase_seconds"]["plan"] >= 0.05
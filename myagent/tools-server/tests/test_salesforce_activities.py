@@ -0,0 +1,67 @@
+import asyncio
+
+from simple_salesforce.exceptions import SalesforceMalformedRequest
+
+import salesforce_activities
+from salesforce_activities import RECENT_ACTIVITIES_PER_RECORD, fetch_recent_activities
+
+
+class FakeSalesforce:
+    """Answers Task queries from a list of tasks; chunks containing `failing_id` fail"""
+
+    def __init__(self, tasks, failing_id=None):
+        self.tasks = tasks
+        self.failing_id = failing_id
+        self.queries = []
+
+    async def query_many(self, soqls, fetch_all=False):
+        self.queries.extend(soqls)
+        results = []
+        for soql in soqls:
+            if self.failing_id and f"'{self.failing_id}'" in soql:
+                results.append(SalesforceMalformedRequest("url", 400, "query", [{"errorCode": "INVALID_TYPE"}]))
+                continue
+            records = [task for task in self.tasks if f"'{task['WhatId']}'" in soql]
+            results.append({"totalSize": len(records), "done": True, "records": records})
+        return results
+
+
+def task(what_id, number):
+    return {"WhatId": what_id, "Id": f"00T{what_id}{number}", "Subject": f"Call {number}", "ActivityDate": f"2024-01-{number + 1:02d}"}
+
+
+def test_tasks_are_grouped_and_capped_per_record():
+    sf = FakeSalesforce([task("006A", n) for n in range(RECENT_ACTIVITIES_PER_RECORD + 2)] + [task("006B", 0)])
+    activities = asyncio.run(fetch_recent_activities(sf, [{"Id": "006A"}, {"Id": "006B"}, {"Id": "006C"}, {"Name": "no id"}]))
+    assert len(activities["006A"]) == RECENT_ACTIVITIES_PER_RECORD
+    assert [activity["Id"] for activity in activities["006B"]] == ["00T006B0"]
+    assert activities["006C"] == []
+    assert "WhatId" not in activities["006A"][0]
+    assert len(sf.queries) == 1 and "FROM Task" in sf.queries[0] and "WhatId IN" in sf.queries[0]
+
+
+def test_non_opportunity_records_use_task_what_id():
+    records = [
+        {"attributes": {"type": "User"}, "Id": "005A"},
+        {"attributes": {"type": "OpportunityLineItem"}, "Id": "00kA"},
+        {"attributes": {"type": "Account"}, "Id": "001A"}
+    ]
+    sf = FakeSalesforce([task("001A", 0)])
+    activities = asyncio.run(fetch_recent_activities(sf, records))
+    assert activities == {"005A": [], "00kA": [], "001A": [{key: value for key, value in task("001A", 0).items() if key != "WhatId"}]}
+    assert all("Tasks" not in soql for soql in sf.queries)
+
+
+def test_failed_chunk_gives_empty_lists(monkeypatch):
+    monkeypatch.setattr(salesforce_activities, "SOQL_ID_CHUNK_SIZE", 1)
+    sf = FakeSalesforce([task("006A", 0), task("006B", 0)], failing_id="006A")
+    activities = asyncio.run(fetch_recent_activities(sf, [{"Id": "006A"}, {"Id": "006B"}]))
+    assert activities["006A"] == []
+    assert len(activities["006B"]) == 1
+    assert len(sf.queries) == 2
+
+
+def test_no_records_makes_no_query():
+    sf = FakeSalesforce([])
+    assert asyncio.run(fetch_recent_activities(sf, [])) == {}
+    assert sf.queries == []
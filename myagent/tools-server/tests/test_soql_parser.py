@@ -0,0 +1,186 @@
+import pytest
+
+from soql_parser import (
+    SOQLSyntaxError, apply_edits, escape_soql_string, parse_soql, strip_query_text, tokenize, validate_soql
+)
+
+
+def describe(name, fields, child_relationships=()):
+    return {
+        "name": name,
+        "fields": [{"name": field, "type": field_type, "relationshipName": None, "referenceTo": []} for field, field_type in fields],
+        "childRelationships": [
+            {"relationshipName": relationship, "childSObject": child, "field": "AccountId"}
+            for relationship, child in child_relationships
+        ]
+    }
+
+
+DESCRIBES = {
+    "account": describe("Account", [("Id", "id"), ("Name", "string"), ("Industry", "picklist")], [("Opportunities", "Opportunity")]),
+    "opportunity": describe(
+        "Opportunity",
+        [("Id", "id"), ("Name", "string"), ("Amount", "currency"), ("StageName", "picklist"), ("IsClosed", "boolean"), ("AccountId", "reference")]
+    )
+}
+
+
+def test_tokenize_kinds_and_positions():
+    query = "SELECT Id FROM Account WHERE Name = 'O\\'Neil' AND CreatedDate > 2024-01-01T00:00:00Z AND Id = :accountId"
+    tokens = tokenize(query)
+    assert [kind for kind, _, _, _ in tokens] == [
+        "ident", "ident", "ident", "ident", "ident", "ident", "op", "string",
+        "ident", "ident", "op", "datetime", "ident", "ident", "op", "bind"
+    ]
+    for _, text, start, end in tokens:
+        assert query[start:end] == text
+
+
+def test_tokenize_rejects_unknown_characters():
+    with pytest.raises(SOQLSyntaxError):
+        tokenize("SELECT Id FROM Account WHERE Name = 'a' ; DROP")
+
+
+def test_tokens_round_trip_to_normalized_query():
+    query = "SELECT  Id,\n Name FROM   Account WHERE Name LIKE 'Acme%'  LIMIT 5"
+    rebuilt = " ".join(text for _, text, _, _ in tokenize(query))
+    assert rebuilt == "SELECT Id , Name FROM Account WHERE Name LIKE 'Acme%' LIMIT 5"
+    assert parse_soql(rebuilt)["object"] == "Account"
+
+
+def test_parse_structure():
+    query = parse_soql(
+        "SELECT Id, Name, (SELECT Id, Amount FROM Opportunities WHERE IsClosed = false) FROM Account a "
+        "WHERE a.Id IN (SELECT AccountId FROM Opportunity) ORDER BY Name DESC NULLS LAST LIMIT 10"
+    )
+    assert query["object"] == "Account"
+    assert query["alias"] == "a"
+    assert [item["path"] for item in query["select"]] == ["Id", "Name"]
+    assert query["subqueries"][0]["object"] == "Opportunities"
+    assert query["semi_joins"][0]["object"] == "Opportunity"
+    assert query["limit"] == 10
+
+
+@pytest.mark.parametrize("query", [
+    "SELECT Id, FROM Account",
+    "SELECT Id FROM",
+    "SELECT Id FROM Account WHERE Name = Acme",
+    "SELECT Id FROM Account LIMIT many",
+    "SELECT Id FROM Account WHERE Id IN ('a'"
+])
+def test_parse_rejects_malformed_queries(query):
+    with pytest.raises(SOQLSyntaxError):
+        parse_soql(query)
+
+
+def test_strip_query_text():
+    assert strip_query_text("Here is the query:\n```sql\nSELECT Id FROM Account;\n```") == "SELECT Id FROM Account"
+
+
+def test_apply_edits_uses_original_positions():
+    assert apply_edits("SELECT a FROM b", [(7, 8, "Name"), (14, 15, "Account")]) == "SELECT Name FROM Account"
+
+
+def test_escape_soql_string():
+    assert escape_soql_string("O'Neil \\ Co") == "O\\'Neil \\\\ Co"
+
+
+def test_group_by_is_added_for_ungrouped_fields():
+    result = validate_soql("SELECT StageName, SUM(Amount) FROM Opportunity")
+    assert result["valid"]
+    assert result["query"] == "SELECT StageName, SUM(Amount) FROM Opportunity GROUP BY StageName"
+    assert result["corrections"] == ["Added StageName to GROUP BY"]
+
+
+def test_group_by_is_extended_before_later_clauses():
+    result = validate_soql("SELECT StageName, Type, COUNT(Id) FROM Opportunity GROUP BY StageName ORDER BY StageName")
+    assert result["valid"]
+    assert result["query"] == "SELECT StageName, Type, COUNT(Id) FROM Opportunity GROUP BY StageName, Type ORDER BY StageName"
+
+
+def test_group_by_is_inserted_before_order_by():
+    result = validate_soql("SELECT StageName, COUNT(Id) FROM Opportunity ORDER BY StageName")
+    assert result["query"] == "SELECT StageName, COUNT(Id) FROM Opportunity GROUP BY StageName ORDER BY StageName"
+
+
+def test_aggregate_errors():
+    assert not validate_soql("SELECT COUNT(), Name FROM Account")["valid"]
+    assert "HAVING requires a GROUP BY clause" in validate_soql("SELECT COUNT(Id) FROM Account HAVING COUNT(Id) > 1")["errors"]
+
+
+def test_double_quoted_strings_are_converted():
+    result = validate_soql('SELECT Id FROM Account WHERE Name = "Acme \\"West\\"" AND Industry = "Tech"')
+    assert result["valid"]
+    assert result["query"] == "SELECT Id FROM Account WHERE Name = 'Acme \"West\"' AND Industry = 'Tech'"
+    assert result["corrections"] == ["Converted double-quoted strings to single quotes"]
+
+
+def test_bind_variables_are_substituted_from_context():
+    result = validate_soql(
+        "SELECT Id FROM Opportunity WHERE AccountId = :accountId AND Name = :account_name AND Amount > :min_amount",
+        context={"account_id": "001A", "account_name": "O'Neil", "min_amount": 1000}
+    )
+    assert result["valid"]
+    assert result["query"] == "SELECT Id FROM Opportunity WHERE AccountId = '001A' AND Name = 'O\\'Neil' AND Amount > 1000"
+
+
+def test_unresolved_bind_variable_is_an_error():
+    result = validate_soql("SELECT Id FROM Opportunity WHERE AccountId = :account_id")
+    assert not result["valid"]
+    assert result["errors"] == ["Unresolved bind variable :account_id; use a literal value instead"]
+
+
+def test_list_bind_variable_becomes_an_in_list():
+    result = validate_soql("SELECT Id FROM Account WHERE Id IN :ids", context={"ids": ["001A", "001B"]})
+    assert result["valid"]
+    assert result["query"] == "SELECT Id FROM Account WHERE Id IN ('001A', '001B')"
+    assert result["corrections"] == ["Replaced bind variable :ids with ('001A', '001B')"]
+
+
+def test_list_bind_variable_outside_in_is_an_error_without_a_correction():
+    result = validate_soql("SELECT Id FROM Account WHERE Id = :ids", context={"ids": ["001A"]})
+    assert not result["valid"]
+    assert result["corrections"] == []
+
+
+def test_empty_list_bind_variable_is_an_error():
+    result = validate_soql("SELECT Id FROM Account WHERE Id NOT IN :ids", context={"ids": []})
+    assert not result["valid"]
+
+
+def test_schema_check_reports_invalid_fields_with_positions():
+    query = "SELECT Id, Amout FROM Opportunity"
+    result = validate_soql(query, DESCRIBES)
+    assert not result["valid"]
+    assert result["errors"] == ["No such column 'Amout' on entity 'Opportunity'"]
+    invalid = result["invalid_fields"][0]
+    assert query[invalid["start"]:invalid["end"]] == "Amout"
+
+
+def test_schema_check_lists_unloaded_objects():
+    result = validate_soql("SELECT Id FROM Contact", DESCRIBES)
+    assert result["unloaded_objects"] == ["Contact"]
+
+
+def test_schema_check_validates_subqueries_and_unquotes_booleans():
+    result = validate_soql(
+        "SELECT Name, (SELECT Amount FROM Opportunities WHERE IsClosed = 'false') FROM Account", DESCRIBES
+    )
+    assert result["valid"]
+    assert "IsClosed = false" in result["query"]
+    assert not validate_soql("SELECT Name, (SELECT Id FROM Deals) FROM Account", DESCRIBES)["valid"]
+
+
+def test_schema_check_rejects_sum_of_non_numeric_field():
+    result = validate_soql("SELECT SUM(Name) FROM Opportunity", DESCRIBES)
+    assert not result["valid"]
+
+
+@pytest.mark.parametrize("literal", [
+    "LAST_N_DAYS:30", "NEXT_N_WEEKS:2", "LAST_N_FISCAL_QUARTERS:3", "N_DAYS_AGO:5", "N_WEEKS_AGO:2",
+    "N_MONTHS_AGO:6", "N_QUARTERS_AGO:1", "N_YEARS_AGO:2", "N_FISCAL_QUARTERS_AGO:4", "N_FISCAL_YEARS_AGO:1"
+])
+def test_n_date_literals(literal):
+    query = f"SELECT Id FROM Opportunity WHERE CloseDate = {literal}"
+    assert ("nliteral", literal) in [(kind, text) for kind, text, _, _ in tokenize(query)]
+    assert validate_soql(query)["valid"]
@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+from simple_salesforce.exceptions import SalesforceMalformedRequest
+
+from soql_result_cache import SOQLResultCache, normalize_soql, query_objects
+
+ORG = "00D000000000001"
+SOQL = "SELECT Id, Name FROM Account WHERE Name = 'Acme'"
+RESULT = {"totalSize": 1, "done": True, "records": [{"Id": "001A", "Name": "Acme"}]}
+
+
+def get(cache, user, soql=SOQL, **kwargs):
+    return asyncio.run(cache.get(ORG, user, soql, **kwargs))
+
+
+def test_normalize_soql_keeps_string_literals():
+    assert normalize_soql("select  id from account\nwhere name = 'Acme'") == "SELECT ID FROM ACCOUNT WHERE NAME = 'Acme'"
+
+
+def test_query_objects_includes_subqueries_and_semi_joins():
+    soql = (
+        "SELECT Id, (SELECT Id FROM Opportunities), (SELECT Id FROM Invoices__r) FROM Account "
+        "WHERE Id IN (SELECT AccountId FROM Contact)"
+    )
+    assert query_objects(soql) == {"Account", "Opportunity", "Invoices__c", "Contact"}
+
+
+def test_hit_returns_a_copy_with_its_age():
+    cache = SOQLResultCache()
+    cache.set(ORG, "ada@example.com", SOQL, RESULT, fetched_at=time.time() - 5)
+    result, age = get(cache, "ada@example.com", "select id, name from Account where Name = 'Acme'")
+    assert result == RESULT and 4 < age < 10
+    result["records"].clear()
+    assert get(cache, "ada@example.com")[0] == RESULT
+    assert get(cache, "ada@example.com", "SELECT Id, Name FROM Account WHERE Name = 'acme'") == (None, None)
+
+
+def test_results_are_not_shared_between_users():
+    cache = SOQLResultCache()
+    cache.set(ORG, "ada@example.com", SOQL, RESULT)
+    assert get(cache, "grace@example.com") == (None, None)
+    cache.set(ORG, None, SOQL, RESULT)
+    assert get(cache, None) == (None, None)
+    assert cache.stats()["users"] == 1
+
+
+def test_uncacheable_results_are_not_stored():
+    cache = SOQLResultCache(max_records_per_entry=1)
+    cache.set(ORG, "ada", SOQL + " FOR VIEW", RESULT)
+    cache.set(ORG, "ada", "SELECT Id FROM Account", {"totalSize": 2, "done": True, "records": [{}, {}]})
+    cache.set(ORG, "ada", "SELECT Name FROM Account", {**RESULT, "done": False})
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["too_large"] == 1
+
+
+def test_ttl_depends_on_the_objects_read():
+    cache = SOQLResultCache(default_ttl=100, object_ttls={"Task": 10, "User": 1000})
+    assert cache.ttl_for(["User"]) == 1000
+    assert cache.ttl_for(["User", "Task"]) == 10
+    assert cache.ttl_for(["Widget__c"]) == 100
+    cache.set(ORG, "ada", "SELECT Id FROM Task", RESULT, fetched_at=time.time() - 11)
+    assert get(cache, "ada", "SELECT Id FROM Task") == (None, None)
+    assert cache.stats()["expired"] == 1
+
+
+def test_lru_eviction():
+    cache = SOQLResultCache(max_entries=2)
+    for name in ("A", "B"):
+        cache.set(ORG, "ada", f"SELECT Id FROM Account WHERE Name = '{name}'", RESULT)
+    get(cache, "ada", "SELECT Id FROM Account WHERE Name = 'A'")
+    cache.set(ORG, "ada", "SELECT Id FROM Account WHERE Name = 'C'", RESULT)
+    assert get(cache, "ada", "SELECT Id FROM Account WHERE Name = 'B'") == (None, None)
+    assert get(cache, "ada", "SELECT Id FROM Account WHERE Name = 'A'")[0] == RESULT
+
+
+def test_invalidate_drops_every_users_entries_for_the_object():
+    cache = SOQLResultCache()
+    cache.set(ORG, "ada", SOQL, RESULT)
+    cache.set(ORG, "grace", SOQL, RESULT)
+    cache.set(ORG, "ada", "SELECT Id FROM Contact", RESULT)
+    cache.set("00D000000000002", "ada", SOQL, RESULT)
+    assert cache.invalidate(ORG, ["account"]) == 2
+    assert get(cache, "ada", "SELECT Id FROM Contact")[0] == RESULT
+    assert cache.invalidate(ORG) == 1
+    assert cache.stats()["entries"] == 1
+
+
+def test_revalidation_probe_drops_changed_entries():
+    cache = SOQLResultCache(revalidate_after=0)
+    cache.set(ORG, "ada", SOQL, RESULT, fetched_at=time.time() - 1)
+    probes = []
+
+    async def unchanged(soql):
+        probes.append(soql)
+        return {"records": []}
+
+    async def changed(soql):
+        return {"records": [{"Id": "001A"}]}
+
+    assert get(cache, "ada", probe=unchanged)[0] == RESULT
+    assert probes[0].startswith("SELECT Id FROM Account WHERE SystemModstamp > ")
+    assert get(cache, "ada", probe=changed) == (None, None)
+    assert cache.stats()["probe_invalidations"] == 1
+
+
+def test_unprobeable_objects_fall_back_to_ttl():
+    cache = SOQLResultCache(revalidate_after=0)
+    cache.set(ORG, "ada", "SELECT Id FROM Widget__c", RESULT, fetched_at=time.time() - 1)
+
+    async def probe(soql):
+        raise SalesforceMalformedRequest("url", 400, "query", [{"errorCode": "INVALID_FIELD"}])
+
+    assert get(cache, "ada", "SELECT Id FROM Widget__c", probe=probe)[0] == RESULT
+    assert get(cache, "ada", "SELECT Id FROM Widget__c", probe=probe)[0] == RESULT
+    assert cache.stats()["probes"] == 1